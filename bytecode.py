@@ -0,0 +1,281 @@
+from array import array
+from bisect import bisect_right
+from enum import IntEnum
+from typing import Dict, List, Optional, Sequence
+
+from token_type import TokenType
+from lox_token import Token
+from expr import ExprVisitor, Expr, LiteralExpr, GroupingExpr, UnaryExpr, BinaryExpr, VariableExpr, AssignmentExpr, \
+    LogicalExpr
+from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from resolver import Resolver
+from lazy_parser import LazyBlockStmt
+
+
+class OpCode(IntEnum):
+    # push constants[operand]
+    CONSTANT = 0
+    NIL = 1
+    TRUE = 2
+    FALSE = 3
+    POP = 4
+    # push, overwrite without popping, and pop into the local in frame slot operand
+    GET_LOCAL = 5
+    SET_LOCAL = 6
+    STORE_LOCAL = 7
+    # the operand of the global instructions is the constant index of the variable's name
+    GET_GLOBAL = 8
+    SET_GLOBAL = 9
+    DEFINE_GLOBAL = 10
+    EQUAL = 11
+    NOT_EQUAL = 12
+    GREATER = 13
+    GREATER_EQUAL = 14
+    LESS = 15
+    LESS_EQUAL = 16
+    ADD = 17
+    SUBTRACT = 18
+    MULTIPLY = 19
+    DIVIDE = 20
+    NOT = 21
+    NEGATE = 22
+    PRINT = 23
+    # the operand of the jumps is the offset of the instruction to continue at;
+    # JUMP_IF_FALSE and JUMP_IF_TRUE leave the tested value on the stack and POP_JUMP_IF_FALSE pops it
+    JUMP = 24
+    JUMP_IF_FALSE = 25
+    JUMP_IF_TRUE = 26
+    POP_JUMP_IF_FALSE = 27
+    RETURN = 28
+
+
+class Chunk:
+    """A compiled program, with a table of the source line each run of instructions comes from."""
+    # the operand is a constant index, displayed with its value
+    CONSTANT_OPERANDS = {OpCode.CONSTANT, OpCode.GET_GLOBAL, OpCode.SET_GLOBAL, OpCode.DEFINE_GLOBAL}
+    JUMPS = {OpCode.JUMP, OpCode.JUMP_IF_FALSE, OpCode.JUMP_IF_TRUE, OpCode.POP_JUMP_IF_FALSE}
+    NO_OPERAND = {OpCode.NIL, OpCode.TRUE, OpCode.FALSE, OpCode.POP, OpCode.EQUAL, OpCode.NOT_EQUAL, OpCode.GREATER,
+                  OpCode.GREATER_EQUAL, OpCode.LESS, OpCode.LESS_EQUAL, OpCode.ADD, OpCode.SUBTRACT, OpCode.MULTIPLY,
+                  OpCode.DIVIDE, OpCode.NOT, OpCode.NEGATE, OpCode.PRINT, OpCode.RETURN}
+
+    def __init__(self, code: Sequence[int], constants: List[object], line_offsets: Sequence[int],
+                 lines: Sequence[int], frame_size: int):
+        # each instruction is an opcode followed by an operand (0 when unused), in 16 bit words unless one does not fit
+        self.code = array('H' if max(code, default=0) <= 0xFFFF else 'I', code)
+        self.constants = constants
+        # the instructions from line_offsets[i] up to line_offsets[i + 1] come from lines[i]
+        self.line_offsets = array('I', line_offsets)
+        self.lines = array('i', lines)
+        # the number of local variable slots the program needs
+        self.frame_size = frame_size
+
+    def line_at(self, offset: int) -> int:
+        return self.lines[bisect_right(self.line_offsets, offset) - 1]
+
+    def disassemble(self) -> str:
+        lines = []
+        previous_line = None
+        for offset in range(0, len(self.code), 2):
+            opcode, operand = OpCode(self.code[offset]), self.code[offset + 1]
+            line = self.line_at(offset)
+            line_column = '   |' if line == previous_line else f'{line:4}'
+            previous_line = line
+            if opcode in Chunk.NO_OPERAND:
+                details = ''
+            elif opcode in Chunk.CONSTANT_OPERANDS:
+                details = f'{operand:4} {self.constants[operand]!r}'
+            elif opcode in Chunk.JUMPS:
+                details = f'-> {operand:04}'
+            else:
+                details = f'{operand:4}'
+            lines.append(f'{offset:04} {line_column} {opcode.name:<18} {details}'.rstrip())
+        return '\n'.join(lines)
+
+
+class BytecodeCompiler(ExprVisitor, StmtVisitor):
+    """Compiles resolved statements into a Chunk for the VirtualMachine, giving every local a slot in one frame."""
+    BINARY_OPCODES = {
+        TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+        TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+        TokenType.GREATER: OpCode.GREATER,
+        TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+        TokenType.LESS: OpCode.LESS,
+        TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+        TokenType.PLUS: OpCode.ADD,
+        TokenType.MINUS: OpCode.SUBTRACT,
+        TokenType.STAR: OpCode.MULTIPLY,
+        TokenType.SLASH: OpCode.DIVIDE,
+    }
+
+    def __init__(self):
+        self.code: List[int] = []
+        self.constants: List[object] = []
+        self.constant_indices: Dict[tuple[type, object], int] = {}
+        self.line_offsets: List[int] = []
+        self.lines: List[int] = []
+        self.line = 1
+        # the frame slot of the first local of each enclosing block, innermost last
+        self.bases: List[int] = []
+        self.next_base = 0
+        self.frame_size = 0
+
+    def compile(self, stmts: Sequence[Stmt]) -> Chunk:
+        for stmt in stmts:
+            stmt.accept(self)
+        self.emit(OpCode.RETURN)
+        return Chunk(self.code, self.constants, self.line_offsets, self.lines, self.frame_size)
+
+    def emit(self, opcode: OpCode, operand: int = 0, token: Optional[Token] = None) -> int:
+        """Appends an instruction, attributed to the line of token if given, and returns its offset."""
+        if token is not None:
+            self.line = token.line
+        offset = len(self.code)
+        if not self.lines or self.lines[-1] != self.line:
+            self.line_offsets.append(offset)
+            self.lines.append(self.line)
+        self.code += (opcode, operand)
+        return offset
+
+    def patch_jump(self, offset: int) -> None:
+        """Makes the jump at offset continue at the next instruction emitted."""
+        self.code[offset + 1] = len(self.code)
+
+    def constant(self, value: object) -> int:
+        # by repr, since 1.0 == True and -0.0 == 0.0 but they are different constants
+        key = (type(value), repr(value))
+        if key not in self.constant_indices:
+            self.constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+        return self.constant_indices[key]
+
+    def local(self, hops: int, slot: int) -> int:
+        return self.bases[-1 - hops] + slot
+
+    def evaluate(self, expr: Expr) -> None:
+        expr.accept(self)
+
+    def visit_expression_stmt(self, stmt: ExpressionStmt) -> None:
+        self.evaluate(stmt.expression)
+        if type(stmt.expression) is AssignmentExpr and stmt.expression.hops is not None:
+            # the assigned value is discarded
+            self.code[-2] = OpCode.STORE_LOCAL
+        else:
+            self.emit(OpCode.POP)
+
+    def visit_print_stmt(self, stmt: PrintStmt) -> None:
+        self.evaluate(stmt.expression)
+        self.emit(OpCode.PRINT)
+
+    def visit_var_stmt(self, stmt: VarStmt) -> None:
+        if stmt.initializer is None:
+            self.emit(OpCode.NIL, token=stmt.name)
+        else:
+            self.evaluate(stmt.initializer)
+        if stmt.slot is None:
+            self.emit(OpCode.DEFINE_GLOBAL, self.constant(stmt.name.lexeme), stmt.name)
+        else:
+            self.emit(OpCode.STORE_LOCAL, self.local(0, stmt.slot), stmt.name)
+
+    def visit_block_stmt(self, stmt: BlockStmt) -> None:
+        if type(stmt) is LazyBlockStmt and stmt.slot_count is None:
+            # the whole program is compiled before it runs, so lazy blocks are parsed (and report errors) up front
+            Resolver.resolve_lazy_block(stmt)
+        if not stmt.slot_count:
+            for statement in stmt.statements:
+                statement.accept(self)
+            return
+        # each run of the block reuses its slots, which is safe for the reason given in Interpreter.scope_environment
+        base = self.next_base
+        self.bases.append(base)
+        self.next_base = base + stmt.slot_count
+        self.frame_size = max(self.frame_size, self.next_base)
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.bases.pop()
+        self.next_base = base
+
+    def visit_if_stmt(self, stmt: IfStmt) -> None:
+        self.evaluate(stmt.condition)
+        skip_if_branch = self.emit(OpCode.POP_JUMP_IF_FALSE)
+        stmt.if_branch.accept(self)
+        if stmt.else_branch is None:
+            self.patch_jump(skip_if_branch)
+            return
+        skip_else_branch = self.emit(OpCode.JUMP)
+        self.patch_jump(skip_if_branch)
+        stmt.else_branch.accept(self)
+        self.patch_jump(skip_else_branch)
+
+    def visit_while_stmt(self, stmt: WhileStmt) -> None:
+        loop_start = len(self.code)
+        self.evaluate(stmt.condition)
+        exit_loop = self.emit(OpCode.POP_JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        self.emit(OpCode.JUMP, loop_start)
+        self.patch_jump(exit_loop)
+
+    def visit_for_stmt(self, stmt: ForStmt) -> None:
+        base = self.next_base
+        if stmt.slot_count:
+            self.bases.append(base)
+            self.next_base = base + stmt.slot_count
+            self.frame_size = max(self.frame_size, self.next_base)
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        loop_start = len(self.code)
+        exit_loop = None
+        if stmt.condition is not None:
+            self.evaluate(stmt.condition)
+            exit_loop = self.emit(OpCode.POP_JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        if stmt.increment is not None:
+            ExpressionStmt(stmt.increment).accept(self)
+        self.emit(OpCode.JUMP, loop_start)
+        if exit_loop is not None:
+            self.patch_jump(exit_loop)
+        if stmt.slot_count:
+            self.bases.pop()
+            self.next_base = base
+
+    def visit_literal_expr(self, expr: LiteralExpr) -> None:
+        if expr.value is None:
+            self.emit(OpCode.NIL)
+        elif expr.value is True:
+            self.emit(OpCode.TRUE)
+        elif expr.value is False:
+            self.emit(OpCode.FALSE)
+        else:
+            self.emit(OpCode.CONSTANT, self.constant(expr.value))
+
+    def visit_grouping_expr(self, expr: GroupingExpr) -> None:
+        self.evaluate(expr.expression)
+
+    def visit_variable_expr(self, expr: VariableExpr) -> None:
+        if expr.hops is None:
+            self.emit(OpCode.GET_GLOBAL, self.constant(expr.name.lexeme), expr.name)
+        else:
+            self.emit(OpCode.GET_LOCAL, self.local(expr.hops, expr.slot), expr.name)
+
+    def visit_assignment_expr(self, expr: AssignmentExpr) -> None:
+        self.evaluate(expr.value)
+        if expr.hops is None:
+            self.emit(OpCode.SET_GLOBAL, self.constant(expr.name.lexeme), expr.name)
+        else:
+            self.emit(OpCode.SET_LOCAL, self.local(expr.hops, expr.slot), expr.name)
+
+    def visit_unary_expr(self, expr: UnaryExpr) -> None:
+        self.evaluate(expr.right)
+        self.emit(OpCode.NEGATE if expr.operator.type == TokenType.MINUS else OpCode.NOT, token=expr.operator)
+
+    def visit_binary_expr(self, expr: BinaryExpr) -> None:
+        self.evaluate(expr.left)
+        self.evaluate(expr.right)
+        self.emit(BytecodeCompiler.BINARY_OPCODES[expr.operator.type], token=expr.operator)
+
+    def visit_logical_expr(self, expr: LogicalExpr) -> None:
+        self.evaluate(expr.left)
+        opcode = OpCode.JUMP_IF_TRUE if expr.operator.type == TokenType.OR else OpCode.JUMP_IF_FALSE
+        short_circuit = self.emit(opcode, token=expr.operator)
+        self.emit(OpCode.POP)
+        self.evaluate(expr.right)
+        self.patch_jump(short_circuit)
@@ -0,0 +1,358 @@
+import operator
+from typing import Callable, Optional
+
+from token_type import TokenType
+from expr import ExprVisitor, Expr, LiteralExpr, GroupingExpr, UnaryExpr, BinaryExpr, VariableExpr, AssignmentExpr, \
+    LogicalExpr
+from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from environment import BlockEnvironment
+from output_sink import OutputSink
+from resolver import Resolver
+from runtime_exception import RuntimeException
+from interpreter import Interpreter
+from operators import add as add_values
+from rope import concatenate
+from lazy_parser import LazyBlockStmt
+
+# compiled code takes the environment of the innermost running block (None outside of any block)
+Code = Callable[[Optional[BlockEnvironment]], object]
+
+
+class ClosureCompiler(ExprVisitor, StmtVisitor):
+    """Compiles resolved statements into nested closures specialized for each node, which run like Interpreter."""
+    # the function of each binary operator whose operands must be numbers (+ also takes strings)
+    NUMBER_OPERATORS = {
+        TokenType.MINUS: operator.sub,
+        TokenType.STAR: operator.mul,
+        TokenType.SLASH: operator.truediv,
+        TokenType.GREATER: operator.gt,
+        TokenType.GREATER_EQUAL: operator.ge,
+        TokenType.LESS: operator.lt,
+        TokenType.LESS_EQUAL: operator.le,
+    }
+    EQUALITY_OPERATORS = {
+        TokenType.EQUAL_EQUAL: operator.eq,
+        TokenType.BANG_EQUAL: operator.ne,
+    }
+
+    def __init__(self, interpreter: Interpreter):
+        self.interpreter = interpreter
+        self.globals = interpreter.globals.values
+
+    def compile(self, node: Expr | Stmt) -> Code:
+        return node.accept(self)
+
+    def visit_expression_stmt(self, stmt: ExpressionStmt) -> Code:
+        return self.compile(stmt.expression)
+
+    def visit_print_stmt(self, stmt: PrintStmt) -> Code:
+        expression = self.compile(stmt.expression)
+        stringify = Interpreter.stringify_value
+        write_line = self.interpreter.output.write_line
+
+        def print_value(environment):
+            write_line(stringify(expression(environment)))
+        return print_value
+
+    def visit_var_stmt(self, stmt: VarStmt) -> Code:
+        initializer = self.compile(stmt.initializer) if stmt.initializer else None
+        slot = stmt.slot
+        if slot is None:
+            values, lexeme = self.globals, stmt.name.lexeme
+
+            def define_global(environment):
+                values[lexeme] = None if initializer is None else initializer(environment)
+            return define_global
+        if initializer is None:
+            def declare_local(environment):
+                environment.values[slot] = None
+            return declare_local
+
+        def define_local(environment):
+            environment.values[slot] = initializer(environment)
+        return define_local
+
+    def visit_block_stmt(self, stmt: BlockStmt) -> Code:
+        if type(stmt) is LazyBlockStmt and stmt.slot_count is None:
+            return self.compile_lazy_block(stmt)
+        statements = tuple(self.compile(statement) for statement in stmt.statements)
+        slot_count = stmt.slot_count
+        if not slot_count:
+            def run_statements(environment):
+                for statement in statements:
+                    statement(environment)
+            return run_statements
+        # reused while the enclosing environment is the same, like in Interpreter.scope_environment
+        block_environment = None
+
+        def run_block(environment):
+            nonlocal block_environment
+            if block_environment is None or block_environment.enclosing is not environment:
+                block_environment = BlockEnvironment(environment, slot_count)
+            for statement in statements:
+                statement(block_environment)
+        return run_block
+
+    def compile_lazy_block(self, stmt: LazyBlockStmt) -> Code:
+        # parsed, resolved and compiled when it first runs
+        compiled = None
+
+        def run_lazy_block(environment):
+            nonlocal compiled
+            if compiled is None:
+                Resolver.resolve_lazy_block(stmt)
+                compiled = self.visit_block_stmt(stmt)
+            compiled(environment)
+        return run_lazy_block
+
+    def visit_if_stmt(self, stmt: IfStmt) -> Code:
+        condition = self.compile(stmt.condition)
+        if_branch = self.compile(stmt.if_branch)
+        else_branch = None if stmt.else_branch is None else self.compile(stmt.else_branch)
+
+        def run_if(environment):
+            value = condition(environment)
+            if value is not None and value is not False:
+                if_branch(environment)
+            elif else_branch is not None:
+                else_branch(environment)
+        return run_if
+
+    def visit_while_stmt(self, stmt: WhileStmt) -> Code:
+        condition = self.compile(stmt.condition)
+        body = self.compile(stmt.body)
+
+        def run_while(environment):
+            value = condition(environment)
+            while value is not None and value is not False:
+                body(environment)
+                value = condition(environment)
+        return run_while
+
+    def visit_for_stmt(self, stmt: ForStmt) -> Code:
+        initializer = None if stmt.initializer is None else self.compile(stmt.initializer)
+        # a missing condition or increment is rare enough to be compiled as a call that does nothing
+        condition = (lambda environment: True) if stmt.condition is None else self.compile(stmt.condition)
+        increment = (lambda environment: None) if stmt.increment is None else self.compile(stmt.increment)
+        body = self.compile(stmt.body)
+        slot_count = stmt.slot_count
+        loop_environment = None
+
+        def run_for(environment):
+            nonlocal loop_environment
+            if slot_count:
+                if loop_environment is None or loop_environment.enclosing is not environment:
+                    loop_environment = BlockEnvironment(environment, slot_count)
+                environment = loop_environment
+            if initializer is not None:
+                initializer(environment)
+            value = condition(environment)
+            while value is not None and value is not False:
+                body(environment)
+                increment(environment)
+                value = condition(environment)
+        return run_for
+
+    def visit_literal_expr(self, expr: LiteralExpr) -> Code:
+        value = expr.value
+        return lambda environment: value
+
+    def visit_grouping_expr(self, expr: GroupingExpr) -> Code:
+        return self.compile(expr.expression)
+
+    def visit_variable_expr(self, expr: VariableExpr) -> Code:
+        hops, slot = expr.hops, expr.slot
+        if hops is None:
+            values, name = self.globals, expr.name
+            lexeme = name.lexeme
+
+            def get_global(environment):
+                if lexeme in values:
+                    return values[lexeme]
+                raise RuntimeException(name, f'Undefined variable {lexeme}.')
+            return get_global
+        if hops == 0:
+            return lambda environment: environment.values[slot]
+        if hops == 1:
+            return lambda environment: environment.enclosing.values[slot]
+
+        def get_local(environment):
+            for _ in range(hops):
+                environment = environment.enclosing
+            return environment.values[slot]
+        return get_local
+
+    def visit_assignment_expr(self, expr: AssignmentExpr) -> Code:
+        value_code = self.compile(expr.value)
+        hops, slot = expr.hops, expr.slot
+        if hops is None:
+            values, name = self.globals, expr.name
+            lexeme = name.lexeme
+
+            def assign_global(environment):
+                value = value_code(environment)
+                if lexeme not in values:
+                    raise RuntimeException(name, f'Undefined variable {lexeme}.')
+                values[lexeme] = value
+                return value
+            return assign_global
+        if hops == 0:
+            def assign_slot(environment):
+                environment.values[slot] = value = value_code(environment)
+                return value
+            return assign_slot
+
+        def assign_local(environment):
+            value = value_code(environment)
+            for _ in range(hops):
+                environment = environment.enclosing
+            environment.values[slot] = value
+            return value
+        return assign_local
+
+    def visit_unary_expr(self, expr: UnaryExpr) -> Code:
+        right = self.compile(expr.right)
+        token = expr.operator
+        if token.type == TokenType.MINUS and expr.operand_type is float:
+            return lambda environment: -right(environment)
+        if token.type == TokenType.MINUS:
+            def negate(environment):
+                operand = right(environment)
+                if type(operand) is not float:
+                    raise RuntimeException(token, 'Operand must be a number.')
+                return -operand
+            return negate
+        if token.type == TokenType.BANG:
+            def logical_not(environment):
+                operand = right(environment)
+                return operand is None or operand is False
+            return logical_not
+        raise AssertionError('This case should not be reachable. Invalid operator for unary expression.')
+
+    def visit_logical_expr(self, expr: LogicalExpr) -> Code:
+        left, right = self.compile(expr.left), self.compile(expr.right)
+        if expr.operator.type == TokenType.OR:
+            def logical_or(environment):
+                value = left(environment)
+                return right(environment) if value is None or value is False else value
+            return logical_or
+        if expr.operator.type == TokenType.AND:
+            def logical_and(environment):
+                value = left(environment)
+                return value if value is None or value is False else right(environment)
+            return logical_and
+        raise AssertionError('This case should not be reachable. Invalid operator for logical expression.')
+
+    def visit_binary_expr(self, expr: BinaryExpr) -> Code:
+        token_type = expr.operator.type
+        if token_type == TokenType.PLUS:
+            return self.compile_addition(expr)
+        if token_type in ClosureCompiler.NUMBER_OPERATORS:
+            return self.compile_number_operation(expr, ClosureCompiler.NUMBER_OPERATORS[token_type])
+        if token_type in ClosureCompiler.EQUALITY_OPERATORS:
+            function = ClosureCompiler.EQUALITY_OPERATORS[token_type]
+            left, right = self.compile(expr.left), self.compile(expr.right)
+            return lambda environment: function(left(environment), right(environment))
+        raise AssertionError('This case should not be reachable. Invalid operator for binary exression.')
+
+    def compile_number_operation(self, expr: BinaryExpr, function: Callable[[float, float], object]) -> Code:
+        if expr.operand_type is float:
+            return self.compile_unchecked_operation(expr, function)
+        token = expr.operator
+        message = 'Operands must be numbers.'
+        if ClosureCompiler.is_local(expr.left) and ClosureCompiler.is_local(expr.right):
+            left_slot, right_slot = expr.left.slot, expr.right.slot
+
+            def locals_operation(environment):
+                values = environment.values
+                left, right = values[left_slot], values[right_slot]
+                if type(left) is float and type(right) is float:
+                    return function(left, right)
+                raise RuntimeException(token, message)
+            return locals_operation
+        left_code = self.compile(expr.left)
+        if type(expr.right) is LiteralExpr and type(expr.right.value) is float:
+            constant = expr.right.value
+
+            def constant_operation(environment):
+                left = left_code(environment)
+                if type(left) is float:
+                    return function(left, constant)
+                raise RuntimeException(token, message)
+            return constant_operation
+        right_code = self.compile(expr.right)
+
+        def operation(environment):
+            left, right = left_code(environment), right_code(environment)
+            if type(left) is float and type(right) is float:
+                return function(left, right)
+            raise RuntimeException(token, message)
+        return operation
+
+    def compile_addition(self, expr: BinaryExpr) -> Code:
+        # numbers are added inline; anything else goes to operators.add, which concatenates strings or fails
+        if expr.operand_type is float:
+            return self.compile_unchecked_operation(expr, operator.add)
+        if expr.operand_type is str:
+            return self.compile_unchecked_operation(expr, concatenate)
+        token = expr.operator
+        if ClosureCompiler.is_local(expr.left) and ClosureCompiler.is_local(expr.right):
+            left_slot, right_slot = expr.left.slot, expr.right.slot
+
+            def add_locals(environment):
+                values = environment.values
+                left, right = values[left_slot], values[right_slot]
+                if type(left) is float and type(right) is float:
+                    return left + right
+                return add_values(token, left, right)
+            return add_locals
+        left_code = self.compile(expr.left)
+        if type(expr.right) is LiteralExpr and type(expr.right.value) is float:
+            constant = expr.right.value
+
+            def add_constant(environment):
+                left = left_code(environment)
+                if type(left) is float:
+                    return left + constant
+                return add_values(token, left, constant)
+            return add_constant
+        right_code = self.compile(expr.right)
+
+        def add(environment):
+            left, right = left_code(environment), right_code(environment)
+            if type(left) is float and type(right) is float:
+                return left + right
+            return add_values(token, left, right)
+        return add
+
+    def compile_unchecked_operation(self, expr: BinaryExpr, function: Callable[[object, object], object]) -> Code:
+        """Compiles an operation whose operand types TypeInferrer proved, so they need no checks."""
+        if ClosureCompiler.is_local(expr.left) and ClosureCompiler.is_local(expr.right):
+            left_slot, right_slot = expr.left.slot, expr.right.slot
+
+            def locals_operation(environment):
+                values = environment.values
+                return function(values[left_slot], values[right_slot])
+            return locals_operation
+        left_code = self.compile(expr.left)
+        if type(expr.right) is LiteralExpr:
+            constant = expr.right.value
+            return lambda environment: function(left_code(environment), constant)
+        right_code = self.compile(expr.right)
+        return lambda environment: function(left_code(environment), right_code(environment))
+
+    @staticmethod
+    def is_local(expr: Expr) -> bool:
+        """Whether expr reads a variable declared in the innermost enclosing block."""
+        return type(expr) is VariableExpr and expr.hops == 0
+
+
+class ClosureInterpreter(Interpreter):
+    """Runs statements by compiling them with a ClosureCompiler and calling the result."""
+
+    def __init__(self, lox, output: Optional[OutputSink] = None):
+        super().__init__(lox, output)
+        self.compiler = ClosureCompiler(self)
+
+    def execute(self, stmt: Stmt) -> None:
+        self.compiler.compile(stmt)(None)
@@ -14,17 +14,35 @@ class Environment:
         self.values[name] = value
 
     def get(self, name: Token) -> object:
-        if name.lexeme in self.values:
-            return self.values[name.lexeme]
-        if self.enclosing:
-            return self.enclosing.get(name)
-        raise RuntimeException(name, f'Undefined variable {name.lexeme}.')
+        # scanners intern identifier lexemes, so these lookups hit on identity without comparing characters
+        lexeme = name.lexeme
+        environment = self
+        while environment is not None:
+            values = environment.values
+            if lexeme in values:
+                return values[lexeme]
+            environment = environment.enclosing
+        raise RuntimeException(name, f'Undefined variable {lexeme}.')
 
     def assign(self, name: Token, value: object) -> None:
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
-        if self.enclosing:
-            self.enclosing.assign(name, value)
-            return
-        raise RuntimeException(name, f'Undefined variable {name.lexeme}.')
+        lexeme = name.lexeme
+        environment = self
+        while environment is not None:
+            values = environment.values
+            if lexeme in values:
+                values[lexeme] = value
+                return
+            environment = environment.enclosing
+        raise RuntimeException(name, f'Undefined variable {lexeme}.')
+
+
+class BlockEnvironment:
+    """
+    The variables declared in one run of a block, in the slots Resolver assigned them. Variables that are not declared
+    in any enclosing block are globals, which stay in an Environment.
+    """
+    __slots__ = ('enclosing', 'values')
+
+    def __init__(self, enclosing, slot_count: int):
+        self.enclosing = enclosing
+        self.values = [None] * slot_count
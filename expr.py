@@ -1,13 +1,14 @@
 from abc import ABC, abstractmethod
 
+from node import Node
 from lox_token import Token
 
 
-class Expr(ABC):
+class Expr(Node):
+    __slots__ = ()
 
-    @abstractmethod
     def accept(self, visitor):
-        pass
+        raise NotImplementedError
 
 
 class ExprVisitor(ABC):
@@ -42,44 +43,57 @@ class ExprVisitor(ABC):
 
 
 class BinaryExpr(Expr):
+    __slots__ = ('left', 'operator', 'right', 'handler', 'operand_type')
+    __match_args__ = ('left', 'operator', 'right')
 
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        self.handler = None
+        self.operand_type = None
 
     def accept(self, visitor: ExprVisitor):
         return visitor.visit_binary_expr(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.left == other.left and self.operator == other.operator and self.right == other.right
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.left, other.left))
+        pending.append((self.right, other.right))
+        return self.operator == other.operator
 
-    def __repr__(self):
-        return f'BinaryExpr(left={self.left}, operator={self.operator}, right={self.right})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.left)
+        pending.append(self.right)
+        return (self.operator.lexeme,)
 
 
 class LogicalExpr(Expr):
+    __slots__ = ('left', 'operator', 'right', 'handler')
+    __match_args__ = ('left', 'operator', 'right')
 
     def __init__(self, left: Expr, operator: Token, right: Expr):
         self.left = left
         self.operator = operator
         self.right = right
+        self.handler = None
 
     def accept(self, visitor: ExprVisitor):
         return visitor.visit_logical_expr(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.left == other.left and self.operator == other.operator and self.right == other.right
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.left, other.left))
+        pending.append((self.right, other.right))
+        return self.operator == other.operator
 
-    def __repr__(self):
-        return f'LogicalExpr(left={self.left}, operator={self.operator}, right={self.right})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.left)
+        pending.append(self.right)
+        return (self.operator.lexeme,)
 
 
 class GroupingExpr(Expr):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
 
     def __init__(self, expression: Expr):
         self.expression = expression
@@ -87,16 +101,18 @@ class GroupingExpr(Expr):
     def accept(self, visitor: ExprVisitor):
         return visitor.visit_grouping_expr(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.expression == other.expression
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.expression, other.expression))
+        return True
 
-    def __repr__(self):
-        return f'GroupingExpr(expression={self.expression})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.expression)
+        return ()
 
 
 class LiteralExpr(Expr):
+    __slots__ = ('value',)
+    __match_args__ = ('value',)
 
     def __init__(self, value: object):
         self.value = value
@@ -104,63 +120,71 @@ class LiteralExpr(Expr):
     def accept(self, visitor: ExprVisitor):
         return visitor.visit_literal_expr(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
+    def equal_fields(self, other, pending: list) -> bool:
         return self.value == other.value
 
-    def __repr__(self):
-        return f'LiteralExpr(value={self.value})'
+    def hash_fields(self, pending: list) -> tuple:
+        return (self.value,)
 
 
 class UnaryExpr(Expr):
+    __slots__ = ('operator', 'right', 'handler', 'operand_type')
+    __match_args__ = ('operator', 'right')
 
     def __init__(self, operator: Token, right: Expr):
         self.operator = operator
         self.right = right
+        self.handler = None
+        self.operand_type = None
 
     def accept(self, visitor: ExprVisitor):
         return visitor.visit_unary_expr(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.operator == other.operator and self.right == other.right
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.right, other.right))
+        return self.operator == other.operator
 
-    def __repr__(self):
-        return f'UnaryExpr(operator={self.operator}, right={self.right})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.right)
+        return (self.operator.lexeme,)
 
 
 class VariableExpr(Expr):
+    __slots__ = ('name', 'hops', 'slot')
+    __match_args__ = ('name',)
 
     def __init__(self, name: Token):
         self.name = name
+        self.hops = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor):
         return visitor.visit_variable_expr(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
+    def equal_fields(self, other, pending: list) -> bool:
         return self.name == other.name
 
-    def __repr__(self):
-        return f'VariableExpr(name={self.name})'
+    def hash_fields(self, pending: list) -> tuple:
+        return (self.name.lexeme,)
 
 
 class AssignmentExpr(Expr):
+    __slots__ = ('name', 'value', 'hops', 'slot')
+    __match_args__ = ('name', 'value')
 
     def __init__(self, name: Token, value: Expr):
         self.name = name
         self.value = value
+        self.hops = None
+        self.slot = None
 
     def accept(self, visitor: ExprVisitor):
         return visitor.visit_assignment_expr(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.name == other.name and self.value == other.value
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.value, other.value))
+        return self.name == other.name
 
-    def __repr__(self):
-        return f'AssignmentExpr(name={self.name}, value={self.value})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.value)
+        return (self.name.lexeme,)
@@ -0,0 +1,122 @@
+import re
+import sys
+from typing import Iterator, Sequence, Tuple
+
+from lox_token import Token
+from token_type import TokenType
+from scanner import Scanner
+
+
+class FastScanner:
+    """
+    Produces the same tokens as Scanner, but consumes whole runs of whitespace, comments, identifiers,
+    numbers and strings with a single match of a compiled master pattern instead of one character per call.
+    """
+    # leading blanks are consumed together with the token that follows them, so most tokens take one match;
+    # they are matched possessively so trailing blanks at the end of the source are not split into an unexpected one;
+    # the lexical rules (including treating '.' as part of numbers and identifiers) mirror Scanner exactly
+    TOKEN_PATTERN = re.compile(
+        r'[ \t\r]*+(?:'
+        r'(\n[ \t\r\n]*)'                    # 1: newlines and the blanks around them
+        r'|([A-Za-z_][A-Za-z_0-9.]*)'         # 2: identifiers and keywords
+        r'|([!=<>]=?|[(){},.\-+;*]|/(?!/))'  # 3: operators (a '/' followed by '/' starts a comment)
+        r'|([0-9][0-9.]*)'                    # 4: numbers
+        r'|("[^"]*"?)'                        # 5: strings, possibly unterminated
+        r'|(//[^\n]*)'                        # 6: comments
+        r'|(.))',                             # 7: unexpected characters
+        re.DOTALL
+    )
+    NEWLINES, IDENTIFIER, OPERATOR, NUMBER, STRING, COMMENT, UNEXPECTED = range(1, 8)
+
+    OPERATOR_TOKEN_TYPES = {
+        '(': TokenType.LEFT_PAREN,
+        ')': TokenType.RIGHT_PAREN,
+        '{': TokenType.LEFT_BRACE,
+        '}': TokenType.RIGHT_BRACE,
+        ',': TokenType.COMMA,
+        '.': TokenType.DOT,
+        '-': TokenType.MINUS,
+        '+': TokenType.PLUS,
+        ';': TokenType.SEMICOLON,
+        '*': TokenType.STAR,
+        '/': TokenType.SLASH,
+        '!': TokenType.BANG,
+        '!=': TokenType.BANG_EQUAL,
+        '=': TokenType.EQUAL,
+        '==': TokenType.EQUAL_EQUAL,
+        '<': TokenType.LESS,
+        '<=': TokenType.LESS_EQUAL,
+        '>': TokenType.GREATER,
+        '>=': TokenType.GREATER_EQUAL,
+    }
+
+    def __init__(self, source: str, lox):
+        self.source = source
+        self.line = 1
+        self.tokens = []
+        self.lox = lox
+
+    def scan_tokens(self) -> Sequence[Token]:
+        tokens = self.tokens
+        keyword_token_types = Scanner.KEYWORD_TOKEN_TYPES
+        operator_token_types = FastScanner.OPERATOR_TOKEN_TYPES
+        intern = sys.intern
+        identifier, operator, newlines, number, string, unexpected = (
+            FastScanner.IDENTIFIER, FastScanner.OPERATOR, FastScanner.NEWLINES,
+            FastScanner.NUMBER, FastScanner.STRING, FastScanner.UNEXPECTED
+        )
+        line = self.line
+        for match in FastScanner.TOKEN_PATTERN.finditer(self.source):
+            kind = match.lastindex
+            text = match.group(kind)
+            if kind == identifier:
+                tokens.append(Token(keyword_token_types.get(text, TokenType.IDENTIFIER), intern(text), None, line))
+            elif kind == operator:
+                tokens.append(Token(operator_token_types[text], text, None, line))
+            elif kind == newlines:
+                line += text.count('\n')
+            elif kind == number:
+                tokens.append(Token(TokenType.NUMBER, text, float(text), line))
+            elif kind == string:
+                line += text.count('\n')
+                if len(text) < 2 or text[-1] != '"':
+                    self.lox.error(line, '', 'Unterminated string literal.')
+                else:
+                    tokens.append(Token(TokenType.STRING, text, text[1:-1], line))
+            elif kind == unexpected:
+                self.lox.error(line, '', 'Unexpected character.')
+        self.line = line
+        tokens.append(Token(TokenType.EOF, "", None, line))
+        return tokens
+
+    def scan_from(self, position: int) -> Iterator[Tuple[Token, int, int]]:
+        """
+        Yields each token with its start and end offsets, beginning at a token boundary and ending with EOF.
+        Scanning resumes on self.line, so callers restarting mid-source set it to the line at position first.
+        """
+        source = self.source
+        keyword_token_types = Scanner.KEYWORD_TOKEN_TYPES
+        operator_token_types = FastScanner.OPERATOR_TOKEN_TYPES
+        for match in FastScanner.TOKEN_PATTERN.finditer(source, position):
+            kind = match.lastindex
+            text = match.group(kind)
+            if kind == FastScanner.IDENTIFIER:
+                token = Token(keyword_token_types.get(text, TokenType.IDENTIFIER), sys.intern(text), None, self.line)
+            elif kind == FastScanner.OPERATOR:
+                token = Token(operator_token_types[text], text, None, self.line)
+            elif kind == FastScanner.NUMBER:
+                token = Token(TokenType.NUMBER, text, float(text), self.line)
+            elif kind == FastScanner.STRING:
+                self.line += text.count('\n')
+                if len(text) < 2 or text[-1] != '"':
+                    self.lox.error(self.line, '', 'Unterminated string literal.')
+                    continue
+                token = Token(TokenType.STRING, text, text[1:-1], self.line)
+            else:
+                if kind == FastScanner.NEWLINES:
+                    self.line += text.count('\n')
+                elif kind == FastScanner.UNEXPECTED:
+                    self.lox.error(self.line, '', 'Unexpected character.')
+                continue
+            yield (token, *match.span(kind))
+        yield Token(TokenType.EOF, "", None, self.line), len(source), len(source)
@@ -0,0 +1,177 @@
+import inspect
+import marshal
+from array import array
+from typing import Dict, List, Sequence, get_origin
+
+from lox_token import Token
+from token_type import TokenType
+from expr import Expr, BinaryExpr, LogicalExpr, GroupingExpr, LiteralExpr, UnaryExpr, VariableExpr, AssignmentExpr
+from stmt import Stmt, ExpressionStmt, VarStmt, PrintStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+
+# kinds of node fields: a node (or None), a sequence of nodes, a token, or a literal value
+NODE, NODES, TOKEN, VALUE = range(4)
+
+
+def field_kinds(node_class: type) -> tuple:
+    """Returns the kinds of a node class's fields, in constructor order, from the annotations generate_ast wrote."""
+    kinds = []
+    for parameter in list(inspect.signature(node_class.__init__).parameters.values())[1:]:
+        annotation = parameter.annotation
+        if get_origin(annotation) is not None:
+            kinds.append(NODES)
+        elif annotation in (Expr, Stmt):
+            kinds.append(NODE)
+        elif annotation is Token:
+            kinds.append(TOKEN)
+        else:
+            kinds.append(VALUE)
+    return tuple(kinds)
+
+
+class FlatAst:
+    """A parsed program stored in parallel typed arrays indexed by node id, instead of as a graph of node objects."""
+    NODE_CLASSES = (
+        BinaryExpr, LogicalExpr, GroupingExpr, LiteralExpr, UnaryExpr, VariableExpr, AssignmentExpr,
+        ExpressionStmt, VarStmt, PrintStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+    )
+    CODES = {node_class: code for code, node_class in enumerate(NODE_CLASSES)}
+    FIELDS = tuple(tuple(zip(node_class.__match_args__, field_kinds(node_class))) for node_class in NODE_CLASSES)
+    TOKEN_TYPES = {token_type.value: token_type for token_type in TokenType}
+    # whether the child ids of the nodes of each code are stored in block_items
+    WIDE = tuple(sum(kind == NODE for _, kind in fields) > 3 for fields in FIELDS)
+
+    def __init__(self):
+        # one entry per node, children before their parents, so building the nodes back takes a single linear pass
+        self.kinds = array('B')
+        # child ids (-1 for none); a block's statements are block_items[first:first + second], and a WIDE node's
+        # children are in block_items from first on
+        self.first = array('i')
+        self.second = array('i')
+        self.third = array('i')
+        # of the node's token, or for a block whether its statements were a tuple; tokens in a tree are operators and
+        # names, so their literals are not stored
+        self.token_types = array('B')
+        self.lines = array('i')
+        # into constants, which holds the lexemes of tokens and the values of literals
+        self.constant_indices = array('i')
+        self.block_items = array('i')
+        self.roots = array('i')
+        self.constants: List[object] = []
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @staticmethod
+    def from_statements(statements: Sequence[Stmt]) -> 'FlatAst':
+        flat = FlatAst()
+        codes, fields_of_code = FlatAst.CODES, FlatAst.FIELDS
+        kinds, first, second, third = flat.kinds, flat.first, flat.second, flat.third
+        token_types, lines, constant_indices = flat.token_types, flat.lines, flat.constant_indices
+        block_items, constants = flat.block_items, flat.constants
+        # the ids of the nodes already stored, by object identity, and of the constants, by type and value
+        node_ids: Dict[int, int] = {}
+        constant_ids: Dict[tuple, int] = {}
+        # a node is stored once all of its children are, when it comes off the stack the second time
+        stack = [(statement, False) for statement in reversed(statements)]
+        while stack:
+            node, children_stored = stack.pop()
+            if node is None or id(node) in node_ids:
+                continue
+            fields = fields_of_code[codes[type(node)]]
+            if not children_stored:
+                stack.append((node, True))
+                children = []
+                for name, kind in fields:
+                    if kind == NODE:
+                        children.append(getattr(node, name))
+                    elif kind == NODES:
+                        children.extend(getattr(node, name))
+                stack.extend((child, False) for child in reversed(children))
+                continue
+            code = codes[type(node)]
+            child_ids = [-1, -1, -1, -1] if FlatAst.WIDE[code] else [-1, -1, -1]
+            child_count = 0
+            token_type, line, constant = 0, 0, None
+            has_constant = False
+            for name, kind in fields:
+                value = getattr(node, name)
+                if kind == NODE:
+                    child_ids[child_count] = -1 if value is None else node_ids[id(value)]
+                    child_count += 1
+                elif kind == NODES:
+                    child_ids[0], child_ids[1] = len(block_items), len(value)
+                    block_items.extend(node_ids[id(statement)] for statement in value)
+                    token_type = type(value) is tuple
+                elif kind == TOKEN:
+                    token_type, line, constant, has_constant = value.type.value, value.line, value.lexeme, True
+                else:
+                    constant, has_constant = value, True
+            if has_constant:
+                # by type and repr, since 1.0 == True and -0.0 == 0.0 but they are different constants
+                key = (type(constant), repr(constant))
+                constant_index = constant_ids.get(key)
+                if constant_index is None:
+                    constant_index = constant_ids[key] = len(constants)
+                    constants.append(constant)
+                constant_indices.append(constant_index)
+            else:
+                constant_indices.append(-1)
+            if FlatAst.WIDE[code]:
+                start = len(block_items)
+                block_items.extend(child_ids)
+                child_ids = [start, -1, -1]
+            node_ids[id(node)] = len(kinds)
+            kinds.append(code)
+            first.append(child_ids[0])
+            second.append(child_ids[1])
+            third.append(child_ids[2])
+            token_types.append(token_type)
+            lines.append(line)
+        flat.roots.extend(node_ids[id(statement)] for statement in statements)
+        return flat
+
+    def to_statements(self) -> List[Stmt]:
+        """Builds the node objects back, as the adapter for everything (such as Interpreter) that visits Stmts."""
+        node_classes, fields_of_code, wide = FlatAst.NODE_CLASSES, FlatAst.FIELDS, FlatAst.WIDE
+        token_type_of, constants, block_items = FlatAst.TOKEN_TYPES, self.constants, self.block_items
+        columns = (self.first, self.second, self.third)
+        token_types, lines, constant_indices = self.token_types, self.lines, self.constant_indices
+        nodes = []
+        for node_id, code in enumerate(self.kinds):
+            arguments = []
+            child_count = 0
+            for _, kind in fields_of_code[code]:
+                if kind == NODE:
+                    if wide[code]:
+                        child_id = block_items[self.first[node_id] + child_count]
+                    else:
+                        child_id = columns[child_count][node_id]
+                    arguments.append(None if child_id < 0 else nodes[child_id])
+                    child_count += 1
+                elif kind == NODES:
+                    start = self.first[node_id]
+                    statements = [nodes[item] for item in block_items[start:start + self.second[node_id]]]
+                    arguments.append(tuple(statements) if token_types[node_id] else statements)
+                elif kind == TOKEN:
+                    arguments.append(Token(token_type_of[token_types[node_id]],
+                                           constants[constant_indices[node_id]], None, lines[node_id]))
+                else:
+                    arguments.append(constants[constant_indices[node_id]])
+            nodes.append(node_classes[code](*arguments))
+        return [nodes[root] for root in self.roots]
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps((
+            self.kinds.tobytes(), self.first.tobytes(), self.second.tobytes(), self.third.tobytes(),
+            self.token_types.tobytes(), self.lines.tobytes(), self.constant_indices.tobytes(),
+            self.block_items.tobytes(), self.roots.tobytes(), self.constants
+        ))
+
+    @staticmethod
+    def from_bytes(data: bytes) -> 'FlatAst':
+        flat = FlatAst()
+        *columns, flat.constants = marshal.loads(data)
+        for column, column_bytes in zip((flat.kinds, flat.first, flat.second, flat.third, flat.token_types, flat.lines,
+                                         flat.constant_indices, flat.block_items, flat.roots), columns):
+            column.frombytes(column_bytes)
+        return flat
@@ -0,0 +1,93 @@
+import sys
+from typing import Dict, Optional, Sequence
+
+from expr import Expr, BinaryExpr, LogicalExpr, GroupingExpr, LiteralExpr, UnaryExpr
+from stmt import Stmt
+from flat_ast import NODE, NODES, TOKEN, FlatAst
+from lazy_parser import LazyBlockStmt
+
+
+class HashConsing:
+    """Replaces identical subtrees of parsed statements that contain no variables with one shared node, in place."""
+    # what a name refers to depends on where it appears, so expressions of variables are not shared
+    SHAREABLE = (BinaryExpr, LogicalExpr, GroupingExpr, LiteralExpr, UnaryExpr)
+
+    def __init__(self):
+        # the shared node for each key; keys hold the ids of shared children, which the shared nodes keep alive
+        self.shared_nodes: Dict[tuple, Expr] = {}
+        self.node_count = 0
+        self.shared_count = 0
+        self.bytes_saved = 0
+
+    def share(self, statements: Sequence[Stmt]) -> Sequence[Stmt]:
+        """Shares the subtrees of statements, also with those of statements shared before, and returns them."""
+        codes, fields_of_code = FlatAst.CODES, FlatAst.FIELDS
+        shareable, shared_nodes = HashConsing.SHAREABLE, self.shared_nodes
+        # the node that replaces each node visited so far (itself if it is the first of its kind), or None if it
+        # cannot be shared, by object identity
+        replacements: Dict[int, Optional[Expr]] = {}
+        # the replaced nodes are kept alive until the end, so their ids are not reused while in replacements
+        replaced = []
+        stack = [(statement, False) for statement in reversed(statements)]
+        while stack:
+            node, children_visited = stack.pop()
+            if node is None or id(node) in replacements:
+                continue
+            if type(node) is LazyBlockStmt:
+                # shared once it is parsed
+                replacements[id(node)] = None
+                continue
+            fields = fields_of_code[codes[type(node)]]
+            if not children_visited:
+                stack.append((node, True))
+                for name, kind in fields:
+                    if kind == NODE:
+                        stack.append((getattr(node, name), False))
+                    elif kind == NODES:
+                        stack.extend((child, False) for child in reversed(getattr(node, name)))
+                continue
+            self.node_count += 1
+            can_share = type(node) in shareable
+            key = [type(node)]
+            for name, kind in fields:
+                value = getattr(node, name)
+                if kind == NODE:
+                    replacement = None if value is None else replacements[id(value)]
+                    if replacement is None:
+                        can_share = False
+                    else:
+                        if replacement is not value:
+                            setattr(node, name, replacement)
+                        key.append(id(replacement))
+                elif kind == TOKEN:
+                    # with the line, so a shared expression still reports runtime errors at its own line
+                    key.append((value.type, value.lexeme, value.line))
+                elif kind != NODES:
+                    # by repr, since 1.0 == True and -0.0 == 0.0 but they are different values
+                    key.append((type(value), repr(value)))
+            if not can_share:
+                replacements[id(node)] = None
+                continue
+            replacement = shared_nodes.setdefault(tuple(key), node)
+            replacements[id(node)] = replacement
+            if replacement is not node:
+                replaced.append(node)
+                self.shared_count += 1
+                self.bytes_saved += HashConsing.size_of(node)
+        return statements
+
+    def clear(self) -> None:
+        """Forgets the shared nodes, so later statements share only among themselves and earlier ones can be freed."""
+        self.shared_nodes.clear()
+
+    @staticmethod
+    def size_of(node: Expr) -> int:
+        """The memory freed when node is replaced, including its operator token but not its children."""
+        size = sys.getsizeof(node)
+        for name, kind in FlatAst.FIELDS[FlatAst.CODES[type(node)]]:
+            if kind == TOKEN:
+                token = getattr(node, name)
+                # tokens with __slots__, such as SourceToken, have no __dict__
+                attributes = getattr(token, '__dict__', None)
+                size += sys.getsizeof(token) + (0 if attributes is None else sys.getsizeof(attributes))
+        return size
@@ -0,0 +1,332 @@
+from abc import abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, MutableSequence, Optional, Sequence, Tuple
+
+from lox_token import Token
+from token_type import TokenType
+from fast_scanner import FastScanner
+from parser import Parser, ParserError
+from parallel_scanner import ScanErrors
+from stmt import Stmt
+
+# (first token, declaration, token count, keys of the declarations nested in it), keyed by id of the first token
+Span = Tuple[Token, Stmt, int, List[int]]
+
+
+class Chunk:
+    """A run of consecutive elements of a ChunkedSequence, which are read with the chunk's shift added."""
+    __slots__ = ('values', 'shift')
+
+    def __init__(self, values: MutableSequence, shift: int = 0):
+        self.values = values
+        self.shift = shift
+
+
+class ChunkedSequence(Sequence):
+    """A sequence kept in chunks, so a splice rebuilds only the chunks it touches and shifts the ones after it."""
+    CHUNK_SIZE = 1024
+
+    def __init__(self, values: Iterable = ()):
+        self.chunks: List[Chunk] = []
+        # the size of each chunk, and the index of its first element
+        self.sizes: List[int] = []
+        self.firsts: List[int] = []
+        self.length = 0
+        self.cached_chunk: Optional[Chunk] = None
+        self.cached_first = self.cached_stop = 0
+        self.splice(0, 0, list(values), 0)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int):
+        if self.cached_first <= index < self.cached_stop:
+            # the parser reads tokens in order, mostly from the same chunk
+            return self.read(self.cached_chunk, index - self.cached_first)
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        chunk_index = bisect_right(self.firsts, index) - 1
+        self.cached_chunk = chunk = self.chunks[chunk_index]
+        self.cached_first = first = self.firsts[chunk_index]
+        self.cached_stop = first + self.sizes[chunk_index]
+        return self.read(chunk, index - first)
+
+    @abstractmethod
+    def read(self, chunk: Chunk, index: int):
+        pass
+
+    @abstractmethod
+    def shifted(self, values: list, shift: int) -> list:
+        pass
+
+    @abstractmethod
+    def pack(self, values: list) -> Chunk:
+        """A chunk with no shift of its own over values."""
+
+    def unpack(self, chunk: Chunk, shift: int = 0) -> list:
+        return self.shifted(list(chunk.values), chunk.shift + shift)
+
+    def splice(self, start: int, stop: int, values: list, shift: int) -> None:
+        """Replaces the elements in [start, stop) with values and adds shift to every element after them."""
+        chunks, sizes, firsts = self.chunks, self.sizes, self.firsts
+        low = max(bisect_right(firsts, start) - 1, 0)
+        high = min(bisect_right(firsts, stop), len(chunks))
+        base = firsts[low] if chunks else 0
+        touched = [element for chunk in chunks[low:high] for element in self.unpack(chunk)]
+        elements = touched[:start - base] + values + self.shifted(touched[stop - base:], shift)
+        if len(elements) < ChunkedSequence.CHUNK_SIZE // 2 and high < len(chunks):
+            # merges the next chunk in, so edits do not leave many small chunks behind
+            elements += self.unpack(chunks[high], shift)
+            high += 1
+        piece_count = -(-len(elements) // ChunkedSequence.CHUNK_SIZE)
+        new_chunks = [self.pack(elements[len(elements) * i // piece_count:len(elements) * (i + 1) // piece_count])
+                      for i in range(piece_count)]
+        chunks[low:high] = new_chunks
+        sizes[low:high] = [len(chunk.values) for chunk in new_chunks]
+        if shift:
+            for chunk in chunks[low + piece_count:]:
+                chunk.shift += shift
+        firsts[low:] = accumulate(sizes[low:], initial=base)
+        self.length = firsts.pop()
+        self.cached_first = self.cached_stop = 0
+
+
+class ChunkedOffsets(ChunkedSequence):
+    """An increasing sequence of offsets, which edits shift."""
+
+    def read(self, chunk: Chunk, index: int) -> int:
+        return chunk.values[index] + chunk.shift
+
+    def shifted(self, values: list, shift: int) -> list:
+        return [value + shift for value in values] if shift else values
+
+    def pack(self, values: list) -> Chunk:
+        return Chunk(array('q', values))
+
+
+class DocumentToken(Token):
+    """A token of an IncrementalDocument, whose line is relative to the shift of its chunk of tokens."""
+    __slots__ = ('chunk', 'relative_line')
+
+    def __init__(self, token: Token):
+        self.type, self.lexeme, self.literal = token.type, token.lexeme, token.literal
+        self.chunk: Optional[Chunk] = None
+        self.relative_line = token.line
+
+    @property
+    def line(self) -> int:
+        return self.relative_line + self.chunk.shift
+
+
+class ChunkedTokens(ChunkedSequence):
+    """The tokens of an IncrementalDocument. Lines are shifted by chunk, so adding a line only touches the chunks."""
+
+    def read(self, chunk: Chunk, index: int) -> DocumentToken:
+        return chunk.values[index]
+
+    def shifted(self, values: list, shift: int) -> list:
+        if shift:
+            for token in values:
+                token.relative_line += shift
+        return values
+
+    def pack(self, values: list) -> Chunk:
+        chunk = Chunk(values)
+        for token in values:
+            token.chunk = chunk
+        return chunk
+
+
+class ChunkedText:
+    """The source of an IncrementalDocument, kept in pieces so an edit only copies the pieces it touches."""
+    PIECE_SIZE = 1 << 14
+
+    def __init__(self, text: str):
+        self.pieces: List[str] = []
+        # the offset of the first character of each piece
+        self.starts: List[int] = []
+        self.length = 0
+        self.replace(0, 0, text)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        return ''.join(self.pieces)
+
+    def slice(self, start: int, stop: int) -> str:
+        low = max(bisect_right(self.starts, start) - 1, 0)
+        high = bisect_right(self.starts, stop)
+        base = self.starts[low] if self.pieces else 0
+        return ''.join(self.pieces[low:high])[start - base:stop - base]
+
+    def replace(self, start: int, end: int, text: str) -> None:
+        pieces, starts = self.pieces, self.starts
+        low = max(bisect_right(starts, start) - 1, 0)
+        high = min(bisect_right(starts, end), len(pieces))
+        base = starts[low] if pieces else 0
+        touched = ''.join(pieces[low:high])
+        text = touched[:start - base] + text + touched[end - base:]
+        if len(text) < ChunkedText.PIECE_SIZE // 2 and high < len(pieces):
+            text += pieces[high]
+            high += 1
+        piece_count = -(-len(text) // ChunkedText.PIECE_SIZE)
+        pieces[low:high] = [text[len(text) * i // piece_count:len(text) * (i + 1) // piece_count]
+                            for i in range(piece_count)]
+        starts[low:] = accumulate(map(len, pieces[low:]), initial=base)
+        self.length = starts.pop()
+
+
+class IncrementalParser(Parser):
+    """Reuses the declarations of the previous parse whose tokens, and the token peeked after them, are untouched."""
+
+    def __init__(self, tokens: Sequence[Token], lox, spans: Dict[int, Span], damaged_start: int, damaged_end: int):
+        super().__init__(tokens, lox)
+        self.spans = spans
+        self.damaged_start = damaged_start
+        self.damaged_end = damaged_end
+        # every declaration produced or reused, with the declarations nested in it
+        self.recorded: Dict[int, Span] = {}
+        self.recorded_keys: List[int] = []
+        self.error_count = 0
+
+    def declaration(self) -> Stmt:
+        start = self.current
+        first_token = self.tokens[start]
+        key = id(first_token)
+        span = self.spans.get(key)
+        if span is not None and span[0] is first_token and \
+                (start + span[2] < self.damaged_start or start >= self.damaged_end):
+            self.current += span[2]
+            for reused_key in (key, *span[3]):
+                self.recorded[reused_key] = self.spans[reused_key]
+                self.recorded_keys.append(reused_key)
+            return span[1]
+        outer_keys, self.recorded_keys = self.recorded_keys, []
+        error_count = self.error_count
+        stmt = super().declaration()
+        nested_keys, self.recorded_keys = self.recorded_keys, outer_keys
+        if self.error_count == error_count:
+            self.recorded[key] = (first_token, stmt, self.current - start, nested_keys)
+            outer_keys.append(key)
+        outer_keys.extend(nested_keys)
+        return stmt
+
+    def error(self, token: Token, messge: str) -> ParserError:
+        self.error_count += 1
+        return super().error(token, messge)
+
+
+class IncrementalDocument:
+    """
+    Keeps the tokens and statements of an edited buffer up to date, re-scanning from an edit until the scan is back
+    in step with the old tokens and re-parsing only the declarations the edit touched.
+    """
+
+    def __init__(self, source: str, lox):
+        self.lox = lox
+        self.text = ChunkedText('')
+        self.tokens = ChunkedTokens([DocumentToken(Token(TokenType.EOF, "", None, 1))])
+        self.starts = ChunkedOffsets([0])
+        self.ends = ChunkedOffsets([0])
+        self.statements: List[Stmt] = []
+        # token index ranges [start, end) of each top-level statement
+        self.statement_starts = ChunkedOffsets()
+        self.statement_ends = ChunkedOffsets()
+        # every declaration that parsed without errors, and which of them belong to each top-level statement
+        self.spans: Dict[int, Span] = {}
+        self.statement_span_keys: List[List[int]] = []
+        self.edit(0, 0, source)
+
+    def edit(self, start: int, end: int, text: str) -> None:
+        """Replaces source[start:end] with text."""
+        damaged_start, removed_end, inserted_end = self.rescan(start, end, text)
+        self.reparse(damaged_start, removed_end, inserted_end)
+
+    @property
+    def source(self) -> str:
+        return str(self.text)
+
+    def rescan(self, start: int, end: int, text: str) -> Tuple[int, int, int]:
+        offset_delta = len(text) - (end - start)
+        line_delta = text.count('\n') - self.text.slice(start, end).count('\n')
+        self.text.replace(start, end, text)
+        # the last token ending before the edit cannot have been extended by it, so scanning resumes right after it
+        first = bisect_left(self.ends, start)
+        window_size = ChunkedText.PIECE_SIZE
+        while True:
+            scanned = self.scan_window(first, end, offset_delta, start + len(text) + window_size)
+            if scanned is not None:
+                break
+            window_size *= 4
+        new_tokens, new_starts, new_ends, synchronized, errors = scanned
+        for error in errors:
+            self.lox.error(*error)
+        self.tokens.splice(first, synchronized, new_tokens, line_delta)
+        self.starts.splice(first, synchronized, new_starts, offset_delta)
+        self.ends.splice(first, synchronized, new_ends, offset_delta)
+        return first, synchronized, first + len(new_tokens)
+
+    def scan_window(self, first: int, end: int, offset_delta: int, window_end: int) -> \
+            Optional[Tuple[List[DocumentToken], List[int], List[int], int, List[Tuple[int, str, str]]]]:
+        """
+        Scans from token first until it is back in step with the old tokens, or returns None if that does not happen
+        before window_end, where a token may have been cut short. Errors are returned, to be reported only once.
+        """
+        old_starts = self.starts
+        resume = self.ends[first - 1] if first > 0 else 0
+        window_end = min(window_end, len(self.text))
+        errors = ScanErrors()
+        scanner = FastScanner(self.text.slice(resume, window_end), errors)
+        scanner.line = self.tokens[first - 1].line if first > 0 else 1
+        new_tokens, new_starts, new_ends = [], [], []
+        for token, token_start, token_end in scanner.scan_from(0):
+            token_start += resume
+            token_end += resume
+            if token_end >= window_end and window_end < len(self.text):
+                return None
+            old_start = token_start - offset_delta
+            if old_start >= end:
+                # once a token starts where an old token started after the edit, the rest of the scan is unchanged
+                synchronized = bisect_left(old_starts, old_start, first)
+                if synchronized < len(old_starts) and old_starts[synchronized] == old_start:
+                    break
+            new_tokens.append(DocumentToken(token))
+            new_starts.append(token_start)
+            new_ends.append(token_end)
+        else:
+            synchronized = len(old_starts)
+        return new_tokens, new_starts, new_ends, synchronized, errors.errors
+
+    def reparse(self, damaged_start: int, removed_end: int, inserted_end: int) -> None:
+        token_delta = inserted_end - removed_end
+        old_starts, old_ends = self.statement_starts, self.statement_ends
+        # a statement ending right before the damage may have peeked at the first damaged token
+        first = bisect_left(old_ends, damaged_start)
+        parser = IncrementalParser(self.tokens, self.lox, self.spans, damaged_start, inserted_end)
+        parser.current = old_starts[first] if first < len(old_starts) else (old_ends[-1] if old_ends else 0)
+        statements, starts, ends, span_keys = [], [], [], []
+        synchronized = len(old_starts)
+        while not parser.is_at_end():
+            if parser.current >= inserted_end:
+                old_index = bisect_left(old_starts, parser.current - token_delta, first)
+                if old_index < len(old_starts) and old_starts[old_index] == parser.current - token_delta:
+                    synchronized = old_index
+                    break
+            starts.append(parser.current)
+            parser.recorded_keys = []
+            statements.append(parser.declaration())
+            span_keys.append(parser.recorded_keys)
+            ends.append(parser.current)
+        for keys in self.statement_span_keys[first:synchronized]:
+            for key in keys:
+                self.spans.pop(key, None)
+        self.spans.update(parser.recorded)
+        self.statement_span_keys[first:synchronized] = span_keys
+        self.statements[first:synchronized] = statements
+        old_starts.splice(first, synchronized, starts, token_delta)
+        old_ends.splice(first, synchronized, ends, token_delta)
@@ -1,26 +1,37 @@
-from typing import Sequence
+from typing import Optional, Sequence
 
-from token_type import TokenType
-from lox_token import Token
 from expr import ExprVisitor, Expr, LiteralExpr, GroupingExpr, UnaryExpr, BinaryExpr, VariableExpr, AssignmentExpr, \
     LogicalExpr
-from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt
-from environment import Environment
+from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from environment import Environment, BlockEnvironment
+from resolver import Resolver
 from runtime_exception import RuntimeException
+from parser import ParserError
+from operators import BINARY_OPERATORS, UNARY_OPERATORS, LOGICAL_OPERATORS, UNCHECKED_BINARY_OPERATORS, \
+    UNCHECKED_UNARY_OPERATORS
+from output_sink import OutputSink, StreamSink
+from rope import Rope
 
 
 class Interpreter(ExprVisitor, StmtVisitor):
 
-    def __init__(self, lox):
+    def __init__(self, lox, output: Optional[OutputSink] = None):
         self.lox = lox
-        self.environment = Environment()
+        self.output = StreamSink() if output is None else output
+        self.globals = Environment()
+        # the environment of the innermost running block, or the globals outside of any block
+        self.environment = self.globals
 
     def interpret(self, stmts: Sequence[Stmt]) -> None:
+        Resolver().resolve(stmts)
         try:
             for stmt in stmts:
                 self.execute(stmt)
         except RuntimeException as exception:
             self.lox.runtime_exception(exception)
+        except ParserError:
+            # a lazily parsed block had syntax errors, which were reported when it was parsed
+            pass
 
     def execute(self, stmt: Stmt) -> None:
         stmt.accept(self)
@@ -35,61 +46,29 @@ class Interpreter(ExprVisitor, StmtVisitor):
         return self.evaluate(expr.expression)
 
     def visit_unary_expr(self, expr: UnaryExpr) -> object:
-        operator = expr.operator
         operand = self.evaluate(expr.right)
-        match operator.type:
-            case TokenType.MINUS:
-                Interpreter.check_number_operand(operator, operand)
-                return -operand
-            case TokenType.BANG:
-                return not Interpreter.is_truthy(operand)
-            case _:
-                raise AssertionError('This case should not be reachable. Invalid operator for unary expression.')
+        handler = expr.handler
+        if handler is None:
+            operators = UNCHECKED_UNARY_OPERATORS.get(expr.operand_type, UNARY_OPERATORS)
+            handler = expr.handler = operators[expr.operator.type]
+        return handler(expr.operator, operand)
 
     def visit_binary_expr(self, expr: BinaryExpr) -> object:
-        operator = expr.operator
         left_operand = self.evaluate(expr.left)
         right_operand = self.evaluate(expr.right)
-
-        match operator.type:
-            case TokenType.PLUS:
-                Interpreter.validate_addition_operands(operator, left_operand, right_operand)
-                return left_operand + right_operand
-            case TokenType.MINUS:
-                Interpreter.check_number_operands(operator, left_operand, right_operand)
-                return left_operand - right_operand
-            case TokenType.STAR:
-                Interpreter.check_number_operands(operator, left_operand, right_operand)
-                return left_operand * right_operand
-            case TokenType.SLASH:
-                Interpreter.check_number_operands(operator, left_operand, right_operand)
-                return left_operand / right_operand
-            case TokenType.GREATER:
-                Interpreter.check_number_operands(operator, left_operand, right_operand)
-                return left_operand > right_operand
-            case TokenType.GREATER_EQUAL:
-                Interpreter.check_number_operands(operator, left_operand, right_operand)
-                return left_operand >= right_operand
-            case TokenType.LESS:
-                Interpreter.check_number_operands(operator, left_operand, right_operand)
-                return left_operand < right_operand
-            case TokenType.LESS_EQUAL:
-                Interpreter.check_number_operands(operator, left_operand, right_operand)
-                return left_operand <= right_operand
-            case TokenType.EQUAL_EQUAL:
-                return Interpreter.is_equal(left_operand, right_operand)
-            case TokenType.BANG_EQUAL:
-                return not Interpreter.is_equal(left_operand, right_operand)
-            case _:
-                raise AssertionError('This case should not be reachable. Invalid operator for binary exression.')
+        handler = expr.handler
+        if handler is None:
+            # operands whose type TypeInferrer proved are not checked
+            operators = UNCHECKED_BINARY_OPERATORS.get(expr.operand_type, BINARY_OPERATORS)
+            handler = expr.handler = operators[expr.operator.type]
+        return handler(expr.operator, left_operand, right_operand)
 
     def visit_logical_expr(self, expr: LogicalExpr) -> object:
         left = self.evaluate(expr.left)
-        if expr.operator.type == TokenType.OR:
-            return left if Interpreter.is_truthy(left) else self.evaluate(expr.right)
-        if expr.operator.type == TokenType.AND:
-            return left if not Interpreter.is_truthy(left) else self.evaluate(expr.right)
-        raise AssertionError('This case should not be reachable. Invalid operator for logical expression.')
+        handler = expr.handler
+        if handler is None:
+            handler = expr.handler = LOGICAL_OPERATORS[expr.operator.type]
+        return left if handler(left) else self.evaluate(expr.right)
 
     def visit_expression_stmt(self, stmt: ExpressionStmt) -> None:
         self.evaluate(stmt.expression)
@@ -104,30 +83,81 @@ class Interpreter(ExprVisitor, StmtVisitor):
         while self.is_truthy(self.evaluate(stmt.condition)):
             self.execute(stmt.body)
 
+    def visit_for_stmt(self, stmt: ForStmt) -> None:
+        previous_environment = self.environment
+        if stmt.slot_count:
+            self.environment = self.scope_environment(stmt)
+        try:
+            if stmt.initializer is not None:
+                stmt.initializer.accept(self)
+            condition, increment, body = stmt.condition, stmt.increment, stmt.body
+            while condition is None or Interpreter.is_truthy(condition.accept(self)):
+                body.accept(self)
+                if increment is not None:
+                    increment.accept(self)
+        finally:
+            self.environment = previous_environment
+
     def visit_print_stmt(self, stmt: PrintStmt) -> None:
         value = self.evaluate(stmt.expression)
-        print(self.stringify_value(value))
+        self.output.write_line(Interpreter.stringify_value(value))
 
     def visit_block_stmt(self, stmt: BlockStmt) -> None:
+        if stmt.slot_count is None:
+            # a lazily parsed block, parsed and resolved when it first runs
+            Resolver.resolve_lazy_block(stmt)
+        if not stmt.slot_count:
+            # declares nothing, so it runs in the enclosing environment
+            for statement in stmt.statements:
+                statement.accept(self)
+            return
         previous_environment = self.environment
-        self.environment = Environment(previous_environment)
+        self.environment = self.scope_environment(stmt)
         try:
             for statement in stmt.statements:
                 statement.accept(self)
         finally:
             self.environment = previous_environment
 
+    def scope_environment(self, stmt: BlockStmt | ForStmt) -> BlockEnvironment:
+        """The environment for a run of a block or for loop that declares variables, inside the current one."""
+        environment = stmt.environment
+        if environment is None or environment.enclosing is not self.environment:
+            # otherwise the last environment is reused, such as on each iteration of an enclosing loop: a scope cannot
+            # run again before it finishes and locals are always declared before they are read, so the values left
+            # from the last run are never seen
+            environment = stmt.environment = BlockEnvironment(self.environment, stmt.slot_count)
+        return environment
+
     def visit_var_stmt(self, stmt: VarStmt) -> None:
         value = self.evaluate(stmt.initializer) if stmt.initializer else None
-        self.environment.define(stmt.name.lexeme, value)
+        if stmt.slot is None:
+            self.globals.define(stmt.name.lexeme, value)
+        else:
+            self.environment.values[stmt.slot] = value
 
     def visit_assignment_expr(self, expr: AssignmentExpr) -> object:
         value = self.evaluate(expr.value)
-        self.environment.assign(expr.name, value)
+        hops = expr.hops
+        if hops is None:
+            self.globals.assign(expr.name, value)
+        else:
+            environment = self.environment
+            while hops:
+                environment = environment.enclosing
+                hops -= 1
+            environment.values[expr.slot] = value
         return value
 
     def visit_variable_expr(self, expr: VariableExpr) -> object:
-        return self.environment.get(expr.name)
+        hops = expr.hops
+        if hops is None:
+            return self.globals.get(expr.name)
+        environment = self.environment
+        while hops:
+            environment = environment.enclosing
+            hops -= 1
+        return environment.values[expr.slot]
 
     @staticmethod
     def is_truthy(value: object) -> bool:
@@ -138,32 +168,14 @@ class Interpreter(ExprVisitor, StmtVisitor):
         # like Lox, Python does not perform implicit conversion, so we can use '==' to test equality
         return value_a == value_b
 
-    @staticmethod
-    def check_number_operand(operator: Token, operand: object) -> None:
-        if type(operand) is not float:
-            raise RuntimeException(operator, 'Operand must be a number.')
-
-    @staticmethod
-    def check_number_operands(operator: Token, operand_a: object, operand_b) -> None:
-        if type(operand_a) is not float or type(operand_b) is not float:
-            raise RuntimeException(operator, 'Operands must be numbers.')
-
-    @staticmethod
-    def validate_addition_operands(operator: Token, operand_a: object, operand_b: object):
-        both_floats = type(operand_a) is float and type(operand_b) is float
-        both_strings = type(operand_a) is str and type(operand_b) is str
-        if not (both_floats or both_strings):
-            raise RuntimeException(operator, 'Operands must both be numbers or both be strings.')
-
     @staticmethod
     def stringify_value(value: object) -> str:
         if type(value) is float:
-            float_string = str(value)
-            if float_string.endswith('.0'):
-                return float_string[:-2]
-            return float_string
-        elif type(value) is str:
-            # calling str on value to silence type warning
+            # integral values up to 1e16 have a '.0' suffix, larger ones an exponent; slicing beats endswith
+            float_string = repr(value)
+            return float_string[:-2] if float_string[-2:] == '.0' else float_string
+        elif type(value) is str or type(value) is Rope:
+            # joins a Rope; calling str on a str also silences a type warning
             return str(value)
         elif type(value) is bool:
             return 'true' if value else 'false'
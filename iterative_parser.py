@@ -0,0 +1,173 @@
+from typing import List
+
+from lox_token import TokenType
+from expr import Expr, UnaryExpr, LiteralExpr, GroupingExpr, VariableExpr, AssignmentExpr
+from stmt import Stmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from parser import Parser, ParserError
+
+
+class IterativeParser(Parser):
+    """Parses like Parser but with explicit stacks instead of recursion, so nesting is limited only by memory."""
+    # frame kinds; a DECLARATION frame marks where a ParserError is caught and the parser synchronizes
+    DECLARATION, BLOCK, THEN_BRANCH, ELSE_BRANCH, WHILE_BODY, FOR_BODY = range(6)
+    # stands in for a statement that is still being parsed
+    PENDING = object()
+
+    def declaration(self) -> Stmt:
+        stack: List[list] = []
+        stmt = IterativeParser.PENDING
+        is_declaration = True
+        while True:
+            try:
+                if stmt is IterativeParser.PENDING:
+                    if is_declaration:
+                        stack.append([IterativeParser.DECLARATION])
+                    stmt = self.statement_start(stack, is_declaration)
+                    if stmt is IterativeParser.PENDING:
+                        is_declaration = stack[-1][0] == IterativeParser.BLOCK
+                        continue
+                # hand the completed statement to the frames waiting for it until one needs another statement
+                while stack:
+                    frame = stack[-1]
+                    kind = frame[0]
+                    if kind == IterativeParser.DECLARATION:
+                        stack.pop()
+                        if not stack:
+                            return stmt
+                    elif kind == IterativeParser.BLOCK:
+                        frame[1].append(stmt)
+                        if not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
+                            stmt, is_declaration = IterativeParser.PENDING, True
+                            break
+                        self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+                        stack.pop()
+                        stmt = BlockStmt(frame[1])
+                    elif kind == IterativeParser.THEN_BRANCH:
+                        if self.match(TokenType.ELSE):
+                            frame[0], frame[2] = IterativeParser.ELSE_BRANCH, stmt
+                            stmt, is_declaration = IterativeParser.PENDING, False
+                            break
+                        stack.pop()
+                        stmt = IfStmt(frame[1], stmt, None)
+                    elif kind == IterativeParser.ELSE_BRANCH:
+                        stack.pop()
+                        stmt = IfStmt(frame[1], frame[2], stmt)
+                    elif kind == IterativeParser.WHILE_BODY:
+                        stack.pop()
+                        stmt = WhileStmt(frame[1], stmt)
+                    else:
+                        stack.pop()
+                        stmt = ForStmt(frame[1], frame[2], frame[3], stmt)
+            except ParserError:
+                # like returning from the innermost declaration() that the error propagated to
+                while stack.pop()[0] != IterativeParser.DECLARATION:
+                    pass
+                self.synchronize()
+                stmt = None
+                if not stack:
+                    return stmt
+
+    def statement_start(self, stack: List[list], is_declaration: bool) -> Stmt:
+        """
+        Parses a statement (or declaration) that contains no statements, or the part of one before its first nested
+        statement, pushing a frame for it and returning PENDING.
+        """
+        if is_declaration and self.match(TokenType.VAR):
+            return self.var_declaration()
+        if self.match(TokenType.IF):
+            self.consume(TokenType.LEFT_PAREN, "Expect '(' atfer if.")
+            condition = self.expression()
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after if statement condition.")
+            stack.append([IterativeParser.THEN_BRANCH, condition, None])
+            return IterativeParser.PENDING
+        if self.match(TokenType.WHILE):
+            self.consume(TokenType.LEFT_PAREN, "Expect '(' before while statement condition.")
+            condition = self.expression()
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after while statement condition.")
+            stack.append([IterativeParser.WHILE_BODY, condition])
+            return IterativeParser.PENDING
+        if self.match(TokenType.FOR):
+            self.consume(TokenType.LEFT_PAREN, "Expect '(' after for keyword.")
+            initializer = None if self.match(TokenType.SEMICOLON) \
+                else self.var_declaration() if self.match(TokenType.VAR) \
+                else self.expression_statement()
+            condition = None if self.check(TokenType.SEMICOLON) else self.expression()
+            self.consume(TokenType.SEMICOLON, "Expect ';' after for loop condition.")
+            increment = None if self.check(TokenType.RIGHT_PAREN) else self.expression()
+            self.consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
+            stack.append([IterativeParser.FOR_BODY, initializer, condition, increment])
+            return IterativeParser.PENDING
+        if self.match(TokenType.PRINT):
+            return self.print_statement()
+        if self.match(TokenType.LEFT_BRACE):
+            if self.check(TokenType.RIGHT_BRACE) or self.is_at_end():
+                self.consume(TokenType.RIGHT_BRACE, "Expect '}' after block.")
+                return BlockStmt([])
+            stack.append([IterativeParser.BLOCK, []])
+            return IterativeParser.PENDING
+        return self.expression_statement()
+
+    def expression(self) -> Expr:
+        tokens = self.tokens
+        binary_operators = Parser.BINARY_OPERATORS
+        not_an_operator = Parser.NOT_AN_OPERATOR
+        unary_operators = Parser.UNARY_OPERATORS
+        literal_values = Parser.LITERAL_VALUES
+        # the left operands and (precedence, operator, expression class) of the binary operators awaiting their right
+        # operands, the targets of the assignments awaiting their values, and the unary operators awaiting their operand
+        operands, operators, targets, prefixes = [], [], [], []
+        # the state of each expression interrupted by an open parenthesis
+        groups = []
+        while True:
+            token = tokens[self.current]
+            token_type = token.type
+            while token_type in unary_operators:
+                prefixes.append(token)
+                self.current += 1
+                token = tokens[self.current]
+                token_type = token.type
+            if token_type == TokenType.NUMBER or token_type == TokenType.STRING:
+                operand = LiteralExpr(token.literal)
+            elif token_type == TokenType.IDENTIFIER:
+                operand = VariableExpr(token)
+            elif token_type in literal_values:
+                operand = LiteralExpr(literal_values[token_type])
+            elif token_type == TokenType.LEFT_PAREN:
+                self.current += 1
+                groups.append((operands, operators, targets, prefixes))
+                operands, operators, targets, prefixes = [], [], [], []
+                continue
+            else:
+                raise self.error(token, "Expect expression.")
+            self.current += 1
+            while True:
+                while prefixes:
+                    operand = UnaryExpr(operator=prefixes.pop(), right=operand)
+                operator = tokens[self.current]
+                precedence, expr_class = binary_operators.get(operator.type, not_an_operator)
+                # every level is left-associative, so operators binding at least as tightly take their right operand
+                while operators and operators[-1][0] >= precedence:
+                    _, left_operator, left_class = operators.pop()
+                    operand = left_class(left=operands.pop(), operator=left_operator, right=operand)
+                if precedence:
+                    self.current += 1
+                    operands.append(operand)
+                    operators.append((precedence, operator, expr_class))
+                    break
+                if operator.type == TokenType.EQUAL:
+                    self.current += 1
+                    targets.append(operand)
+                    break
+                # the innermost assignment is completed (and reports an invalid target) first
+                while targets:
+                    target = targets.pop()
+                    if type(target) is VariableExpr:
+                        operand = AssignmentExpr(target.name, operand)
+                    else:
+                        self.error(self.previous(), 'Identifier expected.')
+                        operand = target
+                if not groups:
+                    return operand
+                operands, operators, targets, prefixes = groups.pop()
+                self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+                operand = GroupingExpr(operand)
@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Sequence
+
+from lox_token import Token, TokenType
+from stmt import Stmt, BlockStmt
+from parser import Parser, ParserError
+
+
+class LazyBlockStmt(BlockStmt):
+    """A block whose statements are parsed from tokens[start:end] when first read; ParserError if that fails."""
+    __slots__ = ('parser', 'start', 'end', 'parsed', 'had_error', 'scopes')
+
+    def __init__(self, parser: 'LazyParser', start: int, end: int):
+        self.parser = parser
+        self.start = start
+        self.end = end
+        self.parsed: Optional[List[Stmt]] = None
+        self.had_error = False
+        self.slot_count = None
+        self.environment = None
+        # the names visible where the block appears, which Resolver resolves its statements with
+        self.scopes = None
+
+    @property
+    def statements(self) -> List[Stmt]:
+        if self.parsed is None:
+            self.parse()
+        if self.had_error:
+            raise ParserError()
+        return self.parsed
+
+    def parse(self) -> List[Stmt]:
+        lox = self.parser.lox
+        had_parser_error, lox.had_parser_error = lox.had_parser_error, False
+        self.parsed = self.parser.parse_block(self.start, self.end)
+        self.had_error = lox.had_parser_error
+        lox.had_parser_error = had_parser_error or self.had_error
+        if not self.had_error:
+            self.parsed = lox.prepare(self.parsed)
+        return self.parsed
+
+
+class LazyParser(Parser):
+    """Stores each block as a LazyBlockStmt, so syntax errors in blocks that never run are not reported."""
+
+    def __init__(self, tokens: Sequence[Token], lox, closing_braces: Optional[Dict[int, int]] = None):
+        super().__init__(tokens, lox)
+        # the index of the closing brace of each block, by the index of its opening brace
+        self.closing_braces = closing_braces
+
+    def block_statement(self) -> BlockStmt:
+        # a full check parses every block up front like Parser, and a cached program must be complete
+        if self.lox.full_check or self.lox.cache:
+            return super().block_statement()
+        if self.closing_braces is None:
+            self.closing_braces = LazyParser.match_braces(self.tokens)
+        end = self.closing_braces.get(self.current - 1)
+        if end is None:
+            # parsing the block eagerly reports the missing brace where Parser would
+            return super().block_statement()
+        start, self.current = self.current, end + 1
+        return LazyBlockStmt(self, start, end)
+
+    def parse_block(self, start: int, end: int) -> List[Stmt]:
+        parser = LazyParser(self.tokens, self.lox, self.closing_braces)
+        parser.current = start
+        statements = []
+        while parser.current < end:
+            statements.append(parser.declaration())
+        return statements
+
+    @staticmethod
+    def match_braces(tokens: Sequence[Token]) -> Dict[int, int]:
+        closing_braces = {}
+        open_braces = []
+        for index, token in enumerate(tokens):
+            token_type = token.type
+            if token_type == TokenType.LEFT_BRACE:
+                open_braces.append(index)
+            elif token_type == TokenType.RIGHT_BRACE and open_braces:
+                closing_braces[open_braces.pop()] = index
+        return closing_braces
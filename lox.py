@@ -1,39 +1,177 @@
 import sys
+from typing import Sequence, TextIO
+from argparse import ArgumentParser
 
 from lox_token import Token
 from token_type import TokenType
 from runtime_exception import RuntimeException
 from parser import Parser
+from iterative_parser import IterativeParser
+from lazy_parser import LazyParser
+from stmt import Stmt
 from scanner import Scanner
+from fast_scanner import FastScanner
+from mapped_scanner import MappedScanner
+from token_stream import TokenStreamScanner
+from parallel_scanner import ParallelScanner
+from streaming_scanner import StreamingScanner, StreamingTokens
+from program_cache import ProgramCache
+from hash_consing import HashConsing
+from optimizer import Optimizer
+from type_inferrer import TypeInferrer
 from interpreter import Interpreter
+from output_sink import StreamSink
+from closure_compiler import ClosureInterpreter
+from transpiler import TranspilingInterpreter
+from virtual_machine import BytecodeInterpreter
+
+
+class LoxArgumentParser(ArgumentParser):
+
+    def error(self, message: str):
+        self.print_usage(sys.stderr)
+        sys.exit(64)
 
 
 class Lox:
+    SCANNERS = {
+        'default': Scanner,
+        'fast': FastScanner,
+        'compact': TokenStreamScanner,
+        'parallel': ParallelScanner,
+    }
+    PARSERS = {
+        'default': Parser,
+        'iterative': IterativeParser,
+        'lazy': LazyParser,
+    }
+    ENGINES = {
+        'default': Interpreter,
+        'closure': ClosureInterpreter,
+        'python': TranspilingInterpreter,
+        'bytecode': BytecodeInterpreter,
+    }
+    # Lox has no functions, so only code nested deeper than the Python stack allows recurses until RecursionError
+    NESTING_ERROR = 'Nesting is too deep.'
 
-    def __init__(self):
-        self.interpreter = Interpreter(self)
+    def __init__(self, scanner: str = 'default', memory_map: bool = False, parser: str = 'default',
+                 cache: bool = False, hash_cons: bool = False, full_check: bool = False,
+                 stream: bool = False, engine: str = 'default', optimize: bool = False, flush: str = 'line'):
+        self.interpreter = Lox.ENGINES[engine](self, StreamSink(flush))
+        self.scanner_class = Lox.SCANNERS[scanner]
+        self.parser_class = Lox.PARSERS[parser]
+        self.memory_map = memory_map
+        self.cache = cache
+        self.hash_consing = HashConsing() if hash_cons else None
+        self.optimizer = Optimizer() if optimize else None
+        self.full_check = full_check
+        self.stream = stream
         self.had_parser_error = False
         self.had_runtime_exception = False
 
     def main(self) -> None:
-        file_name, command_line_args = sys.argv[0], sys.argv[1::]
-        if len(command_line_args) > 1:
-            print('Usage: plox [script]')
-            sys.exit(64)
-        elif len(command_line_args) == 1:
-            self.run_file(command_line_args[0])
+        arguments = Lox.parse_arguments(sys.argv[1:])
+        self.scanner_class = Lox.SCANNERS[arguments.scanner]
+        self.parser_class = Lox.PARSERS[arguments.parser]
+        self.interpreter = Lox.ENGINES[arguments.engine](self, StreamSink(arguments.flush))
+        self.memory_map = arguments.mmap
+        self.cache = arguments.cache
+        self.hash_consing = HashConsing() if arguments.hash_cons else None
+        self.optimizer = Optimizer() if arguments.optimize else None
+        self.full_check = arguments.check
+        self.stream = arguments.stream
+        if arguments.script is not None:
+            self.run_file(arguments.script)
+        elif self.stream:
+            self.run_stream(sys.stdin)
+            self.exit_if_failed()
         else:
             self.run_prompt()
 
+    @staticmethod
+    def parse_arguments(command_line_args):
+        argument_parser = LoxArgumentParser(prog='plox')
+        argument_parser.add_argument('script', nargs='?')
+        argument_parser.add_argument('--scanner', choices=Lox.SCANNERS, default='default')
+        argument_parser.add_argument('--parser', choices=Lox.PARSERS, default='default')
+        argument_parser.add_argument('--engine', choices=Lox.ENGINES, default='default')
+        argument_parser.add_argument('--flush', choices=StreamSink.FLUSH_POLICIES, default='line',
+                                     help='write printed lines to stdout as they are printed, in blocks, or at the end')
+        argument_parser.add_argument('--mmap', action='store_true', help='memory-map the script and scan it as bytes')
+        argument_parser.add_argument('--cache', action='store_true',
+                                     help='reuse and update the parsed script in __loxcache__')
+        argument_parser.add_argument('--hash-cons', action='store_true',
+                                     help='share identical constant subexpressions between the parsed statements')
+        argument_parser.add_argument('--optimize', action='store_true',
+                                     help='fold constant expressions, remove branches that never run and skip operand '
+                                          'checks for operands of proven types')
+        argument_parser.add_argument('--check', action='store_true',
+                                     help='with --parser lazy, parse every block before running the script')
+        argument_parser.add_argument('--stream', action='store_true',
+                                     help='run each declaration as soon as it is read from the script or stdin')
+        return argument_parser.parse_args(command_line_args)
+
     def run_file(self, file_path: str) -> None:
-        with open(file_path, 'r') as file:
-            source = file.read()
-        self.run(source)
+        if self.stream:
+            with open(file_path, 'r') as file:
+                self.run_stream(file)
+        elif self.cache:
+            self.run_cached(file_path)
+        elif self.memory_map:
+            # the mapping must outlive the run, since tokens decode their lexemes from it on demand
+            with open(file_path, 'rb') as file, MappedScanner.map_file(file) as source:
+                self.execute(self.parse(MappedScanner(source, self).scan_tokens()))
+        else:
+            with open(file_path, 'r') as file:
+                source = file.read()
+            self.run(source)
+        self.exit_if_failed()
+
+    def exit_if_failed(self) -> None:
         if self.had_parser_error:
             sys.exit(65)
         elif self.had_runtime_exception:
             sys.exit(70)
 
+    def run_cached(self, file_path: str) -> None:
+        cache = ProgramCache(file_path)
+        statements = cache.load()
+        if statements is not None:
+            statements = self.prepare(statements)
+        else:
+            with open(file_path, 'r') as file:
+                source = file.read()
+            statements = self.parse(self.scan(source))
+            if not self.had_parser_error:
+                cache.store(statements)
+        self.execute(statements)
+
+    def run_stream(self, stream: TextIO) -> None:
+        """Runs each declaration as soon as it is parsed, so memory does not grow with the length of the script."""
+        tokens = StreamingTokens(StreamingScanner(stream, self))
+        # a declaration's blocks run right after it is parsed, so parsing them lazily would gain nothing
+        parser = (Parser if self.parser_class is LazyParser else self.parser_class)(tokens, self)
+        while not parser.is_at_end():
+            try:
+                statement = parser.declaration()
+            except RecursionError:
+                self.error_from_token(parser.peek(), Lox.NESTING_ERROR)
+                return
+            # the parser looks back at most one token
+            tokens.discard_before(parser.current - 1)
+            if self.had_parser_error:
+                # the declarations before a syntax error have run; the rest are only parsed, to report their errors
+                continue
+            statements = self.prepare((statement,))
+            if self.hash_consing is not None:
+                # sharing nodes with earlier declarations would keep them all alive
+                self.hash_consing.clear()
+            if self.had_parser_error:
+                continue
+            self.interpret(statements)
+            if self.had_runtime_exception:
+                return
+
     def run_prompt(self) -> None:
         print("> ", end='', flush=True)
         while line := sys.stdin.readline().rstrip():
@@ -42,15 +180,54 @@ class Lox:
             self.had_parser_error = False
 
     def run(self, source: str) -> None:
-        scanner = Scanner(source, self)
-        tokens = scanner.scan_tokens()
-        parser = Parser(tokens, self)
-        statements = parser.parse()
+        # the tokens are only referenced while parsing, so they can be freed before execution starts
+        self.execute(self.parse(self.scan(source)))
+
+    def scan(self, source: str) -> Sequence[Token]:
+        return self.scanner_class(source, self).scan_tokens()
+
+    def parse(self, tokens: Sequence[Token]) -> Sequence[Stmt]:
+        parser = self.parser_class(tokens, self)
+        try:
+            statements = parser.parse()
+        except RecursionError:
+            self.error_from_token(parser.peek(), Lox.NESTING_ERROR)
+            return []
+        return self.prepare(statements)
+
+    def prepare(self, statements: Sequence[Stmt]) -> Sequence[Stmt]:
+        """Applies the selected optimizations to newly parsed statements."""
+        if self.had_parser_error:
+            # statements that failed to parse are None, and the program will not run
+            return statements
+        try:
+            if self.optimizer is not None:
+                statements = self.optimizer.optimize(statements)
+            if self.hash_consing is not None:
+                self.hash_consing.share(statements)
+            if self.optimizer is not None:
+                TypeInferrer().infer(statements)
+        except RecursionError:
+            self.nesting_error()
+            self.had_parser_error = True
+        return statements
+
+    def execute(self, statements: Sequence[Stmt]) -> None:
         if self.had_parser_error:
             return
-        self.interpreter.interpret(statements)
+        self.interpret(statements)
+
+    def interpret(self, statements: Sequence[Stmt]) -> None:
+        try:
+            self.interpreter.interpret(statements)
+        except RecursionError:
+            self.nesting_error()
+            self.had_runtime_exception = True
+        self.interpreter.output.flush()
 
     def report(self, line_number: int, where: str, message: str):
+        # what the program printed before comes first
+        self.interpreter.output.flush()
         print(f'[line {line_number}] Error {where}: {message}', file=sys.stderr)
         self.had_parser_error = True
 
@@ -61,7 +238,12 @@ class Lox:
         where = 'at end' if token.type == TokenType.EOF else f"at '{token.lexeme}'"
         self.report(token.line, where, message)
 
+    def nesting_error(self) -> None:
+        self.interpreter.output.flush()
+        print(f'Error: {Lox.NESTING_ERROR}', file=sys.stderr)
+
     def runtime_exception(self, exception: RuntimeException) -> None:
+        self.interpreter.output.flush()
         print(f'{exception}\n[line {exception.token.line}]', file=sys.stderr)
         self.had_runtime_exception = True
 
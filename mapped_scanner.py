@@ -0,0 +1,128 @@
+import mmap
+import re
+import sys
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Sequence
+
+from lox_token import Token
+from token_type import TokenType
+from scanner import Scanner
+from fast_scanner import FastScanner
+
+
+class SourceToken:
+    """A token that records where its lexeme starts in the source bytes and decodes it on first use."""
+    # not a Token, since Token instances carry a __dict__, which would cost more than the lexeme saves
+    __slots__ = ('type', 'source', 'start', 'line', 'decoded_lexeme')
+
+    def __init__(self, token_type: TokenType, source, start: int, line: int):
+        self.type = token_type
+        self.source = source
+        self.start = start
+        self.line = line
+        self.decoded_lexeme = None
+
+    @property
+    def lexeme(self) -> str:
+        if self.decoded_lexeme is None:
+            self.decoded_lexeme = sys.intern(MappedScanner.decode(MappedScanner.lexeme_at(self.source, self.start)))
+        return self.decoded_lexeme
+
+    @property
+    def literal(self) -> object:
+        if self.type == TokenType.NUMBER:
+            return float(MappedScanner.lexeme_at(self.source, self.start))
+        if self.type == TokenType.STRING:
+            return MappedScanner.decode(MappedScanner.lexeme_at(self.source, self.start)[1:-1])
+        return None
+
+    __eq__ = Token.__eq__
+    __repr__ = Token.__repr__
+
+
+class MappedScanner:
+    """Scans a script as bytes, typically a memory map of the file, into SourceTokens that reference it."""
+    # like run_file's text mode, the source is UTF-8 and '\r\n' or a lone '\r' count as a single newline
+    TOKEN_PATTERN = re.compile(
+        rb'[ \t]*+(?:'
+        rb'((?:\r\n?|\n)[ \t\r\n]*)'          # 1: newlines and the blanks around them
+        rb'|([A-Za-z_][A-Za-z_0-9.]*)'         # 2: identifiers and keywords
+        rb'|([!=<>]=?|[(){},.\-+;*]|/(?!/))'  # 3: operators (a '/' followed by '/' starts a comment)
+        rb'|([0-9][0-9.]*)'                    # 4: numbers
+        rb'|("[^"]*"?)'                        # 5: strings, possibly unterminated
+        rb'|(//[^\r\n]*)'                      # 6: comments
+        rb'|([\xc2-\xf4][\x80-\xbf]+|.))',     # 7: unexpected characters (a multi-byte UTF-8 sequence is one character)
+        re.DOTALL
+    )
+    NEWLINES, IDENTIFIER, OPERATOR, NUMBER, STRING, COMMENT, UNEXPECTED = range(1, 8)
+
+    KEYWORD_TOKEN_TYPES = {keyword.encode(): token_type for keyword, token_type in Scanner.KEYWORD_TOKEN_TYPES.items()}
+    OPERATOR_TOKEN_TYPES = {operator.encode(): token_type
+                            for operator, token_type in FastScanner.OPERATOR_TOKEN_TYPES.items()}
+
+    def __init__(self, source, lox):
+        self.source = source
+        self.line = 1
+        self.tokens = []
+        self.lox = lox
+
+    def scan_tokens(self) -> Sequence[Token]:
+        source = self.source
+        tokens = self.tokens
+        keyword_token_types = MappedScanner.KEYWORD_TOKEN_TYPES
+        operator_token_types = MappedScanner.OPERATOR_TOKEN_TYPES
+        identifier, operator, newlines, number, string, unexpected = (
+            MappedScanner.IDENTIFIER, MappedScanner.OPERATOR, MappedScanner.NEWLINES,
+            MappedScanner.NUMBER, MappedScanner.STRING, MappedScanner.UNEXPECTED
+        )
+        line = self.line
+        for match in MappedScanner.TOKEN_PATTERN.finditer(source):
+            kind = match.lastindex
+            if kind == identifier:
+                token_type = keyword_token_types.get(match.group(kind), TokenType.IDENTIFIER)
+                tokens.append(SourceToken(token_type, source, match.start(kind), line))
+            elif kind == operator:
+                tokens.append(SourceToken(operator_token_types[match.group(kind)], source, match.start(kind), line))
+            elif kind == newlines:
+                line += MappedScanner.count_newlines(match.group(kind))
+            elif kind == number:
+                tokens.append(SourceToken(TokenType.NUMBER, source, match.start(kind), line))
+            elif kind == string:
+                text = match.group(kind)
+                line += MappedScanner.count_newlines(text)
+                if len(text) < 2 or not text.endswith(b'"'):
+                    self.lox.error(line, '', 'Unterminated string literal.')
+                else:
+                    tokens.append(SourceToken(TokenType.STRING, source, match.start(kind), line))
+            elif kind == unexpected:
+                self.lox.error(line, '', 'Unexpected character.')
+        self.line = line
+        tokens.append(Token(TokenType.EOF, "", None, line))
+        return tokens
+
+    @staticmethod
+    def lexeme_at(source, start: int) -> bytes:
+        match = MappedScanner.TOKEN_PATTERN.match(source, start)
+        return match.group(match.lastindex)
+
+    @staticmethod
+    def count_newlines(text: bytes) -> int:
+        return text.count(b'\n') + text.count(b'\r') - text.count(b'\r\n')
+
+    @staticmethod
+    def decode(text: bytes) -> str:
+        return text.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+    @staticmethod
+    @contextmanager
+    def map_file(file: BinaryIO) -> Iterator[bytes | mmap.mmap]:
+        try:
+            source = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            yield b''
+            return
+        try:
+            yield source
+        finally:
+            source.close()
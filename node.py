@@ -0,0 +1,72 @@
+from typing import List
+
+
+class Text(str):
+    """Literal text in Node.__repr__'s work stack, as opposed to a value still to be formatted."""
+    __slots__ = ()
+
+
+class Node:
+    """Base class of the generated Expr and Stmt classes, comparing, hashing and formatting trees without recursion."""
+    __slots__ = ()
+    __match_args__ = ()
+
+    def __eq__(self, other) -> bool:
+        # pairs of nodes (or Nones) still to be compared
+        pending = [(self, other)]
+        pop = pending.pop
+        while pending:
+            left, right = pop()
+            if type(left) is not type(right):
+                return False
+            if left is not None and not left.equal_fields(right, pending):
+                return False
+        return True
+
+    def equal_fields(self, other, pending: list) -> bool:
+        """Compares the fields that are not nodes, appending pairs of the fields that are to pending."""
+        raise NotImplementedError
+
+    def __hash__(self) -> int:
+        keys = []
+        # nodes (or Nones) still to be hashed
+        pending = [self]
+        pop = pending.pop
+        while pending:
+            node = pop()
+            if node is None:
+                keys.append(None)
+            else:
+                keys.append(type(node))
+                keys.append(node.hash_fields(pending))
+        return hash(tuple(keys))
+
+    def hash_fields(self, pending: list) -> tuple:
+        """Returns the hashable fields that are not nodes, appending the fields that are to pending."""
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        parts: List[str] = []
+        stack = [self]
+        while stack:
+            value = stack.pop()
+            if type(value) is Text:
+                parts.append(value)
+            elif isinstance(value, Node):
+                fields = value.__match_args__
+                stack.append(Text(')'))
+                for i in range(len(fields) - 1, -1, -1):
+                    stack.append(getattr(value, fields[i]))
+                    stack.append(Text(f'{", " if i else ""}{fields[i]}='))
+                stack.append(Text(f'{type(value).__name__}('))
+            elif type(value) is list or type(value) is tuple:
+                opening, closing = ('[', ']') if type(value) is list else ('(', ',)' if len(value) == 1 else ')')
+                stack.append(Text(closing))
+                for i in range(len(value) - 1, -1, -1):
+                    stack.append(value[i])
+                    if i:
+                        stack.append(Text(', '))
+                stack.append(Text(opening))
+            else:
+                parts.append(f'{value}')
+        return ''.join(parts)
@@ -0,0 +1,139 @@
+from typing import Callable, Dict
+
+from token_type import TokenType
+from lox_token import Token
+from runtime_exception import RuntimeException
+from rope import Rope, concatenate
+
+# The handler of each operator, which checks the operand types and applies the operator in a single call.
+# Interpreter looks a node's handler up the first time it evaluates the node and keeps it on the node.
+
+NUMBERS_MESSAGE = 'Operands must be numbers.'
+
+
+def add(operator: Token, left: object, right: object) -> object:
+    left_type, right_type = type(left), type(right)
+    if left_type is float and right_type is float:
+        return left + right
+    if (left_type is str or left_type is Rope) and (right_type is str or right_type is Rope):
+        return concatenate(left, right)
+    raise RuntimeException(operator, 'Operands must both be numbers or both be strings.')
+
+
+def subtract(operator: Token, left: object, right: object) -> float:
+    if type(left) is float and type(right) is float:
+        return left - right
+    raise RuntimeException(operator, NUMBERS_MESSAGE)
+
+
+def multiply(operator: Token, left: object, right: object) -> float:
+    if type(left) is float and type(right) is float:
+        return left * right
+    raise RuntimeException(operator, NUMBERS_MESSAGE)
+
+
+def divide(operator: Token, left: object, right: object) -> float:
+    if type(left) is float and type(right) is float:
+        return left / right
+    raise RuntimeException(operator, NUMBERS_MESSAGE)
+
+
+def greater(operator: Token, left: object, right: object) -> bool:
+    if type(left) is float and type(right) is float:
+        return left > right
+    raise RuntimeException(operator, NUMBERS_MESSAGE)
+
+
+def greater_equal(operator: Token, left: object, right: object) -> bool:
+    if type(left) is float and type(right) is float:
+        return left >= right
+    raise RuntimeException(operator, NUMBERS_MESSAGE)
+
+
+def less(operator: Token, left: object, right: object) -> bool:
+    if type(left) is float and type(right) is float:
+        return left < right
+    raise RuntimeException(operator, NUMBERS_MESSAGE)
+
+
+def less_equal(operator: Token, left: object, right: object) -> bool:
+    if type(left) is float and type(right) is float:
+        return left <= right
+    raise RuntimeException(operator, NUMBERS_MESSAGE)
+
+
+def equal(operator: Token, left: object, right: object) -> bool:
+    # like Lox, Python does not perform implicit conversion, so we can use '==' to test equality
+    return left == right
+
+
+def not_equal(operator: Token, left: object, right: object) -> bool:
+    return left != right
+
+
+def negate(operator: Token, operand: object) -> float:
+    if type(operand) is float:
+        return -operand
+    raise RuntimeException(operator, 'Operand must be a number.')
+
+
+def logical_not(operator: Token, operand: object) -> bool:
+    return operand is None or operand is False
+
+
+# a logical operator's handler tells whether its left operand short-circuits it, in which case it is the result
+
+def or_short_circuits(left: object) -> bool:
+    return left is not None and left is not False
+
+
+def and_short_circuits(left: object) -> bool:
+    return left is None or left is False
+
+
+BINARY_OPERATORS: Dict[TokenType, Callable[[Token, object, object], object]] = {
+    TokenType.PLUS: add,
+    TokenType.MINUS: subtract,
+    TokenType.STAR: multiply,
+    TokenType.SLASH: divide,
+    TokenType.GREATER: greater,
+    TokenType.GREATER_EQUAL: greater_equal,
+    TokenType.LESS: less,
+    TokenType.LESS_EQUAL: less_equal,
+    TokenType.EQUAL_EQUAL: equal,
+    TokenType.BANG_EQUAL: not_equal,
+}
+
+UNARY_OPERATORS: Dict[TokenType, Callable[[Token, object], object]] = {
+    TokenType.MINUS: negate,
+    TokenType.BANG: logical_not,
+}
+
+LOGICAL_OPERATORS: Dict[TokenType, Callable[[object], bool]] = {
+    TokenType.OR: or_short_circuits,
+    TokenType.AND: and_short_circuits,
+}
+
+# The handlers of operators whose operands TypeInferrer proved are always of a type, by the type, which skip the checks.
+
+UNCHECKED_BINARY_OPERATORS: Dict[type, Dict[TokenType, Callable[[Token, object, object], object]]] = {
+    float: {
+        TokenType.PLUS: lambda operator, left, right: left + right,
+        TokenType.MINUS: lambda operator, left, right: left - right,
+        TokenType.STAR: lambda operator, left, right: left * right,
+        TokenType.SLASH: lambda operator, left, right: left / right,
+        TokenType.GREATER: lambda operator, left, right: left > right,
+        TokenType.GREATER_EQUAL: lambda operator, left, right: left >= right,
+        TokenType.LESS: lambda operator, left, right: left < right,
+        TokenType.LESS_EQUAL: lambda operator, left, right: left <= right,
+    },
+    str: {
+        TokenType.PLUS: lambda operator, left, right: concatenate(left, right),
+    },
+}
+
+UNCHECKED_UNARY_OPERATORS: Dict[type, Dict[TokenType, Callable[[Token, object], object]]] = {
+    float: {
+        TokenType.MINUS: lambda operator, operand: -operand,
+    },
+}
@@ -0,0 +1,182 @@
+from typing import List, Optional, Sequence
+
+from token_type import TokenType
+from expr import ExprVisitor, Expr, LiteralExpr, GroupingExpr, UnaryExpr, BinaryExpr, VariableExpr, AssignmentExpr, \
+    LogicalExpr
+from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from interpreter import Interpreter
+from lazy_parser import LazyBlockStmt
+
+
+class Optimizer(ExprVisitor, StmtVisitor):
+    """Folds constant operations and removes branches, loops and blocks that never run or declare nothing."""
+    NUMBER_OPERATIONS = {
+        TokenType.MINUS: lambda left, right: left - right,
+        TokenType.STAR: lambda left, right: left * right,
+        TokenType.SLASH: lambda left, right: left / right,
+        TokenType.GREATER: lambda left, right: left > right,
+        TokenType.GREATER_EQUAL: lambda left, right: left >= right,
+        TokenType.LESS: lambda left, right: left < right,
+        TokenType.LESS_EQUAL: lambda left, right: left <= right,
+    }
+
+    def __init__(self):
+        self.folded_count = 0
+        self.removed_count = 0
+
+    def optimize(self, stmts: Sequence[Stmt]) -> List[Stmt]:
+        optimized = []
+        for stmt in stmts:
+            stmt = stmt.accept(self)
+            if stmt is None:
+                continue
+            if Optimizer.declares_nothing(stmt):
+                self.removed_count += 1
+                optimized.extend(stmt.statements)
+            else:
+                optimized.append(stmt)
+        return optimized
+
+    def optimize_branch(self, stmt: Stmt) -> Optional[Stmt]:
+        """Optimizes a branch of an if statement or the body of a loop, which is a single statement."""
+        optimized = stmt.accept(self)
+        if optimized is None:
+            return None
+        if Optimizer.declares_nothing(optimized) and len(optimized.statements) == 1:
+            self.removed_count += 1
+            return optimized.statements[0]
+        return optimized
+
+    @staticmethod
+    def declares_nothing(stmt: Stmt) -> bool:
+        """Whether stmt is a parsed block without variable declarations of its own, so it needs no scope."""
+        return type(stmt) is BlockStmt and not any(type(statement) is VarStmt for statement in stmt.statements)
+
+    @staticmethod
+    def is_literal(expr: Expr) -> bool:
+        return type(expr) is LiteralExpr
+
+    def fold(self, value: object) -> LiteralExpr:
+        self.folded_count += 1
+        return LiteralExpr(value)
+
+    def visit_expression_stmt(self, stmt: ExpressionStmt) -> Optional[Stmt]:
+        stmt.expression = stmt.expression.accept(self)
+        if Optimizer.is_literal(stmt.expression):
+            self.removed_count += 1
+            return None
+        return stmt
+
+    def visit_print_stmt(self, stmt: PrintStmt) -> Stmt:
+        stmt.expression = stmt.expression.accept(self)
+        return stmt
+
+    def visit_var_stmt(self, stmt: VarStmt) -> Stmt:
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        return stmt
+
+    def visit_block_stmt(self, stmt: BlockStmt) -> Stmt:
+        if type(stmt) is LazyBlockStmt:
+            # optimized when it is parsed
+            return stmt
+        stmt.statements = self.optimize(stmt.statements)
+        return stmt
+
+    def visit_if_stmt(self, stmt: IfStmt) -> Optional[Stmt]:
+        stmt.condition = stmt.condition.accept(self)
+        if Optimizer.is_literal(stmt.condition):
+            self.removed_count += 1
+            if Interpreter.is_truthy(stmt.condition.value):
+                return stmt.if_branch.accept(self)
+            return None if stmt.else_branch is None else stmt.else_branch.accept(self)
+        stmt.if_branch = self.optimize_branch(stmt.if_branch) or BlockStmt([])
+        if stmt.else_branch is not None:
+            stmt.else_branch = self.optimize_branch(stmt.else_branch)
+        return stmt
+
+    def visit_while_stmt(self, stmt: WhileStmt) -> Optional[Stmt]:
+        stmt.condition = stmt.condition.accept(self)
+        if Optimizer.is_literal(stmt.condition) and not Interpreter.is_truthy(stmt.condition.value):
+            self.removed_count += 1
+            return None
+        stmt.body = self.optimize_branch(stmt.body) or BlockStmt([])
+        return stmt
+
+    def visit_for_stmt(self, stmt: ForStmt) -> Optional[Stmt]:
+        if stmt.initializer is not None:
+            stmt.initializer = stmt.initializer.accept(self)
+        if stmt.condition is not None:
+            stmt.condition = stmt.condition.accept(self)
+            if Optimizer.is_literal(stmt.condition):
+                if not Interpreter.is_truthy(stmt.condition.value):
+                    self.removed_count += 1
+                    if type(stmt.initializer) is VarStmt:
+                        # keeps the variable out of the enclosing scope
+                        return BlockStmt([stmt.initializer])
+                    return stmt.initializer
+                stmt.condition = None
+        if stmt.increment is not None:
+            stmt.increment = stmt.increment.accept(self)
+            if Optimizer.is_literal(stmt.increment):
+                stmt.increment = None
+        stmt.body = self.optimize_branch(stmt.body) or BlockStmt([])
+        return stmt
+
+    def visit_literal_expr(self, expr: LiteralExpr) -> Expr:
+        return expr
+
+    def visit_grouping_expr(self, expr: GroupingExpr) -> Expr:
+        expr.expression = expr.expression.accept(self)
+        if Optimizer.is_literal(expr.expression):
+            self.folded_count += 1
+            return expr.expression
+        return expr
+
+    def visit_variable_expr(self, expr: VariableExpr) -> Expr:
+        return expr
+
+    def visit_assignment_expr(self, expr: AssignmentExpr) -> Expr:
+        expr.value = expr.value.accept(self)
+        return expr
+
+    def visit_unary_expr(self, expr: UnaryExpr) -> Expr:
+        expr.right = expr.right.accept(self)
+        if not Optimizer.is_literal(expr.right):
+            return expr
+        value = expr.right.value
+        if expr.operator.type == TokenType.BANG:
+            return self.fold(not Interpreter.is_truthy(value))
+        if type(value) is float:
+            return self.fold(-value)
+        return expr
+
+    def visit_logical_expr(self, expr: LogicalExpr) -> Expr:
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if not Optimizer.is_literal(expr.left):
+            return expr
+        self.folded_count += 1
+        left_is_truthy = Interpreter.is_truthy(expr.left.value)
+        if left_is_truthy == (expr.operator.type == TokenType.OR):
+            return expr.left
+        return expr.right
+
+    def visit_binary_expr(self, expr: BinaryExpr) -> Expr:
+        expr.left = expr.left.accept(self)
+        expr.right = expr.right.accept(self)
+        if not Optimizer.is_literal(expr.left) or not Optimizer.is_literal(expr.right):
+            return expr
+        left, right, operator_type = expr.left.value, expr.right.value, expr.operator.type
+        if operator_type == TokenType.EQUAL_EQUAL:
+            return self.fold(Interpreter.is_equal(left, right))
+        if operator_type == TokenType.BANG_EQUAL:
+            return self.fold(not Interpreter.is_equal(left, right))
+        if operator_type == TokenType.PLUS:
+            if type(left) is type(right) and type(left) in (float, str):
+                return self.fold(left + right)
+            return expr
+        # an operation that would fail is left as it is, so it still fails when it runs
+        if type(left) is not float or type(right) is not float or (operator_type == TokenType.SLASH and right == 0):
+            return expr
+        return self.fold(Optimizer.NUMBER_OPERATIONS[operator_type](left, right))
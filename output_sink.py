@@ -0,0 +1,72 @@
+import sys
+from abc import ABC, abstractmethod
+from typing import List, Optional, TextIO
+
+
+class OutputSink(ABC):
+    """Where the lines a program prints go. Lox flushes the sink after each run and before reporting an error."""
+
+    @abstractmethod
+    def write_line(self, text: str) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+
+class StreamSink(OutputSink):
+    """Writes printed lines to a text stream, stdout by default, as often as its flush policy says."""
+    # 'line' writes each line as it is printed, like print(); 'size' buffers about buffer_size characters; 'end'
+    # buffers everything until the sink is flushed, at the end of the run
+    FLUSH_POLICIES = ('line', 'size', 'end')
+
+    def __init__(self, flush_policy: str = 'line', buffer_size: int = 1 << 16, stream: Optional[TextIO] = None):
+        if flush_policy not in StreamSink.FLUSH_POLICIES:
+            raise ValueError(f'Unknown flush policy {flush_policy!r}.')
+        self.flush_policy = flush_policy
+        self.buffer_size = buffer_size
+        # None writes to whatever sys.stdout is when the lines are written, so redirecting stdout still works
+        self.stream = stream
+        self.lines: List[str] = []
+        self.buffered_size = 0
+
+    def write_line(self, text: str) -> None:
+        if self.flush_policy == 'line':
+            (sys.stdout if self.stream is None else self.stream).write(text + '\n')
+            return
+        self.lines.append(text)
+        if self.flush_policy == 'size':
+            self.buffered_size += len(text) + 1
+            if self.buffered_size >= self.buffer_size:
+                self.write_buffered()
+
+    def write_buffered(self) -> None:
+        if self.lines:
+            self.lines.append('')
+            (sys.stdout if self.stream is None else self.stream).write('\n'.join(self.lines))
+            self.lines.clear()
+            self.buffered_size = 0
+
+    def flush(self) -> None:
+        self.write_buffered()
+        (sys.stdout if self.stream is None else self.stream).flush()
+
+
+class CollectingSink(OutputSink):
+    """Keeps the printed lines in memory, such as for embedding Lox or testing it."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def write_line(self, text: str) -> None:
+        self.lines.append(text)
+
+    def getvalue(self) -> str:
+        return ''.join(line + '\n' for line in self.lines)
+
+
+class NullSink(OutputSink):
+    """Discards the printed lines, so benchmarks measure the program without the cost of writing its output."""
+
+    def write_line(self, text: str) -> None:
+        pass
@@ -0,0 +1,92 @@
+import os
+import re
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from token_type import TokenType
+from token_stream import TokenStream, TokenStreamScanner
+
+# the source being scanned by a worker process, set once per worker so chunks are not pickled with every task
+worker_source = ''
+
+
+class ScanErrors:
+    """Stands in for Lox in worker processes, recording scan errors so the main process can report them in order."""
+
+    def __init__(self):
+        self.errors: List[Tuple[int, str, str]] = []
+
+    def error(self, line_number: int, where: str = '', message: str = '') -> None:
+        self.errors.append((line_number, where, message))
+
+
+def set_worker_source(source: str) -> None:
+    global worker_source
+    worker_source = source
+
+
+def scan_chunk(start: int, end: int) -> Tuple[array, array, array, array, List[Tuple[int, str, str]]]:
+    """Scans worker_source[start:end]; the lines of any errors are relative to the start of the chunk."""
+    errors = ScanErrors()
+    types, starts, ends = TokenStreamScanner(worker_source, errors).scan_columns(start, end)
+    return types, starts, ends, TokenStream.find_newlines(worker_source, start, end), errors.errors
+
+
+class ParallelScanner(TokenStreamScanner):
+    """Scans large sources in chunks split at newlines across a process pool, stitching them into one TokenStream."""
+    # a split right after a newline can only fall inside a multi-line string; comments are matched so that their
+    # quotes are not taken for the start of one
+    STRING_OR_COMMENT_PATTERN = re.compile(r'"[^"]*"?|//[^\n]*')
+
+    def __init__(self, source: str, lox, workers: Optional[int] = None, min_chunk_size: int = 1 << 20):
+        super().__init__(source, lox)
+        self.workers = workers or os.cpu_count() or 1
+        self.min_chunk_size = min_chunk_size
+
+    def scan_tokens(self) -> TokenStream:
+        source = self.source
+        splits = self.split_points()
+        if len(splits) <= 2:
+            return super().scan_tokens()
+        types, starts, ends, newline_offsets = array('B'), array('q'), array('q'), array('q')
+        with ProcessPoolExecutor(len(splits) - 1, initializer=set_worker_source, initargs=(source,)) as executor:
+            for chunk in executor.map(scan_chunk, splits[:-1], splits[1:]):
+                chunk_types, chunk_starts, chunk_ends, chunk_newline_offsets, errors = chunk
+                for line, where, message in errors:
+                    self.lox.error(line + len(newline_offsets), where, message)
+                types.extend(chunk_types)
+                starts.extend(chunk_starts)
+                ends.extend(chunk_ends)
+                newline_offsets.extend(chunk_newline_offsets)
+        self.line = len(newline_offsets) + 1
+        types.append(TokenType.EOF.value)
+        starts.append(len(source))
+        ends.append(len(source))
+        return TokenStream(source, types, starts, ends, newline_offsets)
+
+    def split_points(self) -> List[int]:
+        """Returns the chunk boundaries, including 0 and len(source); each inner boundary directly follows a newline."""
+        source = self.source
+        chunk_count = min(self.workers, len(source) // self.min_chunk_size)
+        if chunk_count <= 1:
+            return [0, len(source)]
+        # (start, end) of every string containing a newline, in order
+        multi_line_strings = [match.span() for match in ParallelScanner.STRING_OR_COMMENT_PATTERN.finditer(source)
+                              if match.group()[0] == '"' and '\n' in match.group()]
+        string_starts = [start for start, _ in multi_line_strings]
+        splits = [0]
+        for k in range(1, chunk_count):
+            split = source.find('\n', max(len(source) * k // chunk_count, splits[-1])) + 1
+            # the newline after a multi-line string may itself be inside the next one
+            while split and (string_index := bisect_right(string_starts, split - 1) - 1) >= 0 \
+                    and multi_line_strings[string_index][1] > split:
+                split = source.find('\n', multi_line_strings[string_index][1]) + 1
+            if split == 0:
+                break
+            if split > splits[-1]:
+                splits.append(split)
+        if splits[-1] < len(source):
+            splits.append(len(source))
+        return splits
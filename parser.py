@@ -2,7 +2,7 @@ from typing import Sequence
 
 from lox_token import Token, TokenType
 from expr import Expr, BinaryExpr, UnaryExpr, LiteralExpr, GroupingExpr, VariableExpr, AssignmentExpr, LogicalExpr
-from stmt import Stmt, PrintStmt, ExpressionStmt, VarStmt, BlockStmt, IfStmt, WhileStmt
+from stmt import Stmt, PrintStmt, ExpressionStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
 
 
 class ParserError(Exception):
@@ -10,11 +10,25 @@ class ParserError(Exception):
 
 
 class Parser:
-    EQUALITY_OPERATORS = (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL)
-    COMPARISON_OPERATORS = (TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL)
-    TERM_OPERATORS = (TokenType.PLUS, TokenType.MINUS)
-    FACTOR_OPERATORS = (TokenType.STAR, TokenType.SLASH)
+    # (precedence, expression class) of each binary operator, from loosest to tightest binding
+    BINARY_OPERATORS = {
+        TokenType.OR: (1, LogicalExpr),
+        TokenType.AND: (2, LogicalExpr),
+        TokenType.EQUAL_EQUAL: (3, BinaryExpr),
+        TokenType.BANG_EQUAL: (3, BinaryExpr),
+        TokenType.GREATER: (4, BinaryExpr),
+        TokenType.GREATER_EQUAL: (4, BinaryExpr),
+        TokenType.LESS: (4, BinaryExpr),
+        TokenType.LESS_EQUAL: (4, BinaryExpr),
+        TokenType.PLUS: (5, BinaryExpr),
+        TokenType.MINUS: (5, BinaryExpr),
+        TokenType.STAR: (6, BinaryExpr),
+        TokenType.SLASH: (6, BinaryExpr),
+    }
+    LOWEST_PRECEDENCE = 1
+    NOT_AN_OPERATOR = (0, None)
     UNARY_OPERATORS = (TokenType.MINUS, TokenType.BANG)
+    LITERAL_VALUES = {TokenType.TRUE: True, TokenType.FALSE: False, TokenType.NIL: None}
 
     TERMINATE_SYNCHRONIZE_TOKEN_TYPES = (
         TokenType.CLASS,
@@ -82,7 +96,7 @@ class Parser:
         body = self.statement()
         return WhileStmt(condition, body)
 
-    def for_statement(self) -> WhileStmt:
+    def for_statement(self) -> ForStmt:
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after for keyword.")
         initializer = None if self.match(TokenType.SEMICOLON) \
             else self.var_declaration() if self.match(TokenType.VAR) \
@@ -92,18 +106,7 @@ class Parser:
         increment = None if self.check(TokenType.RIGHT_PAREN) else self.expression()
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
         body = self.statement()
-        return Parser.desuagar_for_statement(initializer, condition, increment, body)
-
-    @staticmethod
-    def desuagar_for_statement(initializer: VarStmt | ExpressionStmt, condition: Expr, increment: Expr, body: Stmt) -> WhileStmt:
-        if increment is not None:
-            body = BlockStmt((body, ExpressionStmt(increment)))
-        if condition is None:
-            condition = LiteralExpr(True)
-        body = WhileStmt(condition, body)
-        if initializer is not None:
-            body = BlockStmt((initializer, body))
-        return body
+        return ForStmt(initializer, condition, increment, body)
 
     def block_statement(self) -> BlockStmt:
         statements = []
@@ -124,77 +127,60 @@ class Parser:
         return ExpressionStmt(value)
 
     def assignment(self) -> Expr:
-        expr = self.logical_or()
+        expr = self.binary(Parser.LOWEST_PRECEDENCE)
         if self.match(TokenType.EQUAL):
             value = self.assignment()
             if type(expr) is VariableExpr:
                 # we know expr is of typeVariableExpr and has a name attribute
                 return AssignmentExpr(expr.name, value)
             equals_token = self.previous()
-            self.lox.error_from_token(equals_token, 'Identifier expected.')
+            # reported, but not raised: the parser is not confused, so there is no need to synchronize
+            self.error(equals_token, 'Identifier expected.')
         return expr
 
-    def equality(self) -> Expr:
-        expr = self.comparison()
-        while self.match(*Parser.EQUALITY_OPERATORS):
-            expr = BinaryExpr(left=expr, operator=self.previous(), right=self.comparison())
-        return expr
-
-    def logical_or(self) -> Expr:
-        expr = self.logical_and()
-        while self.match(TokenType.OR):
-            expr = LogicalExpr(left=expr, operator=self.previous(), right=self.logical_and())
-        return expr
-
-    def logical_and(self) -> Expr:
-        expr = self.equality()
-        while self.match(TokenType.AND):
-            expr = LogicalExpr(left=expr, operator=self.previous(), right=self.equality())
-        return expr
-
-    def comparison(self) -> Expr:
-        expr = self.term()
-        while self.match(*Parser.COMPARISON_OPERATORS):
-            expr = BinaryExpr(left=expr, operator=self.previous(), right=self.term())
-        return expr
-
-    def term(self) -> Expr:
-        expr = self.factor()
-        while self.match(*Parser.TERM_OPERATORS):
-            expr = BinaryExpr(left=expr, operator=self.previous(), right=self.factor())
-        return expr
-
-    def factor(self) -> Expr:
+    def binary(self, min_precedence: int) -> Expr:
+        """Parses operands joined by binary or logical operators binding at least as tightly as min_precedence."""
         expr = self.unary()
-        while self.match(*Parser.FACTOR_OPERATORS):
-            expr = BinaryExpr(left=expr, operator=self.previous(), right=self.unary())
-        return expr
+        tokens = self.tokens
+        binary_operators = Parser.BINARY_OPERATORS
+        while True:
+            operator = tokens[self.current]
+            precedence, expr_class = binary_operators.get(operator.type, Parser.NOT_AN_OPERATOR)
+            if precedence < min_precedence:
+                return expr
+            self.current += 1
+            # every level is left-associative, so the right operand only takes operators binding more tightly
+            expr = expr_class(left=expr, operator=operator, right=self.binary(precedence + 1))
 
     def unary(self) -> Expr:
-        if self.match(*Parser.UNARY_OPERATORS):
-            return UnaryExpr(operator=self.previous(), right=self.unary())
+        operator = self.tokens[self.current]
+        if operator.type in Parser.UNARY_OPERATORS:
+            self.current += 1
+            return UnaryExpr(operator=operator, right=self.unary())
         return self.primary()
 
     def primary(self) -> Expr:
-        if self.match(TokenType.NUMBER, TokenType.STRING):
-            return LiteralExpr(self.previous().literal)
+        token = self.tokens[self.current]
+        token_type = token.type
+        if token_type == TokenType.NUMBER or token_type == TokenType.STRING:
+            self.current += 1
+            return LiteralExpr(token.literal)
 
-        if self.match(TokenType.IDENTIFIER):
-            return VariableExpr(self.previous())
+        if token_type == TokenType.IDENTIFIER:
+            self.current += 1
+            return VariableExpr(token)
 
-        if self.match(TokenType.TRUE):
-            return LiteralExpr(True)
-        if self.match(TokenType.FALSE):
-            return LiteralExpr(False)
-        if self.match(TokenType.NIL):
-            return LiteralExpr(None)
+        if token_type in Parser.LITERAL_VALUES:
+            self.current += 1
+            return LiteralExpr(Parser.LITERAL_VALUES[token_type])
 
-        if self.match(TokenType.LEFT_PAREN):
+        if token_type == TokenType.LEFT_PAREN:
+            self.current += 1
             expr = self.expression()
             self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
             return GroupingExpr(expr)
 
-        raise self.error(self.peek(), "Expect expression.")
+        raise self.error(token, "Expect expression.")
 
     def consume(self, token_type: TokenType, message: str) -> Token:
         if self.check(token_type):
@@ -0,0 +1,56 @@
+import hashlib
+import os
+import struct
+import sys
+import zlib
+from typing import Optional, Sequence
+
+from stmt import Stmt
+from flat_ast import FlatAst
+
+
+class ProgramCache:
+    """Caches a script's parsed statements as a compressed FlatAst in __loxcache__ next to it, like __pycache__."""
+    DIRECTORY = '__loxcache__'
+    MAGIC = b'LOXC'
+    # bump whenever the node classes or the parser's output change
+    VERSION = 4
+    # MAGIC, VERSION and the SHA-256 of the script, so a cached program is only used for the source it was parsed from
+    HEADER = struct.Struct('<4sH32s')
+
+    def __init__(self, file_path: str):
+        with open(file_path, 'rb') as file:
+            self.digest = hashlib.sha256(file.read()).digest()
+        directory, name = os.path.split(file_path)
+        self.path = os.path.join(directory, ProgramCache.DIRECTORY, f'{name}.{sys.implementation.cache_tag}.loxc')
+
+    def load(self) -> Optional[Sequence[Stmt]]:
+        """Returns the cached statements, or None if there are none for the script's current contents."""
+        try:
+            with open(self.path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        if data[:ProgramCache.HEADER.size] != self.header():
+            return None
+        try:
+            flat = FlatAst.from_bytes(zlib.decompress(memoryview(data)[ProgramCache.HEADER.size:]))
+        except (zlib.error, ValueError, EOFError, TypeError):
+            return None
+        return flat.to_statements()
+
+    def store(self, statements: Sequence[Stmt]) -> None:
+        data = self.header() + zlib.compress(FlatAst.from_statements(statements).to_bytes(), 1)
+        temporary_path = f'{self.path}.{os.getpid()}'
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temporary_path, 'wb') as file:
+                file.write(data)
+            # readers never see a partially written file
+            os.replace(temporary_path, self.path)
+        except OSError:
+            # like __pycache__, an unwritable cache is silently skipped
+            pass
+
+    def header(self) -> bytes:
+        return ProgramCache.HEADER.pack(ProgramCache.MAGIC, ProgramCache.VERSION, self.digest)
@@ -0,0 +1,129 @@
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from lox_token import Token
+from expr import ExprVisitor, Expr, LiteralExpr, GroupingExpr, UnaryExpr, BinaryExpr, VariableExpr, AssignmentExpr, \
+    LogicalExpr
+from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from lazy_parser import LazyBlockStmt
+
+
+class Resolver(ExprVisitor, StmtVisitor):
+    """Resolves each local variable to a number of hops up the chain of block environments and a slot in it."""
+
+    def __init__(self, scopes: Optional[List[Dict[str, int]]] = None):
+        # the slot of each name declared so far in each enclosing block, innermost last
+        self.scopes: List[Dict[str, int]] = [] if scopes is None else scopes
+        # nodes still to visit and (method, node) steps to take after visiting some, next last; visitors push onto it
+        # instead of recursing, so nesting is not limited by the Python stack
+        self.pending: List[Stmt | Expr | Tuple[Callable, Stmt | Expr]] = []
+
+    def resolve(self, stmts: Sequence[Stmt]) -> None:
+        self.pending.extend(reversed(stmts))
+        self.resolve_pending()
+
+    def resolve_pending(self) -> None:
+        pending = self.pending
+        while pending:
+            item = pending.pop()
+            if type(item) is tuple:
+                item[0](item[1])
+            else:
+                item.accept(self)
+
+    @staticmethod
+    def resolve_lazy_block(stmt: LazyBlockStmt) -> None:
+        """Parses and resolves a lazy block with the names that were visible where it appears."""
+        resolver = Resolver(stmt.scopes)
+        resolver.resolve_block(stmt)
+        resolver.resolve_pending()
+
+    def resolve_block(self, stmt: BlockStmt) -> None:
+        if not any(type(statement) is VarStmt for statement in stmt.statements):
+            # runs in the environment enclosing it, so it is not counted in hops
+            stmt.slot_count = 0
+        else:
+            self.scopes.append({})
+            self.pending.append((self.end_scope, stmt))
+        self.pending.extend(reversed(stmt.statements))
+
+    def end_scope(self, stmt: BlockStmt | ForStmt) -> None:
+        stmt.slot_count = len(self.scopes.pop())
+
+    def resolve_local(self, expr: VariableExpr | AssignmentExpr, name: Token) -> None:
+        lexeme = name.lexeme
+        scopes = self.scopes
+        for hops in range(len(scopes)):
+            slot = scopes[-1 - hops].get(lexeme)
+            if slot is not None:
+                expr.hops, expr.slot = hops, slot
+                return
+        expr.hops = expr.slot = None
+
+    def visit_block_stmt(self, stmt: BlockStmt) -> None:
+        if type(stmt) is LazyBlockStmt and stmt.parsed is None:
+            # resolved when it first runs; the names declared after it in enclosing blocks are not visible in it
+            stmt.scopes = [dict(scope) for scope in self.scopes]
+            return
+        self.resolve_block(stmt)
+
+    def visit_var_stmt(self, stmt: VarStmt) -> None:
+        # the initializer is evaluated before the name is declared, so it sees the enclosing declarations
+        self.pending.append((self.declare, stmt))
+        if stmt.initializer is not None:
+            self.pending.append(stmt.initializer)
+
+    def declare(self, stmt: VarStmt) -> None:
+        if self.scopes:
+            scope = self.scopes[-1]
+            # redeclaring a name in the same block reuses its slot
+            stmt.slot = scope.setdefault(stmt.name.lexeme, len(scope))
+        else:
+            stmt.slot = None
+
+    def visit_expression_stmt(self, stmt: ExpressionStmt) -> None:
+        self.pending.append(stmt.expression)
+
+    def visit_print_stmt(self, stmt: PrintStmt) -> None:
+        self.pending.append(stmt.expression)
+
+    def visit_if_stmt(self, stmt: IfStmt) -> None:
+        if stmt.else_branch is not None:
+            self.pending.append(stmt.else_branch)
+        self.pending += (stmt.if_branch, stmt.condition)
+
+    def visit_while_stmt(self, stmt: WhileStmt) -> None:
+        self.pending += (stmt.body, stmt.condition)
+
+    def visit_for_stmt(self, stmt: ForStmt) -> None:
+        # a variable declared by the initializer gets a scope of its own, which the whole loop runs in
+        if type(stmt.initializer) is VarStmt:
+            self.scopes.append({})
+            self.pending.append((self.end_scope, stmt))
+        else:
+            stmt.slot_count = 0
+        self.pending.extend(node for node in (stmt.body, stmt.increment, stmt.condition, stmt.initializer)
+                            if node is not None)
+
+    def visit_variable_expr(self, expr: VariableExpr) -> None:
+        self.resolve_local(expr, expr.name)
+
+    def visit_assignment_expr(self, expr: AssignmentExpr) -> None:
+        self.pending += ((self.resolve_assignment, expr), expr.value)
+
+    def resolve_assignment(self, expr: AssignmentExpr) -> None:
+        self.resolve_local(expr, expr.name)
+
+    def visit_literal_expr(self, expr: LiteralExpr) -> None:
+        pass
+
+    def visit_grouping_expr(self, expr: GroupingExpr) -> None:
+        self.pending.append(expr.expression)
+
+    def visit_unary_expr(self, expr: UnaryExpr) -> None:
+        self.pending.append(expr.right)
+
+    def visit_binary_expr(self, expr: BinaryExpr) -> None:
+        self.pending += (expr.right, expr.left)
+
+    def visit_logical_expr(self, expr: LogicalExpr) -> None:
+        self.pending += (expr.right, expr.left)
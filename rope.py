@@ -0,0 +1,56 @@
+from typing import List, Optional
+
+
+class Rope:
+    """
+    A Lox string built by concatenation, kept as pieces joined only when it is observed, so `s = s + piece;` in a
+    loop takes linear time. Scripts cannot tell a Rope from a str.
+    """
+    __slots__ = ('pieces', 'count', 'flat')
+
+    # concatenations shorter than this are cheap to copy, so they stay plain strs
+    MIN_LENGTH = 256
+
+    def __init__(self, pieces: List[str]):
+        # shared by every rope over a prefix of it, each reading only its first count pieces
+        self.pieces = pieces
+        self.count = len(pieces)
+        self.flat: Optional[str] = None
+
+    def append(self, piece: str) -> 'Rope':
+        pieces = self.pieces
+        if len(pieces) != self.count:
+            # a longer rope already extended the list past this one
+            return Rope([str(self), piece])
+        pieces.append(piece)
+        return Rope(pieces)
+
+    def __str__(self) -> str:
+        if self.flat is None:
+            pieces = self.pieces
+            self.flat = ''.join(pieces if len(pieces) == self.count else pieces[:self.count])
+            # later appends to this rope start from the joined string instead of rejoining every piece
+            self.pieces, self.count = [self.flat], 1
+        return self.flat
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is Rope:
+            other = str(other)
+        return str(self) == other
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __repr__(self) -> str:
+        return f'Rope({str(self)!r})'
+
+
+def concatenate(left: object, right: object) -> object:
+    """Concatenates two Lox strings, each a str or a Rope, returning a Rope once the result is long."""
+    if type(right) is Rope:
+        right = str(right)
+    if type(left) is Rope:
+        return left.append(right)
+    if len(left) + len(right) < Rope.MIN_LENGTH:
+        return left + right
+    return Rope([left, right])
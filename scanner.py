@@ -1,3 +1,4 @@
+import sys
 from typing import Sequence
 
 from lox_token import Token
@@ -116,7 +117,9 @@ class Scanner:
             self.advance()
         text = self.source[self.start:self.current]
         token_type = Scanner.KEYWORD_TOKEN_TYPES.get(text, TokenType.IDENTIFIER)
-        self.add_token(token_type)
+        # interned so every occurrence of a variable name is the same string object,
+        # which makes environment lookups an identity hit on an already hashed key
+        self.tokens.append(Token(token_type, sys.intern(text), None, self.line))
 
     def match_next(self, expected: str) -> bool:
         if self.is_at_end():
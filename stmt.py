@@ -1,15 +1,16 @@
 from abc import ABC, abstractmethod
 from typing import Iterable
 
+from node import Node
 from lox_token import Token
 from expr import Expr
 
 
-class Stmt(ABC):
+class Stmt(Node):
+    __slots__ = ()
 
-    @abstractmethod
     def accept(self, visitor):
-        pass
+        raise NotImplementedError
 
 
 class StmtVisitor(ABC):
@@ -38,8 +39,14 @@ class StmtVisitor(ABC):
     def visit_while_stmt(self, stmt):
         pass
 
+    @abstractmethod
+    def visit_for_stmt(self, stmt):
+        pass
+
 
 class ExpressionStmt(Stmt):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
 
     def __init__(self, expression: Expr):
         self.expression = expression
@@ -47,34 +54,39 @@ class ExpressionStmt(Stmt):
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_expression_stmt(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.expression == other.expression
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.expression, other.expression))
+        return True
 
-    def __repr__(self):
-        return f'ExpressionStmt(expression={self.expression})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.expression)
+        return ()
 
 
 class VarStmt(Stmt):
+    __slots__ = ('name', 'initializer', 'slot')
+    __match_args__ = ('name', 'initializer')
 
     def __init__(self, name: Token, initializer: Expr):
         self.name = name
         self.initializer = initializer
+        self.slot = None
 
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_var_stmt(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.name == other.name and self.initializer == other.initializer
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.initializer, other.initializer))
+        return self.name == other.name
 
-    def __repr__(self):
-        return f'VarStmt(name={self.name}, initializer={self.initializer})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.initializer)
+        return (self.name.lexeme,)
 
 
 class PrintStmt(Stmt):
+    __slots__ = ('expression',)
+    __match_args__ = ('expression',)
 
     def __init__(self, expression: Expr):
         self.expression = expression
@@ -82,33 +94,41 @@ class PrintStmt(Stmt):
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_print_stmt(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.expression == other.expression
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.expression, other.expression))
+        return True
 
-    def __repr__(self):
-        return f'PrintStmt(expression={self.expression})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.expression)
+        return ()
 
 
 class BlockStmt(Stmt):
+    __slots__ = ('statements', 'slot_count', 'environment')
+    __match_args__ = ('statements',)
 
     def __init__(self, statements: Iterable[Stmt]):
         self.statements = statements
+        self.slot_count = None
+        self.environment = None
 
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_block_stmt(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
+    def equal_fields(self, other, pending: list) -> bool:
+        if type(self.statements) is not type(other.statements) or len(self.statements) != len(other.statements):
             return False
-        return self.statements == other.statements
+        pending.extend(zip(self.statements, other.statements))
+        return True
 
-    def __repr__(self):
-        return f'BlockStmt(statements={self.statements})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.extend(self.statements)
+        return (len(self.statements),)
 
 
 class IfStmt(Stmt):
+    __slots__ = ('condition', 'if_branch', 'else_branch')
+    __match_args__ = ('condition', 'if_branch', 'else_branch')
 
     def __init__(self, condition: Expr, if_branch: Stmt, else_branch: Stmt):
         self.condition = condition
@@ -118,16 +138,22 @@ class IfStmt(Stmt):
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_if_stmt(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.condition == other.condition and self.if_branch == other.if_branch and self.else_branch == other.else_branch
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.condition, other.condition))
+        pending.append((self.if_branch, other.if_branch))
+        pending.append((self.else_branch, other.else_branch))
+        return True
 
-    def __repr__(self):
-        return f'IfStmt(condition={self.condition}, if_branch={self.if_branch}, else_branch={self.else_branch})'
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.condition)
+        pending.append(self.if_branch)
+        pending.append(self.else_branch)
+        return ()
 
 
 class WhileStmt(Stmt):
+    __slots__ = ('condition', 'body')
+    __match_args__ = ('condition', 'body')
 
     def __init__(self, condition: Expr, body: Stmt):
         self.condition = condition
@@ -136,10 +162,42 @@ class WhileStmt(Stmt):
     def accept(self, visitor: StmtVisitor):
         return visitor.visit_while_stmt(self)
 
-    def __eq__(self, other):
-        if type(self) != type(other):
-            return False
-        return self.condition == other.condition and self.body == other.body
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.condition, other.condition))
+        pending.append((self.body, other.body))
+        return True
+
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.condition)
+        pending.append(self.body)
+        return ()
+
 
-    def __repr__(self):
-        return f'WhileStmt(condition={self.condition}, body={self.body})'
+class ForStmt(Stmt):
+    __slots__ = ('initializer', 'condition', 'increment', 'body', 'slot_count', 'environment')
+    __match_args__ = ('initializer', 'condition', 'increment', 'body')
+
+    def __init__(self, initializer: Stmt, condition: Expr, increment: Expr, body: Stmt):
+        self.initializer = initializer
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+        self.slot_count = None
+        self.environment = None
+
+    def accept(self, visitor: StmtVisitor):
+        return visitor.visit_for_stmt(self)
+
+    def equal_fields(self, other, pending: list) -> bool:
+        pending.append((self.initializer, other.initializer))
+        pending.append((self.condition, other.condition))
+        pending.append((self.increment, other.increment))
+        pending.append((self.body, other.body))
+        return True
+
+    def hash_fields(self, pending: list) -> tuple:
+        pending.append(self.initializer)
+        pending.append(self.condition)
+        pending.append(self.increment)
+        pending.append(self.body)
+        return ()
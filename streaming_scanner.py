@@ -0,0 +1,60 @@
+from typing import List, TextIO
+
+from lox_token import Token
+from token_type import TokenType
+from fast_scanner import FastScanner
+from parallel_scanner import ParallelScanner
+
+
+class StreamingScanner:
+    """Scans a text stream with a FastScanner a line at a time, so only the current line is held in memory."""
+
+    def __init__(self, stream: TextIO, lox):
+        self.stream = stream
+        self.scanner = FastScanner('', lox)
+
+    def scan_line(self) -> List[Token]:
+        """Returns the tokens of the next line, ending with EOF once the stream is exhausted."""
+        source = self.stream.readline()
+        if not source:
+            return [Token(TokenType.EOF, '', None, self.scanner.line)]
+        position = 0
+        # a line that ends inside a string is scanned together with the following lines up to its closing quote
+        while True:
+            last_match = None
+            for last_match in ParallelScanner.STRING_OR_COMMENT_PATTERN.finditer(source, position):
+                pass
+            text = '' if last_match is None else last_match.group()
+            if not text.startswith('"') or (len(text) > 1 and text.endswith('"')):
+                break
+            more = self.stream.readline()
+            if not more:
+                # reported as unterminated
+                break
+            position = last_match.start()
+            source += more
+        scanner = self.scanner
+        scanner.source, scanner.tokens = source, []
+        tokens = scanner.scan_tokens()
+        tokens.pop()
+        return tokens
+
+
+class StreamingTokens:
+    """A StreamingScanner's tokens, scanned when first indexed, which discards those the parser no longer needs."""
+
+    def __init__(self, scanner: StreamingScanner):
+        self.scanner = scanner
+        self.tokens: List[Token] = []
+        # the index in the stream of self.tokens[0]
+        self.offset = 0
+
+    def __getitem__(self, index: int) -> Token:
+        position = index - self.offset
+        while position >= len(self.tokens):
+            self.tokens.extend(self.scanner.scan_line())
+        return self.tokens[position]
+
+    def discard_before(self, index: int) -> None:
+        del self.tokens[:index - self.offset]
+        self.offset = index
@@ -0,0 +1,68 @@
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+import tests.integration_tests.control_flow_test as control_flow_test
+import tests.integration_tests.declaration_and_assignment_test as declaration_and_assignment_test
+import tests.integration_tests.interpret_invalid_single_statement_test as interpret_invalid_single_statement_test
+import tests.integration_tests.interpret_valid_single_statement_test as interpret_valid_single_statement_test
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+# the integration tests, run again with the bytecode virtual machine
+
+
+class TestBytecodeControlFlow(control_flow_test.TestDeclarationAndAssignment):
+    LOX_OPTIONS = {'engine': 'bytecode'}
+
+
+class TestBytecodeDeclarationAndAssignment(declaration_and_assignment_test.TestDeclarationAndAssignment):
+    LOX_OPTIONS = {'engine': 'bytecode'}
+
+
+class TestBytecodeInterpretInvalidSingleStatement(
+        interpret_invalid_single_statement_test.TestInterpretInvalidSingleStatement):
+    LOX_OPTIONS = {'engine': 'bytecode'}
+
+
+class TestBytecodeInterpretValidSingleStatement(
+        interpret_valid_single_statement_test.TestInterpretValidSingleStatement):
+    LOX_OPTIONS = {'engine': 'bytecode'}
+
+
+class TestBytecodeEngine(TestCaseWithHelpers):
+    LOX_OPTIONS = {'engine': 'bytecode'}
+
+    def test_jumps(self):
+        source = 'var i = 0; while (i < 3) { if (i == 1) print "one"; else print i; i = i + 1; }'
+        self.assert_prints(source, ['0', 'one', '2'])
+
+    def test_logical_operators_leave_the_deciding_value(self):
+        self.assert_prints('print nil or "a"; print 1 and 2; print false and 1; print 1 or 2;',
+                           ['a', '2', 'false', '1'])
+
+    def test_locals_of_nested_and_sibling_blocks(self):
+        source = '{ var a = 1; { var b = 2; print a + b; } { var c = 3; a = c; } print a; }'
+        self.assert_prints(source, ['3', '3'])
+
+    def test_runtime_errors_report_lox_lines(self):
+        lox = Lox(engine='bytecode')
+        with redirect_stdout(StringIO()) as std_out, redirect_stderr(StringIO()) as std_err:
+            lox.run('print 1;\n{\n  var a = "a";\n  print a -\n    1;\n}')
+            lox.run('\n\nprint b;')
+        self.assertEqual('1\n', std_out.getvalue())
+        self.assertEqual('Operands must be numbers.\n[line 4]\nUndefined variable b.\n[line 3]\n', std_err.getvalue())
+
+    def test_globals_persist_between_runs(self):
+        lox = Lox(engine='bytecode')
+        with redirect_stdout(StringIO()) as std_out:
+            lox.run('var a = 1;')
+            lox.run('a = a + 1; print a;')
+        self.assertEqual('2\n', std_out.getvalue())
+
+    def test_lazy_blocks(self):
+        self.assert_prints('var a = 1; if (a > 0) { var b = a + 1; { print b; } }', '2', parser='lazy')
+
+
+if __name__ == '__main__':
+    unittest.main()
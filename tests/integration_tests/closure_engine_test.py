@@ -0,0 +1,62 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from lox import Lox
+import tests.integration_tests.control_flow_test as control_flow_test
+import tests.integration_tests.declaration_and_assignment_test as declaration_and_assignment_test
+import tests.integration_tests.interpret_invalid_single_statement_test as interpret_invalid_single_statement_test
+import tests.integration_tests.interpret_valid_single_statement_test as interpret_valid_single_statement_test
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+# the integration tests, run again with the closure compiling engine
+
+
+class TestClosureControlFlow(control_flow_test.TestDeclarationAndAssignment):
+    LOX_OPTIONS = {'engine': 'closure'}
+
+
+class TestClosureDeclarationAndAssignment(declaration_and_assignment_test.TestDeclarationAndAssignment):
+    LOX_OPTIONS = {'engine': 'closure'}
+
+
+class TestClosureInterpretInvalidSingleStatement(
+        interpret_invalid_single_statement_test.TestInterpretInvalidSingleStatement):
+    LOX_OPTIONS = {'engine': 'closure'}
+
+
+class TestClosureInterpretValidSingleStatement(interpret_valid_single_statement_test.TestInterpretValidSingleStatement):
+    LOX_OPTIONS = {'engine': 'closure'}
+
+
+class TestClosureEngine(TestCaseWithHelpers):
+    LOX_OPTIONS = {'engine': 'closure'}
+
+    def test_specialized_operations_on_locals(self):
+        source = '{ var a = 3; var b = 4; var s = "s"; print a + b; print a - b; print a < b; print s + s; }'
+        self.assert_prints(source, ['7', '-1', 'true', 'ss'])
+
+    def test_specialized_operations_with_constants(self):
+        self.assert_prints('{ var a = 3; print a * 2; print a >= 3; print "a" + "b"; }', ['6', 'true', 'ab'])
+
+    def test_specialized_operations_check_operands(self):
+        self.assert_prints_to_std_err('{ var a = 3; var s = "s"; print a + s; }')
+        self.assert_prints_to_std_err('{ var s = "s"; print s + 1; }')
+        self.assert_prints_to_std_err('{ var s = "s"; print s * 2; }')
+
+    def test_locals_in_enclosing_blocks(self):
+        self.assert_prints('{ var a = 1; { { a = a + 1; } print a; } }', '2')
+
+    def test_globals_persist_between_runs(self):
+        lox = Lox(engine='closure')
+        with redirect_stdout(StringIO()) as std_out:
+            lox.run('var a = 1;')
+            lox.run('a = a + 1; print a;')
+        self.assertEqual('2\n', std_out.getvalue())
+
+    def test_lazy_blocks(self):
+        self.assert_prints('var a = 1; if (a > 0) { var b = a + 1; { print b; } }', '2', parser='lazy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import ast
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from resolver import Resolver
+from transpiler import Transpiler
+import tests.integration_tests.control_flow_test as control_flow_test
+import tests.integration_tests.declaration_and_assignment_test as declaration_and_assignment_test
+import tests.integration_tests.interpret_invalid_single_statement_test as interpret_invalid_single_statement_test
+import tests.integration_tests.interpret_valid_single_statement_test as interpret_valid_single_statement_test
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+# the integration tests, run again with the transpiling engine
+
+
+class TestPythonControlFlow(control_flow_test.TestDeclarationAndAssignment):
+    LOX_OPTIONS = {'engine': 'python'}
+
+
+class TestPythonDeclarationAndAssignment(declaration_and_assignment_test.TestDeclarationAndAssignment):
+    LOX_OPTIONS = {'engine': 'python'}
+
+
+class TestPythonInterpretInvalidSingleStatement(
+        interpret_invalid_single_statement_test.TestInterpretInvalidSingleStatement):
+    LOX_OPTIONS = {'engine': 'python'}
+
+
+class TestPythonInterpretValidSingleStatement(interpret_valid_single_statement_test.TestInterpretValidSingleStatement):
+    LOX_OPTIONS = {'engine': 'python'}
+
+
+class TestPythonEngine(TestCaseWithHelpers):
+    LOX_OPTIONS = {'engine': 'python'}
+
+    def run_source(self, source: str) -> tuple[str, str]:
+        lox = Lox(engine='python')
+        with redirect_stdout(StringIO()) as std_out, redirect_stderr(StringIO()) as std_err:
+            lox.run(source)
+        return std_out.getvalue(), std_err.getvalue()
+
+    def test_runtime_errors_report_lox_lines(self):
+        std_out, std_err = self.run_source('print 1;\nvar a = "a";\n{\n  var b = 2;\n  print a - b;\n}\nprint 3;')
+        self.assertEqual('1\n', std_out)
+        self.assertEqual('Operands must be numbers.\n[line 5]\n', std_err)
+
+    def test_undefined_globals_report_lox_lines(self):
+        self.assertEqual(('', 'Undefined variable b.\n[line 2]\n'), self.run_source('var a;\na = b;'))
+        self.assertEqual(('', 'Undefined variable b.\n[line 2]\n'), self.run_source('var a;\nb = a;'))
+
+    def test_operands_are_evaluated_left_to_right(self):
+        self.assert_prints('{ var a = 1; print a + (a = 2); print (a = 3) * a; }', ['3', '9'])
+        self.assert_prints('var a = 1; print a + (a = 2); print -a - (a = 3);', ['3', '-5'])
+
+    def test_errors_are_reported_in_evaluation_order(self):
+        sources = {
+            'var b = nil; var c = 1; print b + c + 10 / "";': 'Operands must both be numbers or both be strings.',
+            '{ var b = nil; print b + "s" + -nil; }': 'Operands must both be numbers or both be strings.',
+            'var b = 1; print b + 1 + -nil;': 'Operand must be a number.',
+        }
+        for source, message in sources.items():
+            for engine in Lox.ENGINES:
+                with redirect_stderr(StringIO()) as std_err:
+                    Lox(engine=engine).run(source)
+                self.assertEqual(f'{message}\n[line 1]\n', std_err.getvalue(), (engine, source))
+
+    def test_strings_are_concatenated_inline_unless_appended_to_a_global(self):
+        lox = Lox(engine='python')
+        statements = lox.parse(lox.scan('var g = ""; { var s = ""; s = s + "ab"; g = g + s; }'))
+        Resolver().resolve(statements)
+        source = ast.unparse(Transpiler().transpile(statements))
+        # a local is extended in place by CPython, while a global becomes a Rope once long
+        self.assertIn("v1 = add(T[0], v1, 'ab') if type(v1) is not str else v1 + 'ab'", source)
+        self.assertIn("t3 = add(T[2], t2, v1) if type(t2) is not float or type(v1) is not float else t2 + v1", source)
+        self.assert_prints('var g = "g"; { var s = "a"; s = s + "b" + s; g = g + s; print g; }', 'gaba')
+        self.assert_prints('var g = "g"; { var s = "a"; s = s + "b" + s; g = g + s; print g; }', 'gaba', optimize=True)
+
+    def test_logical_operators_short_circuit(self):
+        self.assert_prints('var a = 1; print nil and (a = 2); print 1 or (a = 3); print a; print false or "b";',
+                           ['nil', '1', '1', 'b'])
+
+    def test_checks_on_constant_operands(self):
+        self.assert_prints('{ var s = "s"; print s + "t"; print 2 * 3 - 1; }', ['st', '5'])
+        self.assert_prints_to_std_err('print 1 + "a";')
+        self.assert_prints_to_std_err('{ var s = "s"; print s + 1; }')
+        self.assert_prints_to_std_err('print nil + nil;')
+
+    def test_folded_constants_compile_without_warnings(self):
+        self.assertEqual(('1\n', ''), self.run_source('if (-1) print 1; if (1 + 2) {} else print 2;'))
+
+    def test_while_with_logical_condition(self):
+        self.assert_prints('var i = 0; var j = 0; while (i < 3 and (j = j + 1) < 10) i = i + 1; print j;', '3')
+
+    def test_globals_persist_between_runs(self):
+        lox = Lox(engine='python')
+        with redirect_stdout(StringIO()) as std_out:
+            lox.run('var a = 1;')
+            lox.run('a = a + 1; print a;')
+        self.assertEqual('2\n', std_out.getvalue())
+
+    def test_more_nested_loops_than_python_allows(self):
+        loops = ''.join(f'for (var i{depth} = 0; i{depth} < 1; i{depth} = i{depth} + 1) ' for depth in range(21))
+        self.assert_prints(f'var n = 0; {loops}n = n + 1; print n; while (n < 3) n = n + 1; print n;', ['1', '3'])
+
+    def test_lazy_blocks(self):
+        self.assert_prints('var a = 1; if (a > 0) { var b = a + 1; { print b; } }', '2', parser='lazy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,13 +10,15 @@ from stmt import Stmt
 
 
 class TestCaseWithHelpers(unittest.TestCase):
+    # options every Lox in the test case is created with, so a subclass can rerun the tests with another engine
+    LOX_OPTIONS = {}
 
-    def assert_prints(self, source: str, expcted_std_out: str | List[str]):
+    def assert_prints(self, source: str, expcted_std_out: str | List[str], **lox_options):
         if type(expcted_std_out) is list:
             expcted_std_out = '\n'.join(expcted_std_out)
         with redirect_stdout(StringIO()) as std_out:
             with redirect_stderr(StringIO()) as std_err:
-                Lox().run(source)
+                Lox(**self.LOX_OPTIONS, **lox_options).run(source)
         self.assertEqual(
             expcted_std_out,
             std_out.getvalue().rstrip('\n'),
@@ -28,9 +30,9 @@ class TestCaseWithHelpers(unittest.TestCase):
             "Expected no error to be printed to std_err."
         )
 
-    def assert_prints_to_std_err(self, source: str):
+    def assert_prints_to_std_err(self, source: str, **lox_options):
         with redirect_stderr(StringIO()) as std_err:
-            Lox().run(source)
+            Lox(**self.LOX_OPTIONS, **lox_options).run(source)
         self.assertTrue(std_err.getvalue(), msg='Expected error to be printed to std_err.')
 
     def assert_print_expression(self, source: str, expcted_std_out: str):
@@ -0,0 +1,50 @@
+import unittest
+
+from lox import Lox
+from bytecode import OpCode, Chunk
+from virtual_machine import BytecodeInterpreter
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestBytecode(TestCaseWithHelpers):
+
+    def compile(self, source: str) -> Chunk:
+        lox = Lox()
+        return BytecodeInterpreter.compile(lox.parse(lox.scan(source)))
+
+    def test_disassemble(self):
+        chunk = self.compile('var a = 1;\nwhile (a < 3) {\n  var b = a;\n  a = b + 1;\n}')
+        self.assertEqual('0000    1 CONSTANT              0 1.0\n'
+                         '0002    | DEFINE_GLOBAL         1 \'a\'\n'
+                         '0004    2 GET_GLOBAL            1 \'a\'\n'
+                         '0006    | CONSTANT              2 3.0\n'
+                         '0008    | LESS\n'
+                         '0010    | POP_JUMP_IF_FALSE  -> 0028\n'
+                         '0012    3 GET_GLOBAL            1 \'a\'\n'
+                         '0014    | STORE_LOCAL           0\n'
+                         '0016    4 GET_LOCAL             0\n'
+                         '0018    | CONSTANT              0 1.0\n'
+                         '0020    | ADD\n'
+                         '0022    | SET_GLOBAL            1 \'a\'\n'
+                         '0024    | POP\n'
+                         '0026    | JUMP               -> 0004\n'
+                         '0028    | RETURN', chunk.disassemble())
+
+    def test_line_table_stores_runs(self):
+        chunk = self.compile('var a;\nprint a; print a;\n\nprint a;')
+        self.assertEqual([0, 4, 12], list(chunk.line_offsets))
+        self.assertEqual([1, 2, 4], list(chunk.lines))
+        self.assertEqual(2, chunk.line_at(10))
+
+    def test_sibling_blocks_share_frame_slots(self):
+        chunk = self.compile('{ var a; { var b; var c; } { var d; } }')
+        self.assertEqual(3, chunk.frame_size)
+
+    def test_code_is_widened_for_large_operands(self):
+        self.assertEqual('H', self.compile('print 1;').code.typecode)
+        chunk = Chunk([OpCode.JUMP, 70_000, OpCode.RETURN, 0], [], [0], [1], 0)
+        self.assertEqual('I', chunk.code.typecode)
+        self.assertEqual([OpCode.JUMP, 70_000, OpCode.RETURN, 0], list(chunk.code))
+
+if __name__ == '__main__':
+    unittest.main()
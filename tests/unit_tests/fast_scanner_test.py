@@ -0,0 +1,68 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from scanner import Scanner
+from fast_scanner import FastScanner
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestFastScanner(TestCaseWithHelpers):
+
+    def assert_scans_like_scanner(self, source: str):
+        with redirect_stderr(StringIO()) as expected_std_err:
+            expected_tokens = Scanner(source, Lox()).scan_tokens()
+        with redirect_stderr(StringIO()) as std_err:
+            tokens = FastScanner(source, Lox()).scan_tokens()
+        self.assertEqual(expected_tokens, tokens)
+        self.assertEqual(expected_std_err.getvalue(), std_err.getvalue())
+
+    def test_scan_tokens_matches_scanner(self):
+        self.assert_scans_like_scanner(
+            'var x = 3;\n'
+            'if (x <= 5) {\n'
+            '\tprint "x is small";  // trailing comment\n'
+            '} else { x = x / 2 * -1; }\n'
+            'while (!(x != 1.5) and x >= 0 or x == nil) x = x - 1;\n  '
+        )
+
+    def test_scan_tokens_comment_directly_after_operator(self):
+        self.assert_scans_like_scanner('print 1;// comment\nprint 2 +// comment\n3; print 4 / 2;')
+
+    def test_scan_tokens_comment_directly_after_each_operator(self):
+        for operator in ['(', ')', '{', '}', ',', '.', '-', '+', ';', '*', '!', '=', '<', '>', '!=', '==', '<=', '>=']:
+            self.assert_scans_like_scanner(f'print 1 {operator}//comment\nprint 2 {operator}//')
+
+    def test_scan_tokens_multi_line_string(self):
+        self.assert_scans_like_scanner('print "first\nsecond\n";\nprint x;')
+
+    def test_scan_tokens_comment_at_end_of_source(self):
+        self.assert_scans_like_scanner('print 1; // no newline after this comment')
+
+    def test_scan_tokens_blanks_at_end_of_source(self):
+        self.assert_scans_like_scanner('print 1;  \t')
+
+    def test_scan_tokens_trailing_blanks(self):
+        for source in [' ', '\t\r ', 'print 1;\n  \t', 'print 1;  \nprint 2;\t\r\n', 'print 1; // comment  \n  ']:
+            self.assert_scans_like_scanner(source)
+
+    def test_scan_from_matches_scan_tokens(self):
+        source = 'var a = 1;//comment\nprint a  ;\t\n  '
+        with redirect_stderr(StringIO()) as std_err:
+            tokens = [token for token, start, end in FastScanner(source, Lox()).scan_from(0)]
+        self.assertEqual(FastScanner(source, Lox()).scan_tokens(), tokens)
+        self.assertEqual('', std_err.getvalue())
+
+    def test_scan_tokens_dots_in_numbers_and_identifiers(self):
+        self.assert_scans_like_scanner('a.b 12. .5')
+
+    def test_scan_tokens_unexpected_characters(self):
+        self.assert_scans_like_scanner('var a = 1 @ 2;\n# é')
+
+    def test_scan_tokens_unterminated_string(self):
+        self.assert_scans_like_scanner('print "hello;\nprint 2;')
+
+
+if __name__ == '__main__':
+    unittest.main()
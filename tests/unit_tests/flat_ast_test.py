@@ -0,0 +1,91 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from lox import Lox
+from flat_ast import FlatAst
+from interpreter import Interpreter
+from iterative_parser import IterativeParser
+from expr import GroupingExpr, LiteralExpr
+from stmt import PrintStmt
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestFlatAst(TestCaseWithHelpers):
+    SOURCE = 'var a = 1;\n' \
+             'var b;\n' \
+             '{ var c = -a + 2 * (a - 3) / 4; b = c = "str"; }\n' \
+             'if (a >= 1 and !(b == nil) or false) print a; else print true;\n' \
+             'if (a != 2) print a;\n' \
+             'while (a < 3) a = a + 1;\n' \
+             'for (var i = 0; i < 2; i = i + 1) print i;\n' \
+             'for (;;) {}\n'
+
+    def parse(self, source: str):
+        lox = Lox()
+        return lox.parse(lox.scan(source))
+
+    def test_round_trip(self):
+        statements = self.parse(TestFlatAst.SOURCE)
+        rebuilt = FlatAst.from_statements(statements).to_statements()
+        self.assertEqual(statements, rebuilt)
+        # unlike ==, repr also tells lists and tuples apart
+        self.assertEqual(repr(statements), repr(rebuilt))
+
+    def test_round_trip_keeps_lines(self):
+        statements = self.parse(TestFlatAst.SOURCE)
+        rebuilt = FlatAst.from_statements(statements).to_statements()
+        self.assertEqual(6, rebuilt[5].condition.operator.line)
+
+    def test_bytes_round_trip(self):
+        statements = self.parse(TestFlatAst.SOURCE)
+        flat = FlatAst.from_statements(statements)
+        self.assertEqual(statements, FlatAst.from_bytes(flat.to_bytes()).to_statements())
+
+    def test_children_are_stored_before_their_parents(self):
+        flat = FlatAst.from_statements(self.parse(TestFlatAst.SOURCE))
+        for node_id, code in enumerate(flat.kinds):
+            if FlatAst.WIDE[code]:
+                start = flat.first[node_id]
+                for child_id in flat.block_items[start:start + 4]:
+                    self.assertLess(child_id, node_id)
+            elif FlatAst.NODE_CLASSES[code].__name__ != 'BlockStmt':
+                for column in (flat.first, flat.second, flat.third):
+                    self.assertLess(column[node_id], node_id)
+
+    def test_shared_nodes_are_stored_once(self):
+        one = LiteralExpr(1.0)
+        statements = [PrintStmt(one), PrintStmt(GroupingExpr(one))]
+        flat = FlatAst.from_statements(statements)
+        self.assertEqual(4, len(flat))
+        rebuilt = flat.to_statements()
+        self.assertEqual(statements, rebuilt)
+        self.assertIs(rebuilt[0].expression, rebuilt[1].expression.expression)
+
+    def test_equal_constants_of_different_types_are_kept_apart(self):
+        statements = [PrintStmt(LiteralExpr(1.0)), PrintStmt(LiteralExpr(True))]
+        rebuilt = FlatAst.from_statements(statements).to_statements()
+        self.assertIs(True, rebuilt[1].expression.value)
+
+    def test_round_trip_deeply_nested_expression(self):
+        depth = 10 * 1000
+        lox = Lox()
+        statements = IterativeParser(lox.scan(f'print {"(" * depth}1{")" * depth};'), lox).parse()
+        [statement] = FlatAst.from_statements(statements).to_statements()
+        expr = statement.expression
+        for _ in range(depth):
+            self.assertIsInstance(expr, GroupingExpr)
+            expr = expr.expression
+        self.assertEqual(1.0, expr.value)
+
+    def test_interpreter_runs_rebuilt_statements(self):
+        lox = Lox()
+        # the last statement of SOURCE loops forever
+        statements = FlatAst.from_statements(self.parse(TestFlatAst.SOURCE)[:-1]).to_statements()
+        with redirect_stdout(StringIO()) as std_out:
+            Interpreter(lox).interpret(statements)
+        self.assertEqual('1\n1\n0\n1\n', std_out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
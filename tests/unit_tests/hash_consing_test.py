@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from hash_consing import HashConsing
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestHashConsing(TestCaseWithHelpers):
+
+    def share(self, source: str):
+        lox = Lox()
+        hash_consing = HashConsing()
+        statements = lox.parse(lox.scan(source))
+        copy = lox.parse(lox.scan(source))
+        hash_consing.share(statements)
+        self.assertEqual(copy, statements)
+        return statements, hash_consing
+
+    def test_identical_literals_are_shared(self):
+        statements, hash_consing = self.share('print 1; print 1; print "a"; print "a";')
+        self.assertIs(statements[0].expression, statements[1].expression)
+        self.assertIs(statements[2].expression, statements[3].expression)
+        self.assertEqual(2, hash_consing.shared_count)
+        self.assertGreater(hash_consing.bytes_saved, 0)
+
+    def test_identical_constant_expressions_on_one_line_are_shared(self):
+        statements, _ = self.share('print -(2 * 3) + 1; print -(2 * 3) + 1;')
+        self.assertIs(statements[0].expression, statements[1].expression)
+
+    def test_operators_on_different_lines_are_not_shared(self):
+        statements, _ = self.share('print 2 * 3;\nprint 2 * 3;')
+        self.assertIsNot(statements[0].expression, statements[1].expression)
+        self.assertIs(statements[0].expression.left, statements[1].expression.left)
+
+    def test_literals_of_different_types_are_not_shared(self):
+        statements, _ = self.share('print 1; print true; print 0; print false;')
+        self.assertEqual([1.0, True, 0.0, False], [statement.expression.value for statement in statements])
+
+    def test_expressions_with_variables_are_not_shared(self):
+        statements, _ = self.share('var a = 1; { var a = 2; print a + 1; } print a + 1;')
+        first, second = statements[1].statements[1].expression, statements[2].expression
+        self.assertIsNot(first, second)
+        self.assertIsNot(first.left, second.left)
+        self.assertIs(first.right, second.right)
+
+    def test_subtrees_are_shared_across_calls(self):
+        lox = Lox()
+        hash_consing = HashConsing()
+        first = hash_consing.share(lox.parse(lox.scan('print 1;')))
+        second = hash_consing.share(lox.parse(lox.scan('print 1;')))
+        self.assertIs(first[0].expression, second[0].expression)
+
+    def test_streamed_declarations_are_shared_one_at_a_time(self):
+        lox = Lox(hash_cons=True)
+        with redirect_stdout(StringIO()) as std_out:
+            lox.run_stream(StringIO('print 1 + 2;\nprint (1 + 2) * (1 + 2);\n'))
+        self.assertEqual('3\n9\n', std_out.getvalue())
+        # only the second (1 + 2) of the second declaration is shared, and nothing is kept after it ran
+        self.assertEqual(4, lox.hash_consing.shared_count)
+        self.assertEqual({}, lox.hash_consing.shared_nodes)
+
+    def test_shared_program_runs_the_same(self):
+        source = 'var a = 0; while (a < 3) { print a * 2 + 1; a = a + 1; } print 2 * 3 + 1; print 2 * 3 + 1;'
+        self.assert_prints(source, ['1', '3', '5', '7', '7'], hash_cons=True)
+
+    def test_shared_expression_reports_runtime_errors_at_its_line(self):
+        with redirect_stdout(StringIO()) as std_out, redirect_stderr(StringIO()) as std_err:
+            Lox(hash_cons=True).run('print false and -"a";\nprint -"a";')
+        self.assertEqual('false\n', std_out.getvalue())
+        self.assertTrue(std_err.getvalue().endswith('[line 2]\n'))
+
+    def test_memory_mapped_tokens_are_shared(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.lox', delete=False) as file:
+            file.write(b'print 1 + 2; print 1 + 2;\n')
+        try:
+            lox = Lox(memory_map=True, hash_cons=True)
+            with redirect_stdout(StringIO()) as std_out:
+                lox.run_file(file.name)
+        finally:
+            os.remove(file.name)
+        self.assertEqual('3\n3\n', std_out.getvalue())
+        self.assertEqual(3, lox.hash_consing.shared_count)
+        self.assertGreater(lox.hash_consing.bytes_saved, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import random
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+from unittest.mock import patch
+
+from lox import Lox
+from scanner import Scanner
+from parser import Parser
+from incremental import IncrementalDocument, ChunkedSequence, ChunkedOffsets, ChunkedText
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestIncrementalDocument(TestCaseWithHelpers):
+    SOURCE = 'var a = 1;\n' \
+             'var b = "two\nlines";\n' \
+             '{\n' \
+             '  var c = a + 2;\n' \
+             '  if (c > 2) print c; else { print b; }\n' \
+             '  while (c < 10) c = c + 1;\n' \
+             '}\n' \
+             'for (var i = 0; i < 3; i = i + 1) print i; // loop\n' \
+             'print a * (b == nil);\n'
+
+    def assert_matches_full_parse(self, document: IncrementalDocument):
+        with redirect_stderr(StringIO()):
+            expected_tokens = Scanner(document.source, Lox()).scan_tokens()
+            expected_statements = Parser(expected_tokens, Lox()).parse()
+        self.assertEqual(expected_tokens, list(document.tokens))
+        self.assertEqual(expected_statements, document.statements)
+
+    def test_initial_parse(self):
+        document = IncrementalDocument(TestIncrementalDocument.SOURCE, Lox())
+        self.assert_matches_full_parse(document)
+
+    def test_edit_inside_block_reuses_untouched_statements(self):
+        document = IncrementalDocument(TestIncrementalDocument.SOURCE, Lox())
+        block, loop = document.statements[2], document.statements[3]
+        untouched_if = block.statements[1]
+        position = document.source.index('c + 1')
+        document.edit(position, position + 1, 'counter')
+        self.assert_matches_full_parse(document)
+        self.assertIs(loop, document.statements[3])
+        self.assertIsNot(block, document.statements[2])
+        self.assertIs(untouched_if, document.statements[2].statements[1])
+
+    def test_inserting_lines_updates_line_numbers(self):
+        document = IncrementalDocument(TestIncrementalDocument.SOURCE, Lox())
+        document.edit(0, 0, 'print 0;\n\n')
+        self.assert_matches_full_parse(document)
+
+    def test_random_edits_match_full_parse(self):
+        snippets = ['', ' ', '\n', 'x', '1', '"', '//', ';', '{', '}', '(', ')', 'var', 'print 5;', '= ', '+ 2']
+        generator = random.Random(7)
+        document = IncrementalDocument(TestIncrementalDocument.SOURCE, Lox())
+        with redirect_stderr(StringIO()):
+            for _ in range(300):
+                start = generator.randrange(len(document.source) + 1)
+                end = min(len(document.source), start + generator.choice((0, 0, 1, 3)))
+                document.edit(start, end, generator.choice(snippets))
+                self.assert_matches_full_parse(document)
+
+    def test_random_edits_across_chunks_match_full_parse(self):
+        generator = random.Random(11)
+        with patch.object(ChunkedSequence, 'CHUNK_SIZE', 4), patch.object(ChunkedText, 'PIECE_SIZE', 8), \
+                redirect_stderr(StringIO()):
+            document = IncrementalDocument(TestIncrementalDocument.SOURCE * 3, Lox())
+            self.assertGreater(len(document.tokens.chunks), 10)
+            for _ in range(200):
+                start = generator.randrange(len(document.source) + 1)
+                end = min(len(document.source), start + generator.choice((0, 1, 3, 20)))
+                document.edit(start, end, generator.choice(['', '\n', 'x', '{', '}', '"', 'print 5;\n']))
+                self.assert_matches_full_parse(document)
+
+    def test_scan_errors_are_reported_once(self):
+        with patch.object(ChunkedText, 'PIECE_SIZE', 8):
+            document = IncrementalDocument(TestIncrementalDocument.SOURCE, Lox())
+            position = document.source.index('print a')
+            with redirect_stderr(StringIO()) as std_err:
+                document.edit(position, position, '"')
+        self.assertEqual('[line 11] Error : Unterminated string literal.\n', std_err.getvalue())
+        self.assert_matches_full_parse(document)
+
+    def test_chunked_offsets_splice(self):
+        generator = random.Random(3)
+        expected = list(range(0, 200, 2))
+        with patch.object(ChunkedSequence, 'CHUNK_SIZE', 8):
+            offsets = ChunkedOffsets(expected)
+            for _ in range(200):
+                start = generator.randrange(len(expected) + 1)
+                stop = min(len(expected), start + generator.randrange(12))
+                values, shift = [generator.randrange(100) for _ in range(generator.randrange(12))], \
+                    generator.randrange(-5, 6)
+                expected[start:] = values + [value + shift for value in expected[stop:]]
+                offsets.splice(start, stop, values, shift)
+                self.assertEqual(expected, list(offsets))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from parser import Parser
+from iterative_parser import IterativeParser
+from expr import GroupingExpr, AssignmentExpr, UnaryExpr
+from stmt import BlockStmt, IfStmt
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestIterativeParser(TestCaseWithHelpers):
+
+    def assert_parses_like_parser(self, source: str):
+        tokens = Lox().scan(source)
+        with redirect_stderr(StringIO()) as expected_std_err:
+            expected_statements = Parser(tokens, Lox()).parse()
+        with redirect_stderr(StringIO()) as std_err:
+            statements = IterativeParser(tokens, Lox()).parse()
+        self.assertEqual(expected_statements, statements)
+        self.assertEqual(expected_std_err.getvalue(), std_err.getvalue())
+
+    def test_parse_matches_parser(self):
+        self.assert_parses_like_parser(
+            'var a = 1;\n'
+            'var b = -(a + 2) * 3 >= 4 or !a and a == nil;\n'
+            '{ var c = a = b = "s"; { print c; } {} }\n'
+            'if (a) if (b) print 1; else { print 2; }\n'
+            'while (a < 10) a = a + 1;\n'
+            'for (var i = 0; i < 3; i = i + 1) { print i; }\n'
+            'for (;;) print 1;\n'
+        )
+
+    def test_parse_errors_match_parser(self):
+        self.assert_parses_like_parser(
+            'var = 1;\n'
+            '{ print 1 + ; var d = 2; }\n'
+            'if (a print 1; else print 2;\n'
+            'a + b = c;\n'
+            'while (true) { print (1 + 2; }\n'
+            'for (var i = 0 i < 3;) print i;\n'
+            '{ { print 1; }'
+        )
+
+    def test_deeply_nested_expressions(self):
+        depth = 10 * 1000
+        [statement] = IterativeParser(Lox().scan(f'{"(" * depth}{"a = " * depth}-1{")" * depth};'), Lox()).parse()
+        expr = statement.expression
+        for _ in range(depth):
+            self.assertIsInstance(expr, GroupingExpr)
+            expr = expr.expression
+        for _ in range(depth):
+            self.assertIsInstance(expr, AssignmentExpr)
+            expr = expr.value
+        self.assertIsInstance(expr, UnaryExpr)
+
+    def test_deeply_nested_statements(self):
+        depth = 10 * 1000
+        [statement] = IterativeParser(Lox().scan(f'{"{ if (a) " * depth}print 1;{" }" * depth}'), Lox()).parse()
+        for _ in range(depth):
+            self.assertIsInstance(statement, BlockStmt)
+            [statement] = statement.statements
+            self.assertIsInstance(statement, IfStmt)
+            statement = statement.if_branch
+
+    def test_nesting_too_deep_to_run_is_reported(self):
+        source = f'print 1; {"{ if (true) " * 5000}print 2;{" }" * 5000}'
+        for options, printed, failed in (
+                ({'parser': 'iterative'}, '1\n', 'had_runtime_exception'),
+                ({'parser': 'iterative', 'optimize': True}, '', 'had_parser_error'),
+                ({'parser': 'iterative', 'stream': True}, '1\n', 'had_runtime_exception')):
+            lox = Lox(**options)
+            with redirect_stdout(StringIO()) as std_out, redirect_stderr(StringIO()) as std_err:
+                if lox.stream:
+                    lox.run_stream(StringIO(source))
+                else:
+                    lox.run(source)
+            self.assertEqual(printed, std_out.getvalue(), options)
+            self.assertEqual('Error: Nesting is too deep.\n', std_err.getvalue(), options)
+            self.assertTrue(getattr(lox, failed), options)
+        # the recursive parser runs out of stack while parsing
+        lox = Lox()
+        with redirect_stderr(StringIO()) as std_err:
+            lox.run(source)
+        self.assertRegex(std_err.getvalue(), r"^\[line 1\] Error at '[^']+': Nesting is too deep.\n$")
+        self.assertTrue(lox.had_parser_error)
+
+    def test_run_with_iterative_parser(self):
+        self.assert_prints('var a = 1; { a = (a + 2) * 3; } print a;', '9', parser='iterative')
+
+
+if __name__ == '__main__':
+    unittest.main()
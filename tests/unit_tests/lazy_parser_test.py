@@ -0,0 +1,65 @@
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from lazy_parser import LazyParser, LazyBlockStmt
+from parser import Parser
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestLazyParser(TestCaseWithHelpers):
+    SOURCE = 'var a = 1;\n' \
+             'if (a > 2) { print "never"; { print a; } } else { print "ran"; { print a + 1; } }\n' \
+             'for (var i = 0; i < 2; i = i + 1) { print i; }\n' \
+             '{}\n'
+
+    def run_lox(self, source: str, **lox_options) -> tuple[str, str]:
+        with redirect_stdout(StringIO()) as std_out, redirect_stderr(StringIO()) as std_err:
+            Lox(parser='lazy', **lox_options).run(source)
+        return std_out.getvalue(), std_err.getvalue()
+
+    def test_blocks_are_parsed_on_first_use(self):
+        lox = Lox()
+        statements = LazyParser(lox.scan(TestLazyParser.SOURCE), lox).parse()
+        if_branch = statements[1].if_branch
+        self.assertIs(LazyBlockStmt, type(if_branch))
+        self.assertIsNone(if_branch.parsed)
+        self.assertEqual(2, len(if_branch.statements))
+        self.assertIs(LazyBlockStmt, type(if_branch.statements[1]))
+
+    def test_parsed_blocks_equal_eagerly_parsed_blocks(self):
+        lox = Lox()
+        tokens = lox.scan(TestLazyParser.SOURCE)
+        lazy_statements = repr(LazyParser(tokens, lox).parse()).replace('LazyBlockStmt', 'BlockStmt')
+        self.assertEqual(repr(Parser(tokens, lox).parse()), lazy_statements)
+
+    def test_runs_like_parser(self):
+        self.assertEqual(('ran\n2\n0\n1\n', ''), self.run_lox(TestLazyParser.SOURCE))
+
+    def test_errors_in_blocks_that_never_run_are_not_reported(self):
+        self.assertEqual(('ok\n', ''), self.run_lox('if (false) { var = 1; } print "ok";'))
+
+    def test_errors_are_reported_when_the_block_runs(self):
+        std_out, std_err = self.run_lox('print "before";\n{ print "block";\nvar = 1; }\nprint "after";')
+        self.assertEqual('before\n', std_out)
+        self.assertEqual("[line 3] Error at '=': Expected identifier after var.\n", std_err)
+
+    def test_full_check_reports_errors_before_running(self):
+        std_out, std_err = self.run_lox('print "before";\nif (false) { var = 1; }', full_check=True)
+        self.assertEqual('', std_out)
+        self.assertEqual("[line 2] Error at '=': Expected identifier after var.\n", std_err)
+
+    def test_unclosed_block_is_reported_while_parsing(self):
+        std_out, std_err = self.run_lox('print "before"; { print 1;')
+        self.assertEqual('', std_out)
+        self.assertEqual("[line 1] Error at end: Expect '}' after block.\n", std_err)
+
+    def test_lazily_parsed_blocks_are_hash_consed(self):
+        lox = Lox(parser='lazy', hash_cons=True)
+        statements = lox.parse(lox.scan('print 1; { print 1; }'))
+        self.assertIs(statements[0].expression, statements[1].statements[0].expression)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+
+from lox import Lox
+from scanner import Scanner
+from mapped_scanner import MappedScanner
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestMappedScanner(TestCaseWithHelpers):
+
+    def assert_scans_like_scanner(self, source: bytes):
+        with redirect_stderr(StringIO()) as expected_std_err:
+            expected_tokens = Scanner(MappedScanner.decode(source), Lox()).scan_tokens()
+        with redirect_stderr(StringIO()) as std_err:
+            tokens = MappedScanner(source, Lox()).scan_tokens()
+        self.assertEqual(expected_tokens, tokens)
+        self.assertEqual(expected_std_err.getvalue(), std_err.getvalue())
+
+    def test_scan_tokens_matches_scanner(self):
+        self.assert_scans_like_scanner(
+            b'var x = 3;\n'
+            b'if (x <= 5) { print "x is small"; } // comment\n'
+            b'while (!(x != 1.5) and x >= 0) x = x - 1;\n'
+        )
+
+    def test_scan_tokens_windows_and_old_mac_newlines(self):
+        self.assert_scans_like_scanner(b'var a = "one\r\ntwo";\r\nprint a;\rprint a;\r\n')
+
+    def test_scan_tokens_unexpected_characters(self):
+        self.assert_scans_like_scanner('var a = 1 @ 2;\n# é €'.encode())
+
+    def test_scan_tokens_blanks_at_end_of_source(self):
+        self.assert_scans_like_scanner(b'print 1;  \t')
+
+    def test_run_file_memory_mapped(self):
+        with tempfile.NamedTemporaryFile('wb', suffix='.lox', delete=False) as file:
+            file.write(b'var greeting = "hello";\nprint greeting + " world";\n')
+        try:
+            with redirect_stdout(StringIO()) as std_out:
+                Lox(memory_map=True).run_file(file.name)
+        finally:
+            os.remove(file.name)
+        self.assertEqual('hello world\n', std_out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from lox import Lox
+from lox_token import Token
+from token_type import TokenType
+from iterative_parser import IterativeParser
+from expr import BinaryExpr, GroupingExpr, LiteralExpr, VariableExpr
+from stmt import BlockStmt, ExpressionStmt, PrintStmt, VarStmt
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestNode(TestCaseWithHelpers):
+
+    def parse(self, source: str):
+        lox = Lox()
+        return IterativeParser(lox.scan(source), lox).parse()
+
+    def test_nodes_have_no_instance_dict(self):
+        expr = LiteralExpr(1.0)
+        self.assertFalse(hasattr(expr, '__dict__'))
+        with self.assertRaises(AttributeError):
+            expr.unknown = 1
+
+    def test_match_args(self):
+        match self.parse('a + 1;')[0]:
+            case ExpressionStmt(BinaryExpr(VariableExpr(name), operator, LiteralExpr(value))):
+                self.assertEqual(('a', TokenType.PLUS, 1.0), (name.lexeme, operator.type, value))
+            case _:
+                self.fail('pattern did not match')
+
+    def test_equal_trees_are_equal_and_hash_equally(self):
+        source = 'var a = 1; { print -a * (a + "s"); } if (a) print nil; else a = a - 1;'
+        first, second = self.parse(source), self.parse(source)
+        self.assertEqual(first, second)
+        self.assertEqual([hash(statement) for statement in first], [hash(statement) for statement in second])
+
+    def test_different_trees_are_not_equal(self):
+        self.assertNotEqual(self.parse('print 1 + 2;'), self.parse('print 1 + 3;'))
+        self.assertNotEqual(self.parse('print 1 + 2;'), self.parse('print 1 - 2;'))
+        self.assertNotEqual(self.parse('var a;'), self.parse('var a = nil;'))
+        self.assertNotEqual(BlockStmt([PrintStmt(LiteralExpr(1.0))]), BlockStmt((PrintStmt(LiteralExpr(1.0)),)))
+        self.assertNotEqual(LiteralExpr(1.0), GroupingExpr(LiteralExpr(1.0)))
+        self.assertNotEqual(LiteralExpr(None), None)
+
+    def test_repr(self):
+        statement = VarStmt(Token(TokenType.IDENTIFIER, 'a', None, 1), GroupingExpr(LiteralExpr('s')))
+        self.assertEqual(
+            'VarStmt(name=Token(type:TokenType.IDENTIFIER, lexeme:a, literal:None, line:1), '
+            'initializer=GroupingExpr(expression=LiteralExpr(value=s)))',
+            repr(statement)
+        )
+        self.assertEqual('BlockStmt(statements=[VarStmt(name=a, initializer=None), BlockStmt(statements=())])',
+                         repr(BlockStmt([VarStmt('a', None), BlockStmt(())])))
+
+    def test_deep_trees(self):
+        depth = 10 * 1000
+        source = f'print {"(" * depth}1{")" * depth};'
+        first, second = self.parse(source)[0], self.parse(source)[0]
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertTrue(repr(first).endswith(f'LiteralExpr(value=1.0){")" * (depth + 1)}'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from lox import Lox
+import operators
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestOperators(TestCaseWithHelpers):
+
+    def test_handlers_are_bound_on_first_evaluation(self):
+        lox = Lox()
+        [statement] = lox.parse(lox.scan('print -(1 + 2) < 3;'))
+        comparison = statement.expression
+        self.assertIsNone(comparison.handler)
+        with redirect_stdout(io.StringIO()) as stdout:
+            lox.execute([statement])
+        self.assertEqual('true\n', stdout.getvalue())
+        self.assertIs(operators.less, comparison.handler)
+        self.assertIs(operators.negate, comparison.left.handler)
+        self.assertIs(operators.add, comparison.left.right.expression.handler)
+
+    def test_logical_handlers_are_bound_on_first_evaluation(self):
+        lox = Lox()
+        [statement] = lox.parse(lox.scan('print nil or false and 1;'))
+        disjunction = statement.expression
+        self.assertIsNone(disjunction.handler)
+        with redirect_stdout(io.StringIO()) as stdout:
+            lox.execute([statement])
+        self.assertEqual('false\n', stdout.getvalue())
+        self.assertIs(operators.or_short_circuits, disjunction.handler)
+        self.assertIs(operators.and_short_circuits, disjunction.right.handler)
+
+    def test_handlers_check_operands(self):
+        self.assert_prints('print 1 + 2; print "a" + "b"; print 3 / 2; print !nil; print 1 != 2;',
+                           ['3', 'ab', '1.5', 'true', 'true'])
+        self.assert_prints_to_std_err('print 1 + "a";')
+        self.assert_prints_to_std_err('print 1 >= nil;')
+        self.assert_prints_to_std_err('print -true;')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from lazy_parser import LazyParser
+from optimizer import Optimizer
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestOptimizer(TestCaseWithHelpers):
+
+    def assert_optimizes_to(self, source: str, expected_source: str):
+        lox = Lox()
+        statements = Optimizer().optimize(lox.parse(lox.scan(source)))
+        self.assertEqual(lox.parse(lox.scan(expected_source)), statements)
+
+    def test_fold_operations_on_literals(self):
+        self.assert_optimizes_to('print 1 + 2 * 3; print "a" + "b"; print !nil == (1 < 2); print -(2) > 0;',
+                                 'print 7; print "ab"; print true; print false;')
+
+    def test_fold_logical_operators_on_a_literal_left_operand(self):
+        self.assert_optimizes_to('print nil or a; print nil and a; print 1 or a;', 'print a; print nil; print 1;')
+
+    def test_operations_that_would_fail_are_not_folded(self):
+        self.assert_optimizes_to('print -"a"; print 1 + "a"; print (1 + 1) / 0; print nil < 1;',
+                                 'print -"a"; print 1 + "a"; print 2 / 0; print nil < 1;')
+        with redirect_stdout(StringIO()) as std_out, redirect_stderr(StringIO()) as std_err:
+            Lox(optimize=True).run('print 1;\nprint 2 * (1 + "a");')
+        self.assertEqual('1\n', std_out.getvalue())
+        self.assertEqual('Operands must both be numbers or both be strings.\n[line 2]\n', std_err.getvalue())
+
+    def test_dead_branches_are_removed(self):
+        self.assert_optimizes_to('if (true) print 1; else print 2; while (false) print 3;'
+                                 'if (nil) print 3; else { print 4; print 5; } 1 + 2;',
+                                 'print 1; print 4; print 5;')
+
+    def test_blocks_that_declare_nothing_are_flattened(self):
+        self.assert_optimizes_to('{ print 1; { var a; print 2; } } { { print 3; } }',
+                                 'print 1; { var a; print 2; } print 3;')
+        self.assert_optimizes_to('while (b) { print 1; } if (b) {} else { print 2; }',
+                                 'while (b) print 1; if (b) {} else print 2;')
+
+    def test_lazy_blocks_are_optimized_when_parsed(self):
+        lox = Lox(optimize=True)
+        [block] = LazyParser(lox.scan('{ print 1 + 1; }'), lox).parse()
+        self.assertEqual(Lox().parse(Lox().scan('print 2;')), block.statements)
+
+    def test_syntax_errors_are_reported(self):
+        for parser in Lox.PARSERS:
+            for full_check in (False, True):
+                with redirect_stdout(StringIO()), redirect_stderr(StringIO()) as std_err:
+                    lox = Lox(parser=parser, full_check=full_check, optimize=True)
+                    lox.run('print 1;\n{ print 1 +; }')
+                self.assertEqual("[line 2] Error at ';': Expect expression.\n", std_err.getvalue(), parser)
+                self.assertTrue(lox.had_parser_error)
+
+    def test_negative_zero_is_not_merged_with_zero(self):
+        for options in ({'hash_cons': True}, {'engine': 'bytecode'}, {}):
+            self.assert_prints('print 0; print -0; print 0 * -1;', ['0', '-0', '-0'], optimize=True, **options)
+
+    def test_optimized_programs_run_the_same(self):
+        source = 'var a = 1; { var b = a + (2 * 3); if (b > 6 and true) print b; else print "no"; }' \
+                 'while (false) a = 2; if (!nil) { print a; }'
+        self.assert_prints(source, ['7', '1'], optimize=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
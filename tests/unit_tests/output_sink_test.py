@@ -0,0 +1,73 @@
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from interpreter import Interpreter
+from output_sink import StreamSink, CollectingSink, NullSink
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestOutputSink(TestCaseWithHelpers):
+
+    def test_line_policy_writes_each_line(self):
+        stream = StringIO()
+        sink = StreamSink('line', stream=stream)
+        sink.write_line('a')
+        self.assertEqual('a\n', stream.getvalue())
+
+    def test_size_policy_writes_full_buffers(self):
+        stream = StringIO()
+        sink = StreamSink('size', buffer_size=4, stream=stream)
+        sink.write_line('a')
+        self.assertEqual('', stream.getvalue())
+        sink.write_line('bc')
+        self.assertEqual('a\nbc\n', stream.getvalue())
+        sink.write_line('d')
+        sink.flush()
+        self.assertEqual('a\nbc\nd\n', stream.getvalue())
+
+    def test_end_policy_writes_on_flush(self):
+        stream = StringIO()
+        sink = StreamSink('end', stream=stream)
+        for line in ('a', 'b'):
+            sink.write_line(line)
+        self.assertEqual('', stream.getvalue())
+        sink.flush()
+        self.assertEqual('a\nb\n', stream.getvalue())
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            StreamSink('never')
+
+    def test_collecting_and_null_sinks(self):
+        for engine in Lox.ENGINES:
+            lox = Lox(engine=engine)
+            lox.interpreter.output = CollectingSink()
+            lox.run('for (var i = 0; i < 3; i = i + 1) print i;')
+            self.assertEqual(['0', '1', '2'], lox.interpreter.output.lines, engine)
+            lox.interpreter.output = NullSink()
+            with redirect_stdout(StringIO()) as std_out:
+                lox.run('print 1;')
+            self.assertEqual('', std_out.getvalue(), engine)
+
+    def test_buffered_output_comes_before_errors(self):
+        for flush in StreamSink.FLUSH_POLICIES:
+            output = StringIO()
+            with redirect_stdout(output), redirect_stderr(output):
+                lox = Lox(flush=flush)
+                lox.run('print 1; print 2;')
+                lox.run('print 3; print -nil;')
+                lox.run('print 4; print;')
+            self.assertEqual('1\n2\n3\nOperand must be a number.\n[line 1]\n'
+                             "[line 1] Error at ';': Expect expression.\n", output.getvalue(), flush)
+
+    def test_stringify_floats(self):
+        cases = ((1.0, '1'), (-0.0, '-0'), (2.5, '2.5'), (1e16, '1e+16'), (123456789012345.0, '123456789012345'),
+                 (float('inf'), 'inf'), (1 / 3, '0.3333333333333333'))
+        for value, text in cases:
+            self.assertEqual(text, Interpreter.stringify_value(value))
+
+
+if __name__ == '__main__':
+    unittest.main()
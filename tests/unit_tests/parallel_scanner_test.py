@@ -0,0 +1,53 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from scanner import Scanner
+from parallel_scanner import ParallelScanner
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestParallelScanner(TestCaseWithHelpers):
+
+    def assert_scans_like_scanner(self, source: str, min_chunk_size: int = 8):
+        with redirect_stderr(StringIO()) as expected_std_err:
+            expected_tokens = Scanner(source, Lox()).scan_tokens()
+        with redirect_stderr(StringIO()) as std_err:
+            tokens = ParallelScanner(source, Lox(), workers=3, min_chunk_size=min_chunk_size).scan_tokens()
+        self.assertEqual(expected_tokens, list(tokens))
+        self.assertEqual(expected_std_err.getvalue(), std_err.getvalue())
+
+    def test_split_points_follow_newlines(self):
+        source = 'var a = 1;\nvar b = 2;\nvar c = 3;\nvar d = 4;\n'
+        splits = ParallelScanner(source, Lox(), workers=3, min_chunk_size=8).split_points()
+        self.assertEqual([0, 22, 33, len(source)], splits)
+
+    def test_split_points_skip_multi_line_strings(self):
+        source = 'print "a\nb\nc\nd\ne\nf" + "g\nh";\nprint 1;\nprint 2;\n'
+        splits = ParallelScanner(source, Lox(), workers=3, min_chunk_size=8).split_points()
+        self.assertEqual([0, source.index('print 1'), source.index('print 2'), len(source)], splits)
+
+    def test_split_points_ignore_quotes_in_comments(self):
+        source = 'print 1; // "\nprint 2;\nprint 3; // "\nprint 4;\n'
+        splits = ParallelScanner(source, Lox(), workers=3, min_chunk_size=8).split_points()
+        self.assertEqual([0, source.index('print 3'), source.index('print 4'), len(source)], splits)
+
+    def test_scan_tokens_small_source_is_sequential(self):
+        self.assert_scans_like_scanner('print 1;\nprint 2;\n', min_chunk_size=1 << 20)
+
+    def test_scan_tokens_matches_scanner(self):
+        self.assert_scans_like_scanner(
+            'var x = 3;\n'
+            'if (x <= 5) {\n'
+            '\tprint "x is\nsmall";  // trailing "comment\n'
+            '} else { x = x / 2 * -1; }\n'
+            'while (!(x != 1.5) and x >= 0 or x == nil) x = x - 1;\n  '
+        )
+
+    def test_scan_tokens_errors_in_several_chunks(self):
+        self.assert_scans_like_scanner('var a = 1 @ 2;\nprint "\n\n";\nvar b = #;\nprint "unterminated;\nprint 2;')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+from contextlib import redirect_stderr
+from io import StringIO
 
 from lox import Lox
 from lox_token import Token
@@ -51,6 +53,32 @@ class TestParser(TestCaseWithHelpers):
                 f'{AstPrinter().build_ast_string(expected_statement)}'
         )
 
+    def parse_expression(self, source: str) -> str:
+        statement = Parser(Lox().scan(f'{source};'), Lox()).parse()[0]
+        return AstPrinter().build_ast_string(statement.expression)
+
+    def test_precedence(self):
+        self.assertEqual(
+            '(or a (and b (== c (< (+ d (* e f)) (- g)))))',
+            self.parse_expression('a or b and c == d + e * f < -g')
+        )
+
+    def test_binary_operators_are_left_associative(self):
+        self.assertEqual('(- (+ (- a b) c) d)', self.parse_expression('a - b + c - d'))
+        self.assertEqual('(or (or a b) c)', self.parse_expression('a or b or c'))
+
+    def test_unary_binds_tighter_than_binary(self):
+        self.assertEqual('(* (- (! a)) b)', self.parse_expression('-!a * b'))
+
+    def test_assignment_is_right_associative(self):
+        self.assertEqual('(= a (= b (+ c 1.0)))', self.parse_expression('a = b = c + 1'))
+
+    def test_invalid_assignment_target(self):
+        # reported at the last token of the value, as the parser has consumed it by then
+        with redirect_stderr(StringIO()) as std_err:
+            self.assertEqual('(+ a b)', self.parse_expression('a + b = c'))
+        self.assertEqual("[line 1] Error at 'c': Identifier expected.\n", std_err.getvalue())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from program_cache import ProgramCache
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestProgramCache(TestCaseWithHelpers):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.script = os.path.join(self.directory.name, 'script.lox')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_script(self, source: str):
+        with open(self.script, 'w') as file:
+            file.write(source)
+
+    def run_cached(self, **lox_options) -> str:
+        with redirect_stdout(StringIO()) as std_out:
+            Lox(cache=True, **lox_options).run_file(self.script)
+        return std_out.getvalue()
+
+    def test_run_file_stores_and_loads_cache(self):
+        self.write_script('var a = 1; print a + 1;')
+        self.assertEqual('2\n', self.run_cached())
+        cache = ProgramCache(self.script)
+        self.assertTrue(os.path.exists(cache.path))
+        self.assertIsNotNone(cache.load())
+        self.assertEqual('2\n', self.run_cached())
+
+    def test_negative_zero_is_not_merged_with_zero(self):
+        self.write_script('print 0; print -0;')
+        self.assertEqual('0\n-0\n', self.run_cached(optimize=True))
+        self.assertEqual('0\n-0\n', self.run_cached(optimize=True))
+
+    def test_changed_script_invalidates_cache(self):
+        self.write_script('print 1;')
+        self.run_cached()
+        self.write_script('print 2;')
+        self.assertIsNone(ProgramCache(self.script).load())
+        self.assertEqual('2\n', self.run_cached())
+        self.assertIsNotNone(ProgramCache(self.script).load())
+
+    def test_script_with_parse_errors_is_not_cached(self):
+        self.write_script('print 1 +;')
+        with redirect_stderr(StringIO()) as std_err, self.assertRaises(SystemExit):
+            self.run_cached()
+        self.assertIn('Expect expression.', std_err.getvalue())
+        self.assertIsNone(ProgramCache(self.script).load())
+
+    def test_corrupt_cache_is_ignored(self):
+        self.write_script('print 1;')
+        self.run_cached()
+        cache = ProgramCache(self.script)
+        with open(cache.path, 'r+b') as file:
+            file.seek(ProgramCache.HEADER.size)
+            file.write(b'garbage')
+        self.assertIsNone(cache.load())
+        self.assertEqual('1\n', self.run_cached())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+
+from lox import Lox
+from resolver import Resolver
+from lazy_parser import LazyParser
+from iterative_parser import IterativeParser
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestResolver(TestCaseWithHelpers):
+
+    def resolve(self, source: str):
+        lox = Lox()
+        statements = lox.parse(lox.scan(source))
+        Resolver().resolve(statements)
+        return statements
+
+    def test_globals_are_not_resolved_to_slots(self):
+        declaration, statement = self.resolve('var a = 1; print a;')
+        self.assertIsNone(declaration.slot)
+        self.assertIsNone(statement.expression.hops)
+
+    def test_locals_get_slots_in_declaration_order(self):
+        [block] = self.resolve('{ var a = 1; var b = 2; print b; a = 3; }')
+        self.assertEqual(2, block.slot_count)
+        self.assertEqual([0, 1], [block.statements[0].slot, block.statements[1].slot])
+        self.assertEqual((0, 1), (block.statements[2].expression.hops, block.statements[2].expression.slot))
+        self.assertEqual((0, 0), (block.statements[3].expression.hops, block.statements[3].expression.slot))
+
+    def test_hops_count_enclosing_blocks(self):
+        [block] = self.resolve('{ var a = 1; { var b; { var c; print a; } } }')
+        expr = block.statements[1].statements[1].statements[1].expression
+        self.assertEqual((2, 0), (expr.hops, expr.slot))
+
+    def test_blocks_that_declare_nothing_get_no_scope(self):
+        [block] = self.resolve('{ var a = 1; { { print a; } } }')
+        inner = block.statements[1].statements[0]
+        self.assertEqual(0, inner.slot_count)
+        self.assertEqual((0, 0), (inner.statements[0].expression.hops, inner.statements[0].expression.slot))
+
+    def test_redeclaring_a_name_reuses_its_slot(self):
+        [block] = self.resolve('{ var a = 1; var a = 2; }')
+        self.assertEqual(1, block.slot_count)
+        self.assertEqual([0, 0], [statement.slot for statement in block.statements])
+
+    def test_names_resolve_to_the_declarations_before_them(self):
+        [_, block] = self.resolve('var a = 1; { print a; var a = a + 1; print a; }')
+        before, declaration, after = block.statements
+        self.assertIsNone(before.expression.hops)
+        self.assertIsNone(declaration.initializer.left.hops)
+        self.assertEqual(0, after.expression.hops)
+
+    def test_lazy_block_keeps_the_names_visible_where_it_appears(self):
+        lox = Lox()
+        [block] = LazyParser(lox.scan('{ var a = 1; { print a + b; } var b = 2; }'), lox).parse()
+        Resolver().resolve([block])
+        self.assertEqual([], block.scopes)
+        Resolver.resolve_lazy_block(block)
+        inner = block.statements[1]
+        self.assertIsNone(inner.slot_count)
+        self.assertEqual([{'a': 0}], inner.scopes)
+        Resolver.resolve_lazy_block(inner)
+        expr = inner.statements[0].expression
+        # the inner block declares nothing, so it runs in the outer block's environment
+        self.assertEqual((0, 0), (expr.left.hops, expr.left.slot))
+        self.assertIsNone(expr.right.hops)
+
+    def test_shadowing(self):
+        source = 'var a = "global";\n' \
+                 '{ var a = "outer"; { print a; var a = "inner"; print a; a = "assigned"; } print a; }\n' \
+                 'print a;'
+        self.assert_prints(source, ['outer', 'inner', 'outer', 'global'])
+
+    def test_block_runs_get_fresh_environments(self):
+        source = 'for (var i = 0; i < 3; i = i + 1) { var a; if (i == 0) a = "set"; print a; }'
+        self.assert_prints(source, ['set', 'nil', 'nil'])
+
+    def test_block_environments_are_reused_by_loops(self):
+        lox = Lox()
+        statements = lox.parse(lox.scan('for (var i = 0; i < 3; i = i + 1) { var a = i; { print a; } }'))
+        with redirect_stdout(StringIO()) as std_out:
+            lox.execute(statements)
+        self.assertEqual('0\n1\n2\n', std_out.getvalue())
+        [loop] = statements
+        self.assertEqual(1, loop.slot_count)
+        self.assertIs(loop.environment, loop.body.environment.enclosing)
+
+    def test_for_loop_variable_is_scoped_to_the_loop(self):
+        [_, loop] = self.resolve('var i = "global"; for (var i = 0; i < 1; i = i + 1) print i;')
+        self.assertEqual(1, loop.slot_count)
+        self.assertEqual((0, 0), (loop.condition.left.hops, loop.condition.left.slot))
+        self.assertEqual((0, 0), (loop.body.expression.hops, loop.body.expression.slot))
+        [loop] = self.resolve('for (; i < 1;) print i;')
+        self.assertEqual(0, loop.slot_count)
+        self.assertIsNone(loop.body.expression.hops)
+
+    def test_deep_nesting_does_not_exhaust_the_stack(self):
+        depth = 10 * 1000
+        source = f'{{ var a = 1; {"{ if (a) " * depth}print a = (((a)));{" }" * depth} }}'
+        [block] = IterativeParser(Lox().scan(source), Lox()).parse()
+        Resolver().resolve([block])
+        statement = block.statements[1]
+        for _ in range(depth):
+            self.assertEqual(0, statement.slot_count)
+            statement = statement.statements[0].if_branch
+        # blocks that declare nothing get no scope, so a is in the outermost block's environment
+        assignment = statement.expression
+        self.assertEqual((0, 0), (assignment.hops, assignment.slot))
+        variable = assignment.value.expression.expression.expression
+        self.assertEqual((0, 0), (variable.hops, variable.slot))
+        self.assertEqual(1, block.slot_count)
+
+    def test_undefined_variable_in_block(self):
+        self.assert_prints_to_std_err('{ var a = 1; print b; }')
+
+    def test_lazy_blocks_resolve_on_first_run(self):
+        source = 'var b = "global"; { var a = 1; { print a; print b; } var b = 2; print b; }'
+        self.assert_prints(source, ['1', 'global', '2'], parser='lazy')
+
+
+if __name__ == '__main__':
+    unittest.main()
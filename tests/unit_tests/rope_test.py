@@ -0,0 +1,64 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from output_sink import CollectingSink
+from rope import Rope, concatenate
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestRope(TestCaseWithHelpers):
+
+    def test_short_concatenations_stay_strings(self):
+        self.assertEqual('ab', concatenate('a', 'b'))
+        self.assertIs(str, type(concatenate('a', 'b')))
+        long = concatenate('a' * Rope.MIN_LENGTH, 'b')
+        self.assertIs(Rope, type(long))
+        self.assertEqual('a' * Rope.MIN_LENGTH + 'b', long)
+
+    def test_appends_share_pieces(self):
+        rope = Rope(['a' * Rope.MIN_LENGTH])
+        longer = concatenate(concatenate(rope, 'b'), 'c')
+        self.assertIs(rope.pieces, longer.pieces)
+        self.assertEqual(1, rope.count)
+        self.assertEqual('a' * Rope.MIN_LENGTH + 'bc', str(longer))
+
+    def test_appending_to_an_older_rope(self):
+        rope = Rope(['x', 'y'])
+        first, second = rope.append('1'), rope.append('2')
+        self.assertEqual('xy', rope)
+        self.assertEqual('xy1', first)
+        self.assertEqual('xy2', second)
+        self.assertEqual(first, concatenate(rope, '1'))
+
+    def test_equality_and_hashing(self):
+        rope = Rope(['a', 'b'])
+        self.assertTrue(rope == 'ab' and 'ab' == rope and rope == Rope(['ab']))
+        self.assertFalse(rope != 'ab' or rope == 'abc' or rope == 1.0 or rope is None)
+        self.assertEqual(hash('ab'), hash(rope))
+        self.assertEqual('ab', concatenate('a', Rope(['b'])))
+
+    def test_engines_build_long_strings(self):
+        source = '''
+            var s = "";
+            for (var i = 0; i < 500; i = i + 1) s = s + "ab";
+            var t = s + "c";
+            print s + "" == s;
+            print t == s;
+            print t == s + "c";
+            print s;
+            s + 1;
+        '''
+        for engine in Lox.ENGINES:
+            lox = Lox(engine=engine)
+            lox.interpreter.output = CollectingSink()
+            with redirect_stderr(StringIO()) as std_err:
+                lox.run(source)
+            self.assertEqual(['true', 'false', 'true', 'ab' * 500], lox.interpreter.output.lines, engine)
+            self.assertIs(Rope, type(lox.interpreter.globals.values['s']), engine)
+            self.assertIn('Operands must both be numbers or both be strings.', std_err.getvalue(), engine)
+
+
+if __name__ == '__main__':
+    unittest.main()
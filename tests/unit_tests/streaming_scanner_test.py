@@ -0,0 +1,76 @@
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from fast_scanner import FastScanner
+from streaming_scanner import StreamingScanner, StreamingTokens
+from token_type import TokenType
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestStreamingScanner(TestCaseWithHelpers):
+
+    def assert_scans_like_fast_scanner(self, source: str) -> str:
+        with redirect_stderr(StringIO()) as expected_std_err:
+            expected_tokens = FastScanner(source, Lox()).scan_tokens()
+        with redirect_stderr(StringIO()) as std_err:
+            tokens = StreamingTokens(StreamingScanner(StringIO(source), Lox()))
+            streamed = []
+            while not streamed or streamed[-1].type != TokenType.EOF:
+                streamed.append(tokens[len(streamed)])
+        self.assertEqual(expected_tokens, streamed)
+        self.assertEqual(expected_std_err.getvalue(), std_err.getvalue())
+        return std_err.getvalue()
+
+    def run_stream(self, source: str) -> tuple[str, str]:
+        lox = Lox()
+        with redirect_stdout(StringIO()) as std_out, redirect_stderr(StringIO()) as std_err:
+            lox.run_stream(StringIO(source))
+        return std_out.getvalue(), std_err.getvalue()
+
+    def test_tokens_match_fast_scanner(self):
+        self.assert_scans_like_fast_scanner('var a = 1.5;\n\n  print a >= 2 and !nil; // comment\n{ a = a / 2; }')
+
+    def test_multi_line_strings(self):
+        self.assert_scans_like_fast_scanner('print "a\nb\n\nc"; print "d";\nprint "e\n" + "f\ng";\n')
+
+    def test_quotes_in_comments(self):
+        self.assert_scans_like_fast_scanner('print 1; // a "quote\nprint "// not a comment";\n')
+
+    def test_unterminated_string(self):
+        self.assertEqual('[line 4] Error : Unterminated string literal.\n',
+                         self.assert_scans_like_fast_scanner('print 1;\nprint "abc\n\n'))
+
+    def test_tokens_are_scanned_on_demand(self):
+        stream = StringIO('print 1;\nprint 2;\n')
+        tokens = StreamingTokens(StreamingScanner(stream, Lox()))
+        self.assertEqual(TokenType.SEMICOLON, tokens[2].type)
+        self.assertEqual('print 2;\n', stream.read())
+
+    def test_discarded_tokens_are_freed(self):
+        tokens = StreamingTokens(StreamingScanner(StringIO('print 1; print 2;'), Lox()))
+        self.assertEqual(TokenType.PRINT, tokens[3].type)
+        tokens.discard_before(3)
+        self.assertEqual(TokenType.PRINT, tokens[3].type)
+        self.assertEqual(TokenType.EOF, tokens[6].type)
+        self.assertEqual(4, len(tokens.tokens))
+
+    def test_run_stream(self):
+        source = 'var a = 1;\nfor (var i = 0; i < 2; i = i + 1) {\n  a = a + 1;\n}\nprint a;\nprint "a" + "b";\n'
+        self.assertEqual(('3\nab\n', ''), self.run_stream(source))
+
+    def test_declarations_run_before_a_syntax_error(self):
+        std_out, std_err = self.run_stream('print 1;\nprint ;\nprint 2;\nvar = 3;\n')
+        self.assertEqual('1\n', std_out)
+        self.assertEqual("[line 2] Error at ';': Expect expression.\n"
+                         "[line 4] Error at '=': Expected identifier after var.\n", std_err)
+
+    def test_runtime_error_stops_the_stream(self):
+        std_out, std_err = self.run_stream('print 1;\nprint -"a";\nprint 2;\n')
+        self.assertEqual('1\n', std_out)
+        self.assertEqual('Operand must be a number.\n[line 2]\n', std_err)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+from lox import Lox
+from scanner import Scanner
+from parser import Parser
+from token_stream import TokenStreamScanner
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestTokenStream(TestCaseWithHelpers):
+    SOURCE = 'var x = 3; // comment\n' \
+             'if (x <= 5) {\n' \
+             '  print "x is\nsmall";\n' \
+             '} else x = -x / 2.5;\n' \
+             '@ print "unterminated'
+
+    def test_materializes_same_tokens_as_scanner(self):
+        with redirect_stderr(StringIO()) as expected_std_err:
+            expected_tokens = Scanner(TestTokenStream.SOURCE, Lox()).scan_tokens()
+        with redirect_stderr(StringIO()) as std_err:
+            tokens = TokenStreamScanner(TestTokenStream.SOURCE, Lox()).scan_tokens()
+        self.assertEqual(len(expected_tokens), len(tokens))
+        self.assertEqual(expected_tokens, list(tokens))
+        self.assertEqual(expected_std_err.getvalue(), std_err.getvalue())
+
+    def test_parser_consumes_token_stream(self):
+        source = 'var a = 1; { var b = a + 2; print b * (a - 1); } while (a < 3) a = a + 1;'
+        expected_statements = Parser(Scanner(source, Lox()).scan_tokens(), Lox()).parse()
+        statements = Parser(TokenStreamScanner(source, Lox()).scan_tokens(), Lox()).parse()
+        self.assertEqual(expected_statements, statements)
+
+    def test_run_with_compact_scanner(self):
+        source = 'var i = 0;' \
+                 'while (i < 3) {' \
+                 '  print i;' \
+                 '  i = i + 1;' \
+                 '}'
+        self.assert_prints(source, ['0', '1', '2'], scanner='compact')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from lox import Lox
+from lazy_parser import LazyParser
+from stmt import PrintStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from output_sink import CollectingSink
+from type_inferrer import TypeInferrer
+import operators
+from tests.test_helpers.test_case_with_helpers import TestCaseWithHelpers
+
+
+class TestTypeInferrer(TestCaseWithHelpers):
+
+    def assert_operand_types(self, source: str, expected_types: list):
+        """Checks the operand_type of the operation each print statement prints, in the order they appear."""
+        lox = Lox()
+        statements = lox.parse(lox.scan(source))
+        TypeInferrer().infer(statements)
+        operand_types, pending = [], list(reversed(statements))
+        while pending:
+            statement = pending.pop()
+            if type(statement) is PrintStmt:
+                operand_types.append(statement.expression.operand_type)
+            elif type(statement) is BlockStmt:
+                pending.extend(reversed(statement.statements))
+            elif type(statement) is IfStmt:
+                pending.extend(branch for branch in (statement.else_branch, statement.if_branch) if branch is not None)
+            elif type(statement) is WhileStmt or type(statement) is ForStmt:
+                pending.append(statement.body)
+        self.assertEqual(expected_types, operand_types)
+
+    def test_literals_and_arithmetic(self):
+        self.assert_operand_types('print 1 + 2; print -(3 * 4); print "a" + "b"; print 1 + "b"; print -nil;',
+                                  [float, float, str, object, object])
+
+    def test_variables_take_the_types_assigned_to_them(self):
+        self.assert_operand_types('var a = 1; { var b = a; print b - 1; } print b - 1; b = "s"; print -b; a = 2; '
+                                  'print -(a + 1); print -(a = "s");',
+                                  [float, object, object, float, object])
+
+    def test_branches_must_agree(self):
+        self.assert_operand_types('var a = 1; var b = 1; if (c) { a = "s"; b = 2; } else b = 3; print -a; print -b;',
+                                  [object, float])
+        self.assert_operand_types('var a = 1; c or (a = nil); print -a; print -(c and 1 or 2); print -(1 and 2 or 3);',
+                                  [object, object, float])
+
+    def test_loops_are_inferred_until_the_types_stop_changing(self):
+        self.assert_operand_types('for (var i = 0; i < 3; i = i + 1) print -i;', [float])
+        self.assert_operand_types('var a = 0; while (a < 3) { print -a; a = "s"; }', [object])
+        self.assert_operand_types('var a = 0; var b = 0; while (true) { while (true) print a - 1; a = b; b = "s"; }',
+                                  [object])
+
+    def test_lazy_blocks_may_assign_anything(self):
+        lox = Lox(parser='lazy')
+        statements = LazyParser(lox.scan('var a = 1; { a = "s"; } print -a;'), lox).parse()
+        TypeInferrer().infer(statements)
+        self.assertIs(object, statements[-1].expression.operand_type)
+
+    def test_handlers_skip_checks_for_proven_operands(self):
+        lox = Lox(optimize=True)
+        lox.interpreter.output = CollectingSink()
+        statements = lox.parse(lox.scan('var a = 1; var b = 2; if (a > 5) b = "s"; print a < b; print a < a + 1;'))
+        lox.execute(statements)
+        unproven, proven = statements[-2].expression, statements[-1].expression
+        self.assertIs(operators.less, unproven.handler)
+        self.assertIs(operators.UNCHECKED_BINARY_OPERATORS[float][proven.operator.type], proven.handler)
+        self.assertEqual(['true', 'true'], lox.interpreter.output.lines)
+
+    def test_engines_run_inferred_programs_the_same(self):
+        source = '''
+            var s = "";
+            for (var i = 0; i < 3; i = i + 1) { s = s + "ab"; print -i * 2 + i * 3 >= 1; }
+            print s + "c";
+            var a = 1;
+            if (s == "") a = "x";
+            print a - 1;
+        '''
+        for engine in Lox.ENGINES:
+            lox = Lox(engine=engine, optimize=True)
+            lox.interpreter.output = CollectingSink()
+            lox.run(source)
+            self.assertEqual(['false', 'true', 'true', 'abababc', '0'], lox.interpreter.output.lines, engine)
+            self.assert_prints_to_std_err('var a = 1; if (true) a = "x"; print a - 1;', engine=engine, optimize=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
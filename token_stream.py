@@ -0,0 +1,126 @@
+import re
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Optional, Sequence, Tuple
+
+from lox_token import Token
+from token_type import TokenType
+from scanner import Scanner
+from fast_scanner import FastScanner
+
+
+class TokenStream(Sequence[Token]):
+    """Stores tokens as parallel arrays of type codes and offsets into the source, materializing Tokens on access."""
+    TOKEN_TYPES = {token_type.value: token_type for token_type in TokenType}
+    NEWLINE_PATTERN = re.compile('\n')
+
+    def __init__(self, source: str, types: array, starts: array, ends: array,
+                 newline_offsets: Optional[array] = None):
+        self.source = source
+        self.types = types
+        self.starts = starts
+        self.ends = ends
+        if newline_offsets is None:
+            newline_offsets = TokenStream.find_newlines(source, 0, len(source))
+        self.newline_offsets = newline_offsets
+        # the parser only looks at the current and previous token, so the last two materialized are cached
+        self.cached_indices = [-1, -1]
+        self.cached_tokens = [None, None]
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __getitem__(self, index: int) -> Token:
+        if index < 0:
+            index += len(self.types)
+        cached_indices = self.cached_indices
+        if cached_indices[0] == index:
+            return self.cached_tokens[0]
+        if cached_indices[1] == index:
+            return self.cached_tokens[1]
+        token = self.materialize(index)
+        cached_indices[1], self.cached_tokens[1] = cached_indices[0], self.cached_tokens[0]
+        cached_indices[0], self.cached_tokens[0] = index, token
+        return token
+
+    def materialize(self, index: int) -> Token:
+        token_type = self.type_at(index)
+        lexeme = self.lexeme_at(index)
+        literal = None
+        if token_type == TokenType.IDENTIFIER:
+            lexeme = sys.intern(lexeme)
+        elif token_type == TokenType.NUMBER:
+            literal = float(lexeme)
+        elif token_type == TokenType.STRING:
+            literal = lexeme[1:-1]
+        return Token(token_type, lexeme, literal, self.line_at(index))
+
+    def type_at(self, index: int) -> TokenType:
+        return TokenStream.TOKEN_TYPES[self.types[index]]
+
+    def lexeme_at(self, index: int) -> str:
+        return self.source[self.starts[index]:self.ends[index]]
+
+    def line_at(self, index: int) -> int:
+        # a token's line is the line it ends on, which only differs from where it starts for multi-line strings
+        return bisect_left(self.newline_offsets, self.ends[index]) + 1
+
+    @staticmethod
+    def find_newlines(source: str, start: int, end: int) -> array:
+        return array('q', (match.start() for match in TokenStream.NEWLINE_PATTERN.finditer(source, start, end)))
+
+
+class TokenStreamScanner(FastScanner):
+    """Scans with FastScanner's master pattern, but returns the tokens as a compact TokenStream."""
+
+    def scan_tokens(self) -> TokenStream:
+        source = self.source
+        types, starts, ends = self.scan_columns(0, len(source))
+        types.append(TokenType.EOF.value)
+        starts.append(len(source))
+        ends.append(len(source))
+        return TokenStream(source, types, starts, ends)
+
+    def scan_columns(self, start: int, end: int) -> Tuple[array, array, array]:
+        """Scans source[start:end], which must begin and end outside any lexeme, into type, start and end columns."""
+        source = self.source
+        types, starts, ends = array('B'), array('q'), array('q')
+        keyword_token_types = Scanner.KEYWORD_TOKEN_TYPES
+        operator_token_types = FastScanner.OPERATOR_TOKEN_TYPES
+        identifier, operator, newlines, number, string, unexpected = (
+            FastScanner.IDENTIFIER, FastScanner.OPERATOR, FastScanner.NEWLINES,
+            FastScanner.NUMBER, FastScanner.STRING, FastScanner.UNEXPECTED
+        )
+        identifier_code, number_code, string_code = (
+            TokenType.IDENTIFIER.value, TokenType.NUMBER.value, TokenType.STRING.value
+        )
+        line = self.line
+        for match in FastScanner.TOKEN_PATTERN.finditer(source, start, end):
+            kind = match.lastindex
+            if kind == identifier:
+                keyword_type = keyword_token_types.get(match.group(kind))
+                types.append(identifier_code if keyword_type is None else keyword_type.value)
+            elif kind == operator:
+                types.append(operator_token_types[match.group(kind)].value)
+            elif kind == newlines:
+                line += match.group(kind).count('\n')
+                continue
+            elif kind == number:
+                types.append(number_code)
+            elif kind == string:
+                text = match.group(kind)
+                line += text.count('\n')
+                if len(text) < 2 or text[-1] != '"':
+                    self.lox.error(line, '', 'Unterminated string literal.')
+                    continue
+                types.append(string_code)
+            else:
+                if kind == unexpected:
+                    self.lox.error(line, '', 'Unexpected character.')
+                continue
+            token_start, token_end = match.span(kind)
+            starts.append(token_start)
+            ends.append(token_end)
+        self.line = line
+        return types, starts, ends
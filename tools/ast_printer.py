@@ -1,7 +1,7 @@
 from lox_token import Token
 from token_type import TokenType
 from stmt import ExpressionStmt, PrintStmt, VarStmt, Stmt, BlockStmt
-from expr import Expr, BinaryExpr, GroupingExpr, LiteralExpr, UnaryExpr, AssignmentExpr, VariableExpr
+from expr import Expr, BinaryExpr, GroupingExpr, LiteralExpr, UnaryExpr, AssignmentExpr, VariableExpr, LogicalExpr
 
 
 # AstPrinter should inherit from the abstract base classes 'StmtVisitor' and 'ExprVisitor',
@@ -29,6 +29,9 @@ class AstPrinter:
     def visit_binary_expr(self, expr: BinaryExpr) -> str:
         return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
 
+    def visit_logical_expr(self, expr: LogicalExpr) -> str:
+        return self.parenthesize(expr.operator.lexeme, expr.left, expr.right)
+
     def visit_grouping_expr(self, expr: GroupingExpr) -> str:
         return self.parenthesize('group', expr.expression)
 
@@ -0,0 +1,372 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Callable, Dict
+
+from lox import Lox
+from scanner import Scanner
+from fast_scanner import FastScanner
+from mapped_scanner import MappedScanner
+from token_stream import TokenStreamScanner
+from parallel_scanner import ParallelScanner
+from parser import Parser
+from iterative_parser import IterativeParser
+from lazy_parser import LazyParser
+from token_type import TokenType
+from incremental import IncrementalDocument
+from expr import Expr
+from stmt import Stmt
+from program_cache import ProgramCache
+from flat_ast import FlatAst
+from hash_consing import HashConsing
+from environment import BlockEnvironment
+from output_sink import StreamSink, NullSink
+import interpreter as interpreter_module
+
+# usage (from the repository root): python -m tools.benchmark [benchmark ...]
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+
+
+def benchmark(function: Callable[[], None]) -> Callable[[], None]:
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def generate_program(statement_count: int) -> str:
+    lines = ['// generated benchmark program', 'var total = 0;']
+    for i in range(statement_count):
+        lines.append(f'var value_{i} = {i}.5 * (total + {i}); // statement {i}')
+        lines.append(f'if (value_{i} >= 10) {{ print "large value"; }} else {{ total = total + 1; }}')
+    return '\n'.join(lines) + '\n'
+
+
+def time_call(function: Callable[[], object], repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@benchmark
+def scanner() -> None:
+    source = generate_program(20_000)
+    megabytes = len(source.encode()) / 1_000_000
+    for scanner_class in (Scanner, FastScanner):
+        seconds = time_call(lambda: scanner_class(source, Lox()).scan_tokens())
+        print(f'{scanner_class.__name__:<12} {megabytes / seconds:8.2f} MB/s')
+
+
+def peak_memory(function: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@benchmark
+def mapped_scanner() -> None:
+    with tempfile.NamedTemporaryFile('w', suffix='.lox', delete=False) as file:
+        file.write(generate_program(5_000))
+    try:
+        def scan_text():
+            with open(file.name, 'r') as source_file:
+                FastScanner(source_file.read(), Lox()).scan_tokens()
+
+        def scan_mapped():
+            with open(file.name, 'rb') as source_file, MappedScanner.map_file(source_file) as source:
+                MappedScanner(source, Lox()).scan_tokens()
+
+        megabytes = os.path.getsize(file.name) / 1_000_000
+        print(f'source size            {megabytes:8.2f} MB')
+        print(f'FastScanner peak       {peak_memory(scan_text) / 1_000_000:8.2f} MB')
+        print(f'MappedScanner peak     {peak_memory(scan_mapped) / 1_000_000:8.2f} MB')
+    finally:
+        os.remove(file.name)
+
+
+def retained_memory(function: Callable[[], object]) -> tuple[object, int]:
+    tracemalloc.start()
+    try:
+        result = function()
+        return result, tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+@benchmark
+def token_stream() -> None:
+    source = generate_program(5_000)
+    for scanner_class in (FastScanner, TokenStreamScanner):
+        tokens, size = retained_memory(lambda: scanner_class(source, Lox()).scan_tokens())
+        seconds = time_call(lambda: Parser(tokens, Lox()).parse())
+        print(f'{scanner_class.__name__:<20} {size / len(tokens):8.1f} bytes/token   parse {seconds:6.3f} s')
+
+
+@benchmark
+def parallel_scanner() -> None:
+    source = generate_program(100_000)
+    megabytes = len(source.encode()) / 1_000_000
+    print(f'source size            {megabytes:8.2f} MB   ({os.cpu_count()} cores)')
+    seconds = time_call(lambda: TokenStreamScanner(source, Lox()).scan_tokens())
+    print(f'TokenStreamScanner     {megabytes / seconds:8.2f} MB/s')
+    for workers in (2, 4):
+        seconds = time_call(lambda: ParallelScanner(source, Lox(), workers, min_chunk_size=1).scan_tokens())
+        print(f'ParallelScanner x{workers}     {megabytes / seconds:8.2f} MB/s')
+
+
+def generate_expressions(statement_count: int) -> str:
+    return ''.join(f'var e_{i} = -(a_{i} + {i}) * b / (c - {i}.5) >= d or !flag and x == "s{i}";\n'
+                   for i in range(statement_count))
+
+
+@benchmark
+def parser() -> None:
+    for name, source in (('statements', generate_program(10_000)), ('expressions', generate_expressions(10_000))):
+        tokens = FastScanner(source, Lox()).scan_tokens()
+        for parser_class in (Parser, IterativeParser):
+            seconds = time_call(lambda: parser_class(tokens, Lox()).parse())
+            print(f'{name:<12} {parser_class.__name__:<16} {len(tokens) / seconds / 1000:8.1f} k tokens/s')
+
+
+def generate_rare_blocks(block_count: int, block_size: int) -> str:
+    lines = ['var debug = false;', 'print "start";']
+    for i in range(block_count):
+        body = ' '.join(f'print "block {i} line {j}" + "!"; var x_{j} = {j} * (1 + 2);' for j in range(block_size))
+        lines.append(f'if (debug) {{ {body} }}')
+    return '\n'.join(lines) + '\n'
+
+
+@benchmark
+def lazy_parser() -> None:
+    tokens = FastScanner(generate_rare_blocks(1_000, 50), Lox()).scan_tokens()
+    print(f'{len(tokens)} tokens in 1000 blocks that never run')
+    for name, parser_class in (('Parser', Parser), ('LazyParser', LazyParser)):
+        seconds = time_call(lambda: parser_class(tokens, Lox()).parse())
+        print(f'{name:<12} parse {seconds:6.3f} s')
+
+
+@benchmark
+def streaming() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, 'generated.lox')
+        for statement_count in (5_000, 20_000):
+            with open(script, 'w') as file:
+                file.write('var total = 0;\n')
+                for i in range(statement_count):
+                    file.write(f'total = total + {i} * 2; if (total > 10) {{ print "total " + "is large"; }}\n')
+            for stream in (False, True):
+                lox = Lox(stream=stream)
+                with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                    peak = peak_memory(lambda: lox.run_file(script))
+                print(f'{statement_count:>6} statements   {"streamed" if stream else "run":<8}   '
+                      f'peak {peak / 1_000_000:7.2f} MB')
+
+
+@benchmark
+def program_cache() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, 'generated.lox')
+        with open(script, 'w') as file:
+            file.write(generate_program(10_000))
+        cache = ProgramCache(script)
+
+        def scan_and_parse():
+            lox = Lox()
+            with open(script, 'r') as source_file:
+                return lox.parse(lox.scan(source_file.read()))
+
+        cache.store(scan_and_parse())
+        megabytes = os.path.getsize(script) / 1_000_000
+        print(f'source {megabytes:6.2f} MB   cache {os.path.getsize(cache.path) / 1_000_000:6.2f} MB')
+        print(f'scan and parse   {time_call(scan_and_parse):6.3f} s')
+        print(f'load from cache  {time_call(lambda: ProgramCache(script).load()):6.3f} s')
+
+
+def count_nodes(statements) -> int:
+    count, stack = 0, list(statements)
+    while stack:
+        node = stack.pop()
+        count += 1
+        for value in map(node.__getattribute__, node.__match_args__):
+            if isinstance(value, (Expr, Stmt)):
+                stack.append(value)
+            elif isinstance(value, (list, tuple)):
+                stack.extend(value)
+    return count
+
+
+@benchmark
+def ast_nodes() -> None:
+    tokens = FastScanner(generate_program(10_000), Lox()).scan_tokens()
+    statements, size = retained_memory(lambda: Parser(tokens, Lox()).parse())
+    node_count = count_nodes(statements)
+    print(f'{node_count} nodes   {size / node_count:6.1f} bytes/node (excluding tokens)')
+    seconds = time_call(lambda: Parser(tokens, Lox()).parse())
+    print(f'parse            {node_count / seconds / 1000:8.1f} k nodes/s')
+    copy = Parser(tokens, Lox()).parse()
+    seconds = time_call(lambda: statements == copy)
+    print(f'compare          {node_count / seconds / 1000:8.1f} k nodes/s')
+    seconds = time_call(lambda: [hash(statement) for statement in statements])
+    print(f'hash             {node_count / seconds / 1000:8.1f} k nodes/s')
+
+
+@benchmark
+def flat_ast() -> None:
+    tokens = FastScanner(generate_program(10_000), Lox()).scan_tokens()
+    statements, object_size = retained_memory(lambda: Parser(tokens, Lox()).parse())
+    flat, flat_size = retained_memory(lambda: FlatAst.from_statements(statements))
+    print(f'{len(flat)} nodes   objects {object_size / len(flat):6.1f} bytes/node   '
+          f'flat {flat_size / len(flat):6.1f} bytes/node')
+    data = flat.to_bytes()
+    print(f'parse            {time_call(lambda: Parser(tokens, Lox()).parse()):6.3f} s')
+    print(f'flatten          {time_call(lambda: FlatAst.from_statements(statements)):6.3f} s')
+    print(f'to bytes         {time_call(flat.to_bytes):6.3f} s   {len(data) / 1_000_000:6.2f} MB')
+    print(f'from bytes       {time_call(lambda: FlatAst.from_bytes(data)):6.3f} s')
+    print(f'to statements    {time_call(flat.to_statements):6.3f} s')
+
+
+@benchmark
+def hash_consing() -> None:
+    tokens = FastScanner(generate_program(10_000), Lox()).scan_tokens()
+    _, size = retained_memory(lambda: Parser(tokens, Lox()).parse())
+    hash_consed = HashConsing()
+
+    def parse_and_share():
+        statements = Parser(tokens, Lox()).parse()
+        hash_consed.share(statements)
+        # the table of shared nodes is only needed while sharing
+        hash_consed.shared_nodes.clear()
+        return statements
+
+    _, shared_size = retained_memory(parse_and_share)
+    print(f'{hash_consed.node_count} nodes   {hash_consed.shared_count} replaced by shared nodes')
+    print(f'retained         {size / 1_000_000:6.2f} MB -> {shared_size / 1_000_000:6.2f} MB   '
+          f'(estimated {hash_consed.bytes_saved / 1_000_000:.2f} MB saved)')
+    statements = Parser(tokens, Lox()).parse()
+    print(f'share            {time_call(lambda: HashConsing().share(statements)):6.3f} s')
+
+
+@benchmark
+def environment() -> None:
+    # the loop from lox_programs/while_loops.lox, nested in blocks so lookups walk several environments
+    source = 'var x = 0; var y = 0; { { { while (x < 100000) { y = y + x; x = x + 2; } } } }'
+    for interned in (False, True):
+        def run():
+            lox = Lox()
+            tokens = lox.scan(source)
+            if not interned:
+                # simulate the scanner before interning: every occurrence gets its own copy of the name
+                for token in tokens:
+                    if token.type == TokenType.IDENTIFIER:
+                        token.lexeme = ''.join(list(token.lexeme))
+            lox.execute(lox.parse(tokens))
+
+        print(f'{"interned" if interned else "copied":<10} {time_call(run):6.3f} s')
+
+
+@benchmark
+def block_environments() -> None:
+    # the body of the for loop is a block nested in the loop's scope
+    source = 'var total = 0; for (var i = 0; i < 100000; i = i + 1) { var a = i * 2; { total = total + a; } }'
+
+    class CountingEnvironment(BlockEnvironment):
+        __slots__ = ()
+        count = 0
+
+        def __init__(self, enclosing, slot_count: int):
+            CountingEnvironment.count += 1
+            super().__init__(enclosing, slot_count)
+
+    interpreter_module.BlockEnvironment = CountingEnvironment
+    try:
+        lox = Lox()
+        statements = lox.parse(lox.scan(source))
+        print(f'time                 {time_call(lambda: lox.execute(statements)):6.3f} s')
+        CountingEnvironment.count = 0
+        lox = Lox()
+        lox.execute(lox.parse(lox.scan(source)))
+        print(f'allocated per run    {CountingEnvironment.count:6}')
+    finally:
+        interpreter_module.BlockEnvironment = BlockEnvironment
+
+
+@benchmark
+def engines() -> None:
+    sources = {
+        'globals': 'var i = 0; var total = 0; while (i < 100000) { total = total + i * 2; i = i + 1; }',
+        'locals': '{ var i = 0; var total = 0; while (i < 100000) { total = total + i * 2; i = i + 1; } }',
+    }
+    for name, source in sources.items():
+        for engine in Lox.ENGINES:
+            lox = Lox(engine=engine)
+            statements = lox.parse(lox.scan(source))
+            print(f'{name:<8} {engine:<10} {time_call(lambda: lox.execute(statements)):6.3f} s')
+
+
+@benchmark
+def optimizer() -> None:
+    source = 'var i = 0; var total = 0; while (i < 100000) { ' \
+             'total = total + (2 + 1) * 4 - (-1); if (true) { i = i + 1; } if (!true) print "never"; }'
+    for optimize in (False, True):
+        lox = Lox(optimize=optimize)
+        statements = lox.parse(lox.scan(source))
+        print(f'{"optimized" if optimize else "parsed":<10} {time_call(lambda: lox.execute(statements)):6.3f} s')
+
+
+@benchmark
+def output() -> None:
+    source = 'for (var i = 0; i < 100000; i = i + 1) { print i; print i / 4; print "line"; }'
+    sinks = {f'flush {policy}': lambda policy=policy: StreamSink(policy) for policy in StreamSink.FLUSH_POLICIES}
+    sinks['null'] = NullSink
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        for name, sink in sinks.items():
+            lox = Lox(engine='closure')
+            statements = lox.parse(lox.scan(source))
+
+            def run():
+                lox.interpreter.output = sink()
+                lox.execute(statements)
+            print(f'{name:<12} {time_call(run):6.3f} s', file=sys.stderr)
+
+
+@benchmark
+def incremental() -> None:
+    generator = random.Random(1)
+    for line_count in (5_000, 50_000, 200_000):
+        source = generate_program(line_count // 2)
+        document = IncrementalDocument(source, Lox())
+        positions = [source.index(f'value_{generator.randrange(line_count // 2)} ') for _ in range(20)]
+        timings = []
+        for text in ('x', '\n'):
+            def type_and_delete():
+                for position in positions:
+                    document.edit(position, position, text)
+                    document.edit(position, position + 1, '')
+
+            timings.append(time_call(type_and_delete, repeat=1) / (2 * len(positions)))
+        full_parse = time_call(lambda: Parser(FastScanner(document.source, Lox()).scan_tokens(), Lox()).parse(), 1)
+        print(f'{line_count:>7} lines   edit {timings[0] * 1000:6.2f} ms   newline {timings[1] * 1000:6.2f} ms   '
+              f'full parse {full_parse * 1000:8.1f} ms')
+
+
+def main():
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f'Unknown benchmark {name}. Choose from: {", ".join(BENCHMARKS)}', file=sys.stderr)
+            sys.exit(64)
+        print(f'== {name}')
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    main()
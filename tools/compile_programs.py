@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+
+from lox import Lox
+from program_cache import ProgramCache
+
+# usage (from the repository root): python -m tools.compile_programs [-f] [-q] path [path ...]
+# like python -m compileall, caches the parsed form of every .lox script in the given directories (recursively)
+# and files in their __loxcache__ directories, so that `lox.py --cache` can skip scanning and parsing them
+
+
+def lox_scripts(path: str):
+    if not os.path.isdir(path):
+        yield path
+        return
+    for directory, directory_names, file_names in os.walk(path):
+        directory_names[:] = sorted(name for name in directory_names if name != ProgramCache.DIRECTORY)
+        for file_name in sorted(file_names):
+            if file_name.endswith('.lox'):
+                yield os.path.join(directory, file_name)
+
+
+def compile_script(file_path: str, force: bool, quiet: bool) -> bool:
+    cache = ProgramCache(file_path)
+    if not force and cache.load() is not None:
+        return True
+    if not quiet:
+        print(f'Compiling {file_path!r}...')
+    lox = Lox()
+    with open(file_path, 'r') as file:
+        source = file.read()
+    statements = lox.parse(lox.scan(source))
+    if lox.had_parser_error:
+        return False
+    cache.store(statements)
+    return True
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(prog='python -m tools.compile_programs')
+    argument_parser.add_argument('paths', nargs='+', metavar='path', help='a .lox script or a directory of them')
+    argument_parser.add_argument('-f', '--force', action='store_true', help='recompile scripts with a valid cache')
+    argument_parser.add_argument('-q', '--quiet', action='store_true', help='only report errors')
+    arguments = argument_parser.parse_args()
+    success = True
+    for path in arguments.paths:
+        for file_path in lox_scripts(path):
+            success = compile_script(file_path, arguments.force, arguments.quiet) and success
+    sys.exit(0 if success else 1)
+
+
+if __name__ == '__main__':
+    main()
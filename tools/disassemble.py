@@ -0,0 +1,24 @@
+import argparse
+import sys
+
+from lox import Lox
+from virtual_machine import BytecodeInterpreter
+
+# usage (from the repository root): python -m tools.disassemble script.lox
+# prints the bytecode `lox.py --engine bytecode` runs for the script: offset, line, instruction and operand
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(prog='python -m tools.disassemble')
+    argument_parser.add_argument('script', help='the .lox script to compile')
+    arguments = argument_parser.parse_args()
+    lox = Lox()
+    with open(arguments.script, 'r') as file:
+        statements = lox.parse(lox.scan(file.read()))
+    if lox.had_parser_error:
+        sys.exit(65)
+    print(BytecodeInterpreter.compile(statements).disassemble())
+
+
+if __name__ == '__main__':
+    main()
@@ -11,24 +11,25 @@ def main():
     define_ast(
         "Expr",
         [
-            "Binary   :: left: Expr, operator: Token, right: Expr",
-            "Logical :: left: Expr, operator: Token, right: Expr",
+            "Binary   :: left: Expr, operator: Token, right: Expr | handler, operand_type",
+            "Logical :: left: Expr, operator: Token, right: Expr | handler",
             "Grouping :: expression: Expr",
             "Literal  :: value: object",
-            "Unary    :: operator: Token, right: Expr",
-            "Variable :: name: Token",
-            "Assignment :: name: Token, value: Expr"
+            "Unary    :: operator: Token, right: Expr | handler, operand_type",
+            "Variable :: name: Token | hops, slot",
+            "Assignment :: name: Token, value: Expr | hops, slot"
         ]
     )
     define_ast(
         "Stmt",
         [
             "Expression   :: expression: Expr",
-            "Var :: name: Token, initializer: Expr",
+            "Var :: name: Token, initializer: Expr | slot",
             "Print   :: expression: Expr",
-            "Block :: statements: Iterable[Stmt]",
+            "Block :: statements: Iterable[Stmt] | slot_count, environment",
             "If :: condition: Expr, if_branch: Stmt, else_branch: Stmt",
-            "While :: condition: Expr, body: Stmt"
+            "While :: condition: Expr, body: Stmt",
+            "For :: initializer: Stmt, condition: Expr, increment: Expr, body: Stmt | slot_count, environment"
         ]
     )
 
@@ -41,16 +42,17 @@ def define_ast(base_name: str, types: List[str]):
         if any(type_string.count('Iterable') for type_string in types):
             file.write('from typing import Iterable\n')
         file.write('\n')
+        file.write('from node import Node\n')
         if any(type_string.count('Token') for type_string in types):
             file.write('from lox_token import Token\n')
         if base_name != 'Expr':
             file.write('from expr import Expr\n')
         file.write('\n\n')
-        # base class
-        file.write(f'class {base_name}(ABC):\n\n')
-        file.write('    @abstractmethod\n')
+        # base class: nodes are created in bulk by the parser, so it is not an ABC and has no per-instance __dict__
+        file.write(f'class {base_name}(Node):\n')
+        file.write('    __slots__ = ()\n\n')
         file.write('    def accept(self, visitor):\n')
-        file.write('        pass\n\n\n')
+        file.write('        raise NotImplementedError\n\n\n')
         names = [type_string.split('::')[0].strip() for type_string in types]
         field_lists = [type_string.split('::')[1].strip() for type_string in types]
         # visitor abstract class
@@ -75,30 +77,55 @@ def define_visitor(file: TextIO, base_name: str, names: List[str]):
 
 def define_type(file: TextIO, base_name: str, name: str, fields: str):
     # class definition
-    file.write(f'class {name}{base_name}({base_name}):\n\n')
+    file.write(f'class {name}{base_name}({base_name}):\n')
+    # annotations, listed after a '|', are set by passes over the parsed tree (such as Resolver), not by the parser
+    fields, _, annotations = (part.strip() for part in fields.partition('|'))
+    field_names = tuple(field.split(': ')[0] for field in fields.split(', '))
+    annotation_names = tuple(annotations.split(', ')) if annotations else ()
+    # the fields, which Node also uses for structural equality, hashing and repr
+    file.write(f'    __slots__ = {field_names + annotation_names!r}\n')
+    file.write(f'    __match_args__ = {field_names!r}\n\n')
     # __init__
     file.write(f'    def __init__(self, {fields}):\n')
     fields = fields.split(', ')
-    # fields
-    field_names = tuple(field.split(': ')[0] for field in fields)
     for field_name in field_names:
         file.write(f'        self.{field_name} = {field_name}\n')
+    for annotation_name in annotation_names:
+        file.write(f'        self.{annotation_name} = None\n')
     file.write('\n')
     # accept method
     file.write(f'    def accept(self, visitor: {base_name}Visitor):\n')
     file.write(f'        return visitor.visit_{name.lower()}_{base_name.lower()}(self)\n\n')
-    # __eq__ method
-    file.write('    def __eq__(self, other):\n')
-    file.write('        if type(self) != type(other):\n')
-    file.write('            return False\n')
-    # this is not very readable... but it is cool that you can have nested fstrings
-    file.write(f'        return {" and ".join(f"self.{name} == other.{name}" for name in field_names)}')
-    file.write('\n\n')
-    # __repr__ method
-    file.write('    def __repr__(self):\n')
-    string_representation = f'{name}{base_name}({", ".join(f"{name}={{self.{name}}}" for name in field_names)})'
-    file.write(f"        return f'{string_representation}'")
-    file.write('\n')
+    # equal_fields method, used by Node.__eq__: compares the fields that are not nodes and queues the ones that are
+    field_types = tuple(field.split(': ')[1] for field in fields)
+    file.write('    def equal_fields(self, other, pending: list) -> bool:\n')
+    comparisons = []
+    for field_name, field_type in zip(field_names, field_types):
+        if field_type.startswith('Iterable['):
+            file.write(f'        if type(self.{field_name}) is not type(other.{field_name}) '
+                       f'or len(self.{field_name}) != len(other.{field_name}):\n')
+            file.write('            return False\n')
+            file.write(f'        pending.extend(zip(self.{field_name}, other.{field_name}))\n')
+        elif field_type in ('Expr', 'Stmt'):
+            file.write(f'        pending.append((self.{field_name}, other.{field_name}))\n')
+        else:
+            comparisons.append(f'self.{field_name} == other.{field_name}')
+    file.write(f'        return {" and ".join(comparisons) or "True"}\n\n')
+    # hash_fields method, used by Node.__hash__: hashes the fields that are not nodes and queues the ones that are;
+    # tokens are hashed by lexeme alone, which is consistent with equality
+    file.write('    def hash_fields(self, pending: list) -> tuple:\n')
+    keys = []
+    for field_name, field_type in zip(field_names, field_types):
+        if field_type.startswith('Iterable['):
+            file.write(f'        pending.extend(self.{field_name})\n')
+            keys.append(f'len(self.{field_name})')
+        elif field_type in ('Expr', 'Stmt'):
+            file.write(f'        pending.append(self.{field_name})\n')
+        elif field_type == 'Token':
+            keys.append(f'self.{field_name}.lexeme')
+        else:
+            keys.append(f'self.{field_name}')
+    file.write(f'        return ({", ".join(keys)}{"," if len(keys) == 1 else ""})\n')
 
 
 if __name__ == '__main__':
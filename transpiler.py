@@ -0,0 +1,380 @@
+import ast
+import warnings
+from typing import Dict, List, Optional, Sequence
+
+from token_type import TokenType
+from lox_token import Token
+from expr import ExprVisitor, Expr, LiteralExpr, GroupingExpr, UnaryExpr, BinaryExpr, VariableExpr, AssignmentExpr, \
+    LogicalExpr
+from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from resolver import Resolver
+from runtime_exception import RuntimeException
+from interpreter import Interpreter
+from operators import add
+from parser import ParserError
+from lazy_parser import LazyBlockStmt
+
+
+def name(identifier: str) -> ast.Name:
+    return ast.Name(identifier, ast.Load())
+
+
+def call(function: str, *arguments: ast.expr) -> ast.Call:
+    return ast.Call(name(function), list(arguments), [])
+
+
+def is_not(left: ast.expr, right: ast.expr) -> ast.Compare:
+    return ast.Compare(left, [ast.IsNot()], [right])
+
+
+def is_truthy(value: ast.expr) -> ast.expr:
+    if type(value) is ast.Constant:
+        return ast.Constant(value.value is not None and value.value is not False)
+    if Transpiler.is_bool(value):
+        return value
+    return ast.BoolOp(ast.And(), [is_not(value, ast.Constant(None)), is_not(value, ast.Constant(False))])
+
+
+def is_falsey(value: ast.expr) -> ast.expr:
+    if type(value) is ast.Constant:
+        return ast.Constant(value.value is None or value.value is False)
+    if Transpiler.is_bool(value):
+        return ast.UnaryOp(ast.Not(), value)
+    return ast.BoolOp(ast.Or(), [ast.Compare(value, [ast.Is()], [ast.Constant(None)]),
+                                 ast.Compare(value, [ast.Is()], [ast.Constant(False)])])
+
+
+def can_fail(value: ast.expr) -> bool:
+    return any(type(node) is ast.Call for node in ast.walk(value))
+
+
+def has_assignment(expr: Expr) -> bool:
+    stack = [expr]
+    while stack:
+        expr = stack.pop()
+        if type(expr) is AssignmentExpr:
+            return True
+        stack.extend(child for child in map(expr.__getattribute__, expr.__match_args__) if isinstance(child, Expr))
+    return False
+
+
+class Transpiler(ExprVisitor, StmtVisitor):
+    """Translates resolved statements into the body of a Python function, with each local a Python local."""
+    PARAMETERS = ('G', 'T', 'fail', 'undefined', 'stringify', 'write_line', 'add', 'type', 'float')
+    NUMBER_OPERATORS = {
+        TokenType.MINUS: ast.Sub,
+        TokenType.STAR: ast.Mult,
+        TokenType.SLASH: ast.Div,
+    }
+    COMPARISON_OPERATORS = {
+        TokenType.GREATER: ast.Gt,
+        TokenType.GREATER_EQUAL: ast.GtE,
+        TokenType.LESS: ast.Lt,
+        TokenType.LESS_EQUAL: ast.LtE,
+        TokenType.EQUAL_EQUAL: ast.Eq,
+        TokenType.BANG_EQUAL: ast.NotEq,
+    }
+
+    def __init__(self):
+        # the statements being emitted
+        self.body: List[ast.stmt] = []
+        # the Python name of each slot of each enclosing block, innermost last
+        self.blocks: List[Dict[int, str]] = []
+        self.name_count = 0
+        # the tokens runtime errors are reported at, which the generated code indexes as T
+        self.tokens: List[Token] = []
+
+    def transpile(self, stmts: Sequence[Stmt]) -> ast.Module:
+        for stmt in stmts:
+            stmt.accept(self)
+        arguments = ast.arguments([], [ast.arg(parameter) for parameter in Transpiler.PARAMETERS], None, [], [], None,
+                                  [])
+        function = ast.FunctionDef('lox_program', arguments, self.body or [ast.Pass()], [], None)
+        return ast.fix_missing_locations(ast.Module([function], []))
+
+    def new_name(self, prefix: str) -> str:
+        self.name_count += 1
+        return f'{prefix}{self.name_count}'
+
+    def token(self, token: Token) -> ast.expr:
+        self.tokens.append(token)
+        return ast.Subscript(name('T'), ast.Constant(len(self.tokens) - 1), ast.Load())
+
+    def emit(self, stmt: ast.stmt) -> None:
+        self.body.append(stmt)
+
+    def assign(self, target: str, value: ast.expr) -> ast.Name:
+        self.emit(ast.Assign([ast.Name(target, ast.Store())], value))
+        return name(target)
+
+    def fail_if(self, condition: ast.expr, token: Token, message: str) -> None:
+        self.emit(ast.If(condition, [ast.Expr(call('fail', self.token(token), ast.Constant(message)))], []))
+
+    def evaluate(self, expr: Expr) -> ast.expr:
+        return expr.accept(self)
+
+    def evaluate_operands(self, left: Expr, right: Expr) -> tuple[ast.expr, ast.expr]:
+        # operand checks run after both operands are evaluated, exactly where Interpreter checks them
+        left_value = self.evaluate(left)
+        body, self.body = self.body, []
+        right_value = self.evaluate(right)
+        right_statements, self.body = self.body, body
+        # the right operand could change the variable the left one read, and a call in the left one (such as add)
+        # could fail, which must happen before any check the right one runs
+        if type(left_value) is not ast.Constant and \
+                (has_assignment(right) or right_statements and can_fail(left_value)):
+            left_value = self.assign(self.new_name('t'), left_value)
+        self.body.extend(right_statements)
+        return left_value, right_value
+
+    def evaluate_block(self, statements: Sequence[Stmt]) -> List[ast.stmt]:
+        body, self.body = self.body, []
+        for statement in statements:
+            statement.accept(self)
+        statements, self.body = self.body, body
+        return statements or [ast.Pass()]
+
+    @staticmethod
+    def is_bool(value: ast.expr) -> bool:
+        return type(value) is ast.Compare or (type(value) is ast.UnaryOp and type(value.op) is ast.Not) or \
+            (type(value) is ast.BoolOp and all(Transpiler.is_bool(operand) for operand in value.values))
+
+    @staticmethod
+    def is_constant_of(value: ast.expr, *types: type) -> bool:
+        return type(value) is ast.Constant and type(value.value) in types
+
+    def type_is_not(self, value: ast.expr, expected: str) -> ast.expr:
+        return is_not(call('type', value), name(expected))
+
+    def visit_expression_stmt(self, stmt: ExpressionStmt) -> None:
+        value = self.evaluate(stmt.expression)
+        if type(value) is not ast.Name and type(value) is not ast.Constant:
+            self.emit(ast.Expr(value))
+
+    def visit_print_stmt(self, stmt: PrintStmt) -> None:
+        self.emit(ast.Expr(call('write_line', call('stringify', self.evaluate(stmt.expression)))))
+
+    def visit_var_stmt(self, stmt: VarStmt) -> None:
+        value = ast.Constant(None) if stmt.initializer is None else self.evaluate(stmt.initializer)
+        if stmt.slot is None:
+            target = ast.Subscript(name('G'), ast.Constant(stmt.name.lexeme), ast.Store())
+            self.emit(ast.Assign([target], value))
+        else:
+            slots = self.blocks[-1]
+            if stmt.slot not in slots:
+                slots[stmt.slot] = self.new_name('v')
+            self.assign(slots[stmt.slot], value)
+
+    def visit_block_stmt(self, stmt: BlockStmt) -> None:
+        if type(stmt) is LazyBlockStmt and stmt.slot_count is None:
+            # the whole program is compiled before it runs, so lazy blocks are parsed (and report errors) up front
+            Resolver.resolve_lazy_block(stmt)
+        if not stmt.slot_count:
+            for statement in stmt.statements:
+                statement.accept(self)
+            return
+        # each run of the block reuses its Python locals, which is safe for the reason given in
+        # Interpreter.scope_environment
+        self.blocks.append({})
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.blocks.pop()
+
+    def visit_if_stmt(self, stmt: IfStmt) -> None:
+        condition = is_truthy(self.evaluate(stmt.condition))
+        if_branch = self.evaluate_block((stmt.if_branch,))
+        else_branch = [] if stmt.else_branch is None else self.evaluate_block((stmt.else_branch,))
+        self.emit(ast.If(condition, if_branch, else_branch))
+
+    def visit_while_stmt(self, stmt: WhileStmt) -> None:
+        self.emit_loop(stmt.condition, (stmt.body,))
+
+    def emit_loop(self, condition: Optional[Expr], statements: Sequence[Stmt]) -> None:
+        if condition is None:
+            self.emit(ast.While(ast.Constant(True), self.evaluate_block(statements), []))
+            return
+        body, self.body = self.body, []
+        condition = self.evaluate(condition)
+        condition_statements, self.body = self.body, body
+        loop_body = self.evaluate_block(statements)
+        if not condition_statements:
+            self.emit(ast.While(is_truthy(condition), loop_body, []))
+        else:
+            exit_loop = ast.If(is_falsey(condition), [ast.Break()], [])
+            self.emit(ast.While(ast.Constant(True), condition_statements + [exit_loop] + loop_body, []))
+
+    def visit_for_stmt(self, stmt: ForStmt) -> None:
+        if stmt.slot_count:
+            self.blocks.append({})
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        body = (stmt.body,) if stmt.increment is None else (stmt.body, ExpressionStmt(stmt.increment))
+        self.emit_loop(stmt.condition, body)
+        if stmt.slot_count:
+            self.blocks.pop()
+
+    def visit_literal_expr(self, expr: LiteralExpr) -> ast.expr:
+        return ast.Constant(expr.value)
+
+    def visit_grouping_expr(self, expr: GroupingExpr) -> ast.expr:
+        return self.evaluate(expr.expression)
+
+    def visit_variable_expr(self, expr: VariableExpr) -> ast.expr:
+        if expr.hops is not None:
+            return name(self.blocks[-1 - expr.hops][expr.slot])
+        lexeme = ast.Constant(expr.name.lexeme)
+        value = ast.IfExp(ast.Compare(lexeme, [ast.In()], [name('G')]),
+                          ast.Subscript(name('G'), lexeme, ast.Load()),
+                          call('undefined', self.token(expr.name)))
+        return self.assign(self.new_name('t'), value)
+
+    def visit_assignment_expr(self, expr: AssignmentExpr) -> ast.expr:
+        value = self.evaluate(expr.value)
+        if expr.hops is not None:
+            return self.assign(self.blocks[-1 - expr.hops][expr.slot], value)
+        lexeme = ast.Constant(expr.name.lexeme)
+        if type(value) is not ast.Constant:
+            value = self.assign(self.new_name('t'), value)
+        self.emit(ast.If(ast.Compare(lexeme, [ast.NotIn()], [name('G')]),
+                         [ast.Expr(call('undefined', self.token(expr.name)))], []))
+        self.emit(ast.Assign([ast.Subscript(name('G'), lexeme, ast.Store())], value))
+        return value
+
+    def visit_unary_expr(self, expr: UnaryExpr) -> ast.expr:
+        value = self.evaluate(expr.right)
+        if expr.operator.type == TokenType.BANG:
+            return is_falsey(value)
+        if not Transpiler.is_constant_of(value, float) and expr.operand_type is not float:
+            value = self.materialize(value)
+            self.fail_if(self.type_is_not(value, 'float'), expr.operator, 'Operand must be a number.')
+        return ast.UnaryOp(ast.USub(), value)
+
+    def visit_binary_expr(self, expr: BinaryExpr) -> ast.expr:
+        operator = expr.operator
+        left, right = self.evaluate_operands(expr.left, expr.right)
+        if operator.type in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+            return ast.Compare(left, [Transpiler.COMPARISON_OPERATORS[operator.type]()], [right])
+        appends_to_global = Transpiler.reads_global(expr.left)
+        if expr.operand_type is float or expr.operand_type is str:
+            # TypeInferrer proved the operand types, so the operation needs no checks
+            return self.unchecked_operation(operator, left, right, expr.operand_type, appends_to_global)
+        left, right = self.materialize(left), self.materialize(right)
+        if operator.type == TokenType.PLUS:
+            return self.addition(operator, left, right, appends_to_global)
+        checks = [self.type_is_not(value, 'float') for value in (left, right)
+                  if not Transpiler.is_constant_of(value, float)]
+        if checks:
+            self.fail_if(checks[0] if len(checks) == 1 else ast.BoolOp(ast.Or(), checks), operator,
+                         'Operands must be numbers.')
+        if operator.type in Transpiler.NUMBER_OPERATORS:
+            return ast.BinOp(left, Transpiler.NUMBER_OPERATORS[operator.type](), right)
+        return ast.Compare(left, [Transpiler.COMPARISON_OPERATORS[operator.type]()], [right])
+
+    @staticmethod
+    def reads_global(expr: Expr) -> bool:
+        return type(expr) is VariableExpr and expr.hops is None
+
+    def unchecked_operation(self, operator: Token, left: ast.expr, right: ast.expr, operand_type: type,
+                            appends_to_global: bool) -> ast.expr:
+        if operand_type is str:
+            return self.concatenation(operator, left, right, None if appends_to_global else
+                                      ast.BoolOp(ast.Or(), [self.type_is_not(value, 'str') for value in (left, right)]))
+        if operator.type == TokenType.PLUS:
+            return ast.BinOp(left, ast.Add(), right)
+        if operator.type in Transpiler.NUMBER_OPERATORS:
+            return ast.BinOp(left, Transpiler.NUMBER_OPERATORS[operator.type](), right)
+        return ast.Compare(left, [Transpiler.COMPARISON_OPERATORS[operator.type]()], [right])
+
+    def addition(self, operator: Token, left: ast.expr, right: ast.expr, appends_to_global: bool) -> ast.expr:
+        """
+        Adds numbers and concatenates strs inline, and calls operators.add for Ropes and for operands it rejects.
+        Strings appended to a global also go through add, so one built up over the whole program becomes a Rope.
+        """
+        message = 'Operands must both be numbers or both be strings.'
+        if type(left) is ast.Constant and type(right) is ast.Constant:
+            if type(left.value) is not type(right.value) or type(left.value) not in (float, str):
+                self.fail_if(ast.Constant(True), operator, message)
+            return ast.BinOp(left, ast.Add(), right)
+        for known, other in ((left, right), (right, left)):
+            if type(known) is not ast.Constant:
+                continue
+            if type(known.value) is str:
+                return self.concatenation(operator, left, right,
+                                          None if appends_to_global else self.type_is_not(other, 'str'))
+            if type(known.value) is float:
+                self.fail_if(self.type_is_not(other, 'float'), operator, message)
+            else:
+                # nil or a boolean
+                self.fail_if(ast.Constant(True), operator, message)
+            return ast.BinOp(left, ast.Add(), right)
+        if appends_to_global:
+            needs_add = ast.BoolOp(ast.Or(), [self.type_is_not(value, 'float') for value in (left, right)])
+        else:
+            left_type = call('type', left)
+            needs_add = ast.BoolOp(ast.Or(), [
+                is_not(left_type, call('type', right)),
+                ast.BoolOp(ast.And(), [is_not(left_type, name('float')), is_not(left_type, name('str'))])
+            ])
+        return self.concatenation(operator, left, right, needs_add)
+
+    def concatenation(self, operator: Token, left: ast.expr, right: ast.expr, needs_add: Optional[ast.expr]) -> \
+            ast.expr:
+        if needs_add is None:
+            return call('add', self.token(operator), left, right)
+        # the inline + comes last, so `s = s + t;` on a local is followed right away by the store CPython looks for
+        # to extend s in place
+        return ast.IfExp(needs_add, call('add', self.token(operator), left, right), ast.BinOp(left, ast.Add(), right))
+
+    def visit_logical_expr(self, expr: LogicalExpr) -> ast.expr:
+        result = self.assign(self.new_name('t'), self.evaluate(expr.left))
+        body, self.body = self.body, []
+        self.assign(result.id, self.evaluate(expr.right))
+        right_statements, self.body = self.body, body
+        condition = is_falsey(result) if expr.operator.type == TokenType.OR else is_truthy(result)
+        self.emit(ast.If(condition, right_statements, []))
+        return result
+
+    def materialize(self, value: ast.expr) -> ast.expr:
+        """Assigns value to a temporary unless it is already a name or constant, so it is only evaluated once."""
+        if type(value) is ast.Name or type(value) is ast.Constant:
+            return value
+        return self.assign(self.new_name('t'), value)
+
+
+class TranspilingInterpreter(Interpreter):
+    """Runs statements by translating them to Python with a Transpiler and executing the compiled code."""
+
+    def interpret(self, stmts: Sequence[Stmt]) -> None:
+        Resolver().resolve(stmts)
+        try:
+            transpiler = Transpiler()
+            module = transpiler.transpile(stmts)
+            namespace = {}
+            with warnings.catch_warnings():
+                # Python folds operations on constants, then warns about tests like `-1.0 is not None`
+                warnings.simplefilter('ignore', SyntaxWarning)
+                try:
+                    code = compile(module, '<lox>', 'exec')
+                except SyntaxError:
+                    # Python nests at most 20 loops in a function, so more deeply nested loops run on the tree-walker
+                    code = None
+            if code is None:
+                super().interpret(stmts)
+                return
+            exec(code, namespace)
+            namespace['lox_program'](self.globals.values, transpiler.tokens, TranspilingInterpreter.fail,
+                                     TranspilingInterpreter.undefined, Interpreter.stringify_value,
+                                     self.output.write_line, add, type, float)
+        except RuntimeException as exception:
+            self.lox.runtime_exception(exception)
+        except ParserError:
+            # a lazily parsed block had syntax errors, which were reported when it was parsed
+            pass
+
+    @staticmethod
+    def fail(token: Token, message: str) -> None:
+        raise RuntimeException(token, message)
+
+    @staticmethod
+    def undefined(token: Token) -> None:
+        raise RuntimeException(token, f'Undefined variable {token.lexeme}.')
@@ -0,0 +1,183 @@
+from typing import Dict, List, Optional, Sequence
+
+from token_type import TokenType
+from lox_token import Token
+from expr import ExprVisitor, Expr, LiteralExpr, GroupingExpr, UnaryExpr, BinaryExpr, VariableExpr, AssignmentExpr, \
+    LogicalExpr
+from stmt import StmtVisitor, Stmt, ExpressionStmt, PrintStmt, VarStmt, BlockStmt, IfStmt, WhileStmt, ForStmt
+from lazy_parser import LazyBlockStmt
+
+# a variable is a global's name or the id of a local's VarStmt; its type is float, str, bool, NoneType or
+# object, which stands for any type
+Variable = str | int
+Types = Dict[Variable, type]
+
+
+class TypeInferrer(ExprVisitor, StmtVisitor):
+    """
+    Sets the operand_type of each BinaryExpr and minus UnaryExpr to the type its operands are proven to always have,
+    float or str (which includes Ropes), so the engines skip their checks, or to object.
+    """
+    NUMBER_OPERATORS = (TokenType.MINUS, TokenType.STAR, TokenType.SLASH)
+
+    def __init__(self):
+        # the known types of variables, leaving out those that could have any type
+        self.types: Types = {}
+        # the variable of each name declared in each enclosing block, innermost last
+        self.scopes: List[Dict[str, int]] = []
+        # the types after a loop, by the loop's id and the types before it, so nested loops are not inferred again
+        # for every pass over the loops enclosing them
+        self.loop_exits: Dict[tuple, Types] = {}
+
+    def infer(self, stmts: Sequence[Stmt]) -> None:
+        for stmt in stmts:
+            stmt.accept(self)
+
+    def infer_type(self, expr: Expr) -> type:
+        return expr.accept(self)
+
+    def variable(self, name: Token) -> Variable:
+        lexeme = name.lexeme
+        for scope in reversed(self.scopes):
+            if lexeme in scope:
+                return scope[lexeme]
+        return lexeme
+
+    def assign(self, variable: Variable, value_type: type) -> None:
+        if value_type is object:
+            self.types.pop(variable, None)
+        else:
+            self.types[variable] = value_type
+
+    @staticmethod
+    def join(types: Types, other: Types) -> Types:
+        """The types known after either of two branches ran."""
+        return {variable: value_type for variable, value_type in types.items() if other.get(variable) is value_type}
+
+    @staticmethod
+    def mark(expr: BinaryExpr | UnaryExpr, operand_type: type) -> None:
+        # a node can be inferred more than once, such as in a loop or when hash-consed, and must hold for every time
+        if expr.operand_type is None:
+            expr.operand_type = operand_type
+        elif expr.operand_type is not operand_type:
+            expr.operand_type = object
+
+    def infer_loop(self, loop: Stmt, condition: Optional[Expr], body: Stmt, increment: Optional[Expr]) -> None:
+        entries = []
+        types = self.types
+        # inferred again until the types at the top of the loop stop changing
+        while True:
+            entry = (id(loop), frozenset(types.items()))
+            exit_types = self.loop_exits.get(entry)
+            if exit_types is not None:
+                break
+            entries.append(entry)
+            self.types = dict(types)
+            if condition is not None:
+                self.infer_type(condition)
+            # the loop stops after evaluating its condition
+            exit_types = dict(self.types)
+            body.accept(self)
+            if increment is not None:
+                self.infer_type(increment)
+            joined = TypeInferrer.join(types, self.types)
+            if joined == types:
+                break
+            types = joined
+        for entry in entries:
+            self.loop_exits[entry] = exit_types
+        self.types = dict(exit_types)
+
+    def visit_expression_stmt(self, stmt: ExpressionStmt) -> None:
+        self.infer_type(stmt.expression)
+
+    def visit_print_stmt(self, stmt: PrintStmt) -> None:
+        self.infer_type(stmt.expression)
+
+    def visit_var_stmt(self, stmt: VarStmt) -> None:
+        value_type = type(None) if stmt.initializer is None else self.infer_type(stmt.initializer)
+        if self.scopes:
+            # a block that runs again declares its variables again, so they stay the same variables
+            variable = self.scopes[-1][stmt.name.lexeme] = id(stmt)
+            self.assign(variable, value_type)
+        else:
+            self.assign(stmt.name.lexeme, value_type)
+
+    def visit_block_stmt(self, stmt: BlockStmt) -> None:
+        if type(stmt) is LazyBlockStmt:
+            # inferred on its own when it is parsed, and may assign anything
+            self.types = {}
+            return
+        self.scopes.append({})
+        self.infer(stmt.statements)
+        self.end_scope()
+
+    def end_scope(self) -> None:
+        for variable in self.scopes.pop().values():
+            self.types.pop(variable, None)
+
+    def visit_if_stmt(self, stmt: IfStmt) -> None:
+        self.infer_type(stmt.condition)
+        types = dict(self.types)
+        stmt.if_branch.accept(self)
+        if_types, self.types = self.types, types
+        if stmt.else_branch is not None:
+            stmt.else_branch.accept(self)
+        self.types = TypeInferrer.join(if_types, self.types)
+
+    def visit_while_stmt(self, stmt: WhileStmt) -> None:
+        self.infer_loop(stmt, stmt.condition, stmt.body, None)
+
+    def visit_for_stmt(self, stmt: ForStmt) -> None:
+        self.scopes.append({})
+        if stmt.initializer is not None:
+            stmt.initializer.accept(self)
+        self.infer_loop(stmt, stmt.condition, stmt.body, stmt.increment)
+        self.end_scope()
+
+    def visit_literal_expr(self, expr: LiteralExpr) -> type:
+        return type(expr.value)
+
+    def visit_grouping_expr(self, expr: GroupingExpr) -> type:
+        return self.infer_type(expr.expression)
+
+    def visit_variable_expr(self, expr: VariableExpr) -> type:
+        return self.types.get(self.variable(expr.name), object)
+
+    def visit_assignment_expr(self, expr: AssignmentExpr) -> type:
+        value_type = self.infer_type(expr.value)
+        self.assign(self.variable(expr.name), value_type)
+        return value_type
+
+    def visit_unary_expr(self, expr: UnaryExpr) -> type:
+        operand_type = self.infer_type(expr.right)
+        if expr.operator.type == TokenType.BANG:
+            return bool
+        TypeInferrer.mark(expr, float if operand_type is float else object)
+        return float
+
+    def visit_logical_expr(self, expr: LogicalExpr) -> type:
+        left_type = self.infer_type(expr.left)
+        # the right operand may not run
+        types = dict(self.types)
+        right_type = self.infer_type(expr.right)
+        self.types = TypeInferrer.join(types, self.types)
+        return left_type if left_type is right_type else object
+
+    def visit_binary_expr(self, expr: BinaryExpr) -> type:
+        left_type, right_type = self.infer_type(expr.left), self.infer_type(expr.right)
+        operator_type = expr.operator.type
+        if operator_type in (TokenType.EQUAL_EQUAL, TokenType.BANG_EQUAL):
+            return bool
+        if operator_type == TokenType.PLUS:
+            # the sum of a number and anything else fails unless it is a number, and likewise for strings
+            if float in (left_type, right_type):
+                TypeInferrer.mark(expr, float if left_type is right_type else object)
+                return float
+            if str in (left_type, right_type):
+                TypeInferrer.mark(expr, str if left_type is right_type else object)
+                return str
+            TypeInferrer.mark(expr, object)
+            return object
+        TypeInferrer.mark(expr, float if left_type is float and right_type is float else object)
+        return float if operator_type in TypeInferrer.NUMBER_OPERATORS else bool
@@ -0,0 +1,159 @@
+from typing import Dict, Sequence
+
+from token_type import TokenType
+from lox_token import Token
+from stmt import Stmt
+from bytecode import OpCode, Chunk, BytecodeCompiler
+from resolver import Resolver
+from runtime_exception import RuntimeException
+from interpreter import Interpreter
+from parser import ParserError
+from output_sink import OutputSink
+from rope import Rope, concatenate
+
+
+class VirtualMachine:
+    """Runs a Chunk on a value stack, with one frame of local slots, in a single dispatch loop."""
+
+    def __init__(self, globals_values: Dict[str, object], output: OutputSink):
+        self.globals = globals_values
+        self.output = output
+
+    def run(self, chunk: Chunk) -> None:
+        code, constants, values = chunk.code, chunk.constants, self.globals
+        frame = [None] * chunk.frame_size
+        stack = []
+        push, pop = stack.append, stack.pop
+        stringify, write_line = Interpreter.stringify_value, self.output.write_line
+        # the opcodes as locals, tested roughly in order of how often loops run them
+        (GET_LOCAL, CONSTANT, STORE_LOCAL, GET_GLOBAL, SET_GLOBAL, POP_JUMP_IF_FALSE, JUMP, ADD, SUBTRACT, MULTIPLY,
+         DIVIDE, LESS, LESS_EQUAL, GREATER, GREATER_EQUAL, EQUAL, NOT_EQUAL, SET_LOCAL, POP, PRINT, NIL, TRUE, FALSE,
+         NOT, NEGATE, JUMP_IF_FALSE, JUMP_IF_TRUE, DEFINE_GLOBAL, RETURN) = \
+            (OpCode.GET_LOCAL.value, OpCode.CONSTANT.value, OpCode.STORE_LOCAL.value, OpCode.GET_GLOBAL.value,
+             OpCode.SET_GLOBAL.value, OpCode.POP_JUMP_IF_FALSE.value, OpCode.JUMP.value, OpCode.ADD.value,
+             OpCode.SUBTRACT.value, OpCode.MULTIPLY.value, OpCode.DIVIDE.value, OpCode.LESS.value,
+             OpCode.LESS_EQUAL.value, OpCode.GREATER.value, OpCode.GREATER_EQUAL.value, OpCode.EQUAL.value,
+             OpCode.NOT_EQUAL.value, OpCode.SET_LOCAL.value, OpCode.POP.value, OpCode.PRINT.value, OpCode.NIL.value,
+             OpCode.TRUE.value, OpCode.FALSE.value, OpCode.NOT.value, OpCode.NEGATE.value, OpCode.JUMP_IF_FALSE.value,
+             OpCode.JUMP_IF_TRUE.value, OpCode.DEFINE_GLOBAL.value, OpCode.RETURN.value)
+        number_message = 'Operands must be numbers.'
+        ip = 0
+        while True:
+            opcode, operand = code[ip], code[ip + 1]
+            ip += 2
+            if opcode == GET_LOCAL:
+                push(frame[operand])
+            elif opcode == CONSTANT:
+                push(constants[operand])
+            elif opcode == STORE_LOCAL:
+                frame[operand] = pop()
+            elif opcode == GET_GLOBAL:
+                name = constants[operand]
+                if name not in values:
+                    raise VirtualMachine.error(chunk, ip, f'Undefined variable {name}.', name)
+                push(values[name])
+            elif opcode == SET_GLOBAL:
+                name = constants[operand]
+                if name not in values:
+                    raise VirtualMachine.error(chunk, ip, f'Undefined variable {name}.', name)
+                values[name] = stack[-1]
+            elif opcode == POP_JUMP_IF_FALSE:
+                value = pop()
+                if value is None or value is False:
+                    ip = operand
+            elif opcode == JUMP:
+                ip = operand
+            elif opcode == ADD:
+                right = pop()
+                left = stack[-1]
+                left_type, right_type = type(left), type(right)
+                if left_type is float and right_type is float:
+                    stack[-1] = left + right
+                elif (left_type is str or left_type is Rope) and (right_type is str or right_type is Rope):
+                    stack[-1] = concatenate(left, right)
+                else:
+                    raise VirtualMachine.error(chunk, ip, 'Operands must both be numbers or both be strings.')
+            elif GREATER <= opcode <= DIVIDE:
+                # the comparisons and arithmetic other than ADD, which are numbered consecutively
+                right = pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    raise VirtualMachine.error(chunk, ip, number_message)
+                if opcode == SUBTRACT:
+                    stack[-1] = left - right
+                elif opcode == MULTIPLY:
+                    stack[-1] = left * right
+                elif opcode == DIVIDE:
+                    stack[-1] = left / right
+                elif opcode == LESS:
+                    stack[-1] = left < right
+                elif opcode == LESS_EQUAL:
+                    stack[-1] = left <= right
+                elif opcode == GREATER:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = left >= right
+            elif opcode == EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif opcode == NOT_EQUAL:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif opcode == SET_LOCAL:
+                frame[operand] = stack[-1]
+            elif opcode == POP:
+                pop()
+            elif opcode == PRINT:
+                write_line(stringify(pop()))
+            elif opcode == NIL:
+                push(None)
+            elif opcode == TRUE:
+                push(True)
+            elif opcode == FALSE:
+                push(False)
+            elif opcode == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif opcode == NEGATE:
+                value = stack[-1]
+                if type(value) is not float:
+                    raise VirtualMachine.error(chunk, ip, 'Operand must be a number.')
+                stack[-1] = -value
+            elif opcode == JUMP_IF_FALSE:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = operand
+            elif opcode == JUMP_IF_TRUE:
+                value = stack[-1]
+                if value is not None and value is not False:
+                    ip = operand
+            elif opcode == DEFINE_GLOBAL:
+                values[constants[operand]] = pop()
+            elif opcode == RETURN:
+                return
+            else:
+                raise AssertionError(f'Invalid opcode {opcode}.')
+
+    @staticmethod
+    def error(chunk: Chunk, ip: int, message: str, lexeme: str = '') -> RuntimeException:
+        # ip has already moved past the failing instruction; errors only report the line of their token
+        token = Token(TokenType.IDENTIFIER, lexeme, None, chunk.line_at(ip - 2))
+        return RuntimeException(token, message)
+
+
+class BytecodeInterpreter(Interpreter):
+    """Runs statements by compiling them to bytecode with a BytecodeCompiler and running it on a VirtualMachine."""
+
+    def interpret(self, stmts: Sequence[Stmt]) -> None:
+        try:
+            VirtualMachine(self.globals.values, self.output).run(self.compile(stmts))
+        except RuntimeException as exception:
+            self.lox.runtime_exception(exception)
+        except ParserError:
+            # a lazily parsed block had syntax errors, which were reported when it was parsed
+            pass
+
+    @staticmethod
+    def compile(stmts: Sequence[Stmt]) -> Chunk:
+        Resolver().resolve(stmts)
+        return BytecodeCompiler().compile(stmts)